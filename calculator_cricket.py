@@ -1,10 +1,20 @@
+import json
+import operator
 import random
 from collections import namedtuple
+from dataclasses import dataclass, field
 
+from calculator_cricket_sampling import AliasTable
+
+# The T20 format, the default MatchConfig.
 MAX_OVERS = 20
 MAX_PER_BOWLER = 4
 TEAM_SIZE = 11
 MAX_WICKETS = 10
+# Bowlers are players[FIRST_BOWLER:], the bottom of the batting order.
+FIRST_BOWLER = 5
+# Places shown in the top batters and bowlers lists.
+TOP_N = 3
 
 DISMISSALS = [
     ("Caught", 57),
@@ -15,6 +25,60 @@ DISMISSALS = [
     ("Hit Wicket", 1),
 ]
 
+
+@dataclass(frozen=True)
+class MatchConfig:
+    """The format of a match: its length, sides and ways of getting out.
+
+    *dismissals* is a sequence of (type, relative weight) pairs, like
+    DISMISSALS. The values the game loops need are worked out once here:
+    balls (legal balls in an innings), bowler_balls (each bowler's quota),
+    wickets (team_size - 1 makes a side all out), n_bowlers and
+    dismissal_table. Configs are hashable and can be sent to worker
+    processes.
+    """
+
+    overs: int = MAX_OVERS
+    overs_per_bowler: int = MAX_PER_BOWLER
+    team_size: int = TEAM_SIZE
+    first_bowler: int = FIRST_BOWLER
+    dismissals: tuple = tuple(DISMISSALS)
+
+    balls: int = field(init=False, repr=False, compare=False)
+    bowler_balls: int = field(init=False, repr=False, compare=False)
+    wickets: int = field(init=False, repr=False, compare=False)
+    n_bowlers: int = field(init=False, repr=False, compare=False)
+    dismissal_table: AliasTable = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.overs < 1 or self.overs_per_bowler < 1:
+            raise ValueError("overs and overs_per_bowler must be at least 1")
+        if self.team_size < 2:
+            raise ValueError("a side needs at least 2 players")
+        if not 0 <= self.first_bowler < self.team_size:
+            raise ValueError(f"first_bowler must be a player index, not {self.first_bowler}")
+        n_bowlers = self.team_size - self.first_bowler
+        # Bowlers picked at random, never twice running, can only be left
+        # with no one eligible if the others' quotas run out first.
+        if (n_bowlers - 1) * self.overs_per_bowler < self.overs - 1:
+            raise ValueError(f"{n_bowlers} bowlers of {self.overs_per_bowler} overs "
+                             f"cannot always bowl {self.overs} overs")
+        dismissals = tuple((how, weight) for how, weight in self.dismissals)
+        if not dismissals:
+            raise ValueError("need at least one dismissal type")
+        object.__setattr__(self, "dismissals", dismissals)
+        object.__setattr__(self, "balls", self.overs * 6)
+        object.__setattr__(self, "bowler_balls", self.overs_per_bowler * 6)
+        object.__setattr__(self, "wickets", self.team_size - 1)
+        object.__setattr__(self, "n_bowlers", n_bowlers)
+        object.__setattr__(self, "dismissal_table", AliasTable(*zip(*dismissals)))
+
+
+T10 = MatchConfig(overs=10, overs_per_bowler=2)
+T20 = MatchConfig()
+ODI = MatchConfig(overs=50, overs_per_bowler=10)
+FORMATS = {"t10": T10, "t20": T20, "odi": ODI}
+
 FIRST_NAMES = [
     "James", "Arun", "Mohammed", "Chris", "David", "Ravi", "Ben", "Sachin",
     "Steve", "Kane", "Rashid", "Tom", "Virat", "Joe", "Mitchell", "Babar",
@@ -40,7 +104,76 @@ LAST_NAMES = [
     "Phillips", "Mitchell", "Santner",
 ]
 
+# What each face of the dice does, indexed by roll: a number of runs off
+# the bat, "extra" for a no-ball or wide worth one run, or "wicket".
+DEFAULT_DICE = [0, 1, 2, 3, 4, 0, 6, 0, "extra", "wicket"]
+
+Outcome = namedtuple("Outcome", ["runs", "bat_runs", "legal", "wicket", "swap", "desc"])
+
 BallResult = namedtuple("BallResult", ["desc", "runs", "is_wicket", "is_legal", "new_batsman"])
+InningsResult = namedtuple("InningsResult", ["team", "runs", "outs", "legal_balls", "balls"])
+
+# Events yielded by Game.innings_events.
+OverStart = namedtuple("OverStart", ["over_number", "bowler"])
+Delivery = namedtuple("Delivery", [
+    "over_number", "ball", "roll", "result", "bowler", "striker", "non_striker",
+    "runs", "outs", "last_ball",
+])
+OverEnd = namedtuple("OverEnd", ["over_number", "bowler", "runs", "outs", "legal_balls",
+                                 "innings_over"])
+InningsEnd = namedtuple("InningsEnd", ["result", "reason"])
+
+MatchResult = namedtuple("MatchResult", [
+    "toss_winner", "toss_choice", "first_innings", "second_innings",
+    "winner", "margin", "margin_type",
+])
+
+
+def _face_outcome(face):
+    if face == "extra":
+        return Outcome(1, 0, False, False, False, "No-ball/Wide (+1 run)")
+    if face == "wicket":
+        return Outcome(0, 0, True, True, False, None)
+    if isinstance(face, bool) or not isinstance(face, int) or face < 0:
+        raise ValueError(f"unknown dice face {face!r}")
+    if face == 0:
+        desc = "Dot ball"
+    elif face == 6:
+        desc = "SIX!"
+    else:
+        desc = f"{face} run{'s' if face > 1 else ''}"
+    return Outcome(face, face, True, False, face % 2 == 1, desc)
+
+
+def outcome_table(dice=None):
+    """Return the Outcome for each face of *dice* (DEFAULT_DICE if None).
+
+    Outcome fields are the deltas applied by Game._score_ball: team runs,
+    runs off the bat, whether the ball is legal, whether it takes a wicket,
+    whether the batters cross, and the commentary for a non-wicket ball.
+    """
+    if dice is None:
+        dice = DEFAULT_DICE
+    if not dice:
+        raise ValueError("dice must have at least one face")
+    outcomes = tuple(_face_outcome(face) for face in dice)
+    # Otherwise no over could ever end.
+    if not any(outcome.legal for outcome in outcomes):
+        raise ValueError("dice must have at least one legal delivery")
+    return outcomes
+
+
+def load_dice(path):
+    """Read a dice mapping from a JSON list of faces, e.g. DEFAULT_DICE."""
+    with open(path) as f:
+        dice = json.load(f)
+    if not isinstance(dice, list):
+        raise ValueError(f"{path}: expected a JSON list of faces")
+    outcome_table(dice)
+    return dice
+
+
+OUTCOMES = outcome_table()
 
 
 def abbreviate_name(full_name):
@@ -49,17 +182,160 @@ def abbreviate_name(full_name):
     return f"{parts[0][0]}. {' '.join(parts[1:])}"
 
 
+class TeamState:
+    """Match stats for a side's players, one fixed-size column per stat.
+
+    Row i holds players[i]. Clearing the columns in place resets every
+    player at once, with no per-player objects to rebuild. Columns are
+    lists rather than array('i'): every delivery increments them, and
+    boxing ints in and out of an array made a simulated match about 20%
+    slower for no real saving at eleven rows.
+    """
+
+    __slots__ = ("runs", "balls_faced", "out", "bowling_balls", "runs_conceded",
+                 "wickets_taken", "how_out", "_zeros", "_nones")
+
+    def __init__(self, size=TEAM_SIZE):
+        self._zeros = (0,) * size
+        self._nones = (None,) * size
+        self.runs = list(self._zeros)
+        self.balls_faced = list(self._zeros)
+        self.out = list(self._zeros)
+        self.bowling_balls = list(self._zeros)
+        self.runs_conceded = list(self._zeros)
+        self.wickets_taken = list(self._zeros)
+        self.how_out = list(self._nones)
+
+    def reset(self):
+        zeros = self._zeros
+        self.runs[:] = zeros
+        self.balls_faced[:] = zeros
+        self.out[:] = zeros
+        self.bowling_balls[:] = zeros
+        self.runs_conceded[:] = zeros
+        self.wickets_taken[:] = zeros
+        self.how_out[:] = self._nones
+
+
+class Leaderboard:
+    """Rows of a stat table kept in rank order as their stats change.
+
+    *key(i)* gives row i's sort key, best first; ties go to the lower row,
+    as a stable sort over the players would. Call update(i) whenever row
+    i's key changes. Rows are only ranked once update() or rebuild() has
+    seen them, which is how bowlers who have not bowled are left out.
+
+    With *size*, only the best *size* rows are kept. That is only correct
+    if a row's key never gets worse, as with runs scored; otherwise every
+    row must be kept.
+    """
+
+    __slots__ = ("key", "size", "rows")
+
+    def __init__(self, key, size=None):
+        self.key = key
+        self.size = size
+        self.rows = []
+
+    def update(self, i):
+        rows, key = self.rows, self.key
+        if i in rows:
+            rows.remove(i)
+        rank = (key(i), i)
+        pos = len(rows)
+        while pos and (key(rows[pos - 1]), rows[pos - 1]) > rank:
+            pos -= 1
+        if self.size is None:
+            rows.insert(pos, i)
+        elif pos < self.size:
+            rows.insert(pos, i)
+            del rows[self.size:]
+
+    def rebuild(self, rows):
+        """Rank *rows* from scratch."""
+        key = self.key
+        self.rows = sorted(rows, key=lambda i: (key(i), i))[:self.size]
+
+    def top(self, n=None):
+        """Return the best *n* rows, or all ranked rows."""
+        return self.rows[:n]
+
+
+def _batting_key(state):
+    runs = state.runs
+    return lambda i: -runs[i]
+
+
+def _bowling_key(state):
+    wickets, conceded = state.wickets_taken, state.runs_conceded
+    return lambda i: (-wickets[i], conceded[i])
+
+
+class SeriesStats:
+    """A side's batting and bowling totals over a series of matches.
+
+    add(state) folds in one finished match and re-ranks the series
+    leaderboards, so queries cost nothing however many matches are added.
+    """
+
+    def __init__(self, size=TEAM_SIZE):
+        self.matches = 0
+        self.runs = [0] * size
+        self.balls_faced = [0] * size
+        self.bowling_balls = [0] * size
+        self.runs_conceded = [0] * size
+        self.wickets_taken = [0] * size
+        self.batting = Leaderboard(_batting_key(self), TOP_N)
+        self.bowling = Leaderboard(_bowling_key(self))
+        self.batting.rebuild(range(size))
+
+    def add(self, state):
+        """Add one match's TeamState to the totals."""
+        for column in ("runs", "balls_faced", "bowling_balls", "runs_conceded",
+                       "wickets_taken"):
+            totals = getattr(self, column)
+            totals[:] = map(operator.add, totals, getattr(state, column))
+        self.matches += 1
+        self.batting.rebuild(range(len(self.runs)))
+        self.bowling.rebuild(i for i, balls in enumerate(self.bowling_balls) if balls)
+
+
+def _stat(column):
+    get_column = operator.attrgetter(column)
+
+    def get(self):
+        return get_column(self.state)[self.index]
+
+    def set(self, value):
+        get_column(self.state)[self.index] = value
+
+    return property(get, set)
+
+
 class Player:
-    def __init__(self, name):
+    """A view of one row of a TeamState."""
+
+    __slots__ = ("name", "state", "index")
+
+    def __init__(self, name, state=None, index=0):
         self.name = name
-        self.runs = 0
-        self.balls_faced = 0
-        self.out = False
-        self.how_out = None
-        # Bowling stats
-        self.bowling_balls = 0
-        self.runs_conceded = 0
-        self.wickets_taken = 0
+        self.state = TeamState(1) if state is None else state
+        self.index = index
+
+    runs = _stat("runs")
+    balls_faced = _stat("balls_faced")
+    how_out = _stat("how_out")
+    bowling_balls = _stat("bowling_balls")
+    runs_conceded = _stat("runs_conceded")
+    wickets_taken = _stat("wickets_taken")
+
+    @property
+    def out(self):
+        return bool(self.state.out[self.index])
+
+    @out.setter
+    def out(self, value):
+        self.state.out[self.index] = int(value)
 
     @property
     def short_name(self):
@@ -67,23 +343,74 @@ class Player:
 
 
 class Team:
-    def __init__(self, name):
+    def __init__(self, name, rng=None, series=False, config=None, names=None):
         self.name = name
+        self.rng = random if rng is None else rng
+        self.config = T20 if config is None else config
+        self.state = TeamState(self.config.team_size)
+        # *names* fixes the squad in batting order; otherwise it is random.
+        self.players = self._generate_players(names)
+        self.captain = self.rng.choice(self.players)
+        # The keeper is one of the top order, up to the first bowler.
+        self.keeper = self.rng.choice(self.players[:self.config.first_bowler + 1])
+        # This match's leaders. Game._process_ball keeps them up to date;
+        # the headless simulation leaves them stale to be rebuilt on demand.
+        self.batting_board = Leaderboard(_batting_key(self.state), TOP_N)
+        self.bowling_board = Leaderboard(_bowling_key(self.state))
+        # Totals over every match the Game has finished, if kept.
+        self.series = SeriesStats(self.config.team_size) if series else None
+        self.reset()
+
+    def _generate_players(self, names=None):
+        size = self.config.team_size
+        if names is None and size <= len(FIRST_NAMES):
+            firsts = self.rng.sample(FIRST_NAMES, size)
+            lasts = self.rng.sample(LAST_NAMES, size)
+            names = [f"{f} {l}" for f, l in zip(firsts, lasts)]
+        elif names is None:
+            # Too many for distinct first names: draw distinct full names.
+            n_last = len(LAST_NAMES)
+            if size > len(FIRST_NAMES) * n_last:
+                raise ValueError(f"cannot make up {size} player names; pass squads")
+            picks = self.rng.sample(range(len(FIRST_NAMES) * n_last), size)
+            names = [f"{FIRST_NAMES[i // n_last]} {LAST_NAMES[i % n_last]}" for i in picks]
+        elif len(names) != size:
+            raise ValueError(f"need {size} player names, got {len(names)}")
+        return [Player(name, self.state, i) for i, name in enumerate(names)]
+
+    def reset(self):
+        """Clear all match stats, keeping the same players."""
         self.runs = 0
         self.outs = 0
         self.balls = 0
         self.legal_balls = 0
-        self.players = self._generate_players()
-        self.captain = random.choice(self.players)
-        self.keeper = random.choice(self.players[:6])
         self.striker_idx = 0
         self.non_striker_idx = 1
         self.next_idx = 2
-
-    def _generate_players(self):
-        firsts = random.sample(FIRST_NAMES, TEAM_SIZE)
-        lasts = random.sample(LAST_NAMES, TEAM_SIZE)
-        return [Player(f"{f} {l}") for f, l in zip(firsts, lasts)]
+        self.state.reset()
+        self.boards_stale = True
+
+    def rebuild_boards(self):
+        """Re-rank this match's leaders from the stat columns."""
+        self.batting_board.rebuild(range(len(self.players)))
+        bowled = self.state.bowling_balls
+        self.bowling_board.rebuild(i for i in range(len(bowled)) if bowled[i])
+        self.boards_stale = False
+
+    def top_batters(self, n=TOP_N):
+        """Return this match's *n* highest scorers, best first."""
+        if self.boards_stale:
+            self.rebuild_boards()
+        return [self.players[i] for i in self.batting_board.top(n)]
+
+    def top_bowlers(self, n=TOP_N):
+        """Return this match's *n* best bowlers, or all who bowled if *n* is None.
+
+        Bowlers rank on most wickets, then fewest runs conceded.
+        """
+        if self.boards_stale:
+            self.rebuild_boards()
+        return [self.players[i] for i in self.bowling_board.top(n)]
 
     @property
     def striker(self):
@@ -94,17 +421,73 @@ class Team:
         return self.players[self.non_striker_idx]
 
     def is_all_out(self):
-        return self.outs >= MAX_WICKETS
+        return self.outs >= self.config.wickets
+
+
+class InningsProgress:
+    """How far an innings played by Game.innings_events() has got.
+
+    *stage* names what the stream does next: "over start", "ball",
+    "over end", "change ends" (the batters swap after an over, with no
+    event), "innings end" or "done". *bowler* is bowling the current over,
+    or bowled the last one, and *over_balls* legal balls of it are done,
+    out of *over_deliveries* deliveries counting extras.
+    """
+
+    __slots__ = ("team", "bowling_team", "target", "over_number", "bowler", "over_balls",
+                 "stage", "over_deliveries")
+
+    def __init__(self, team, bowling_team, target=None, over_number=0, bowler=None,
+                 over_balls=0, stage="over start", over_deliveries=0):
+        self.team = team
+        self.bowling_team = bowling_team
+        self.target = target
+        self.over_number = over_number
+        self.bowler = bowler
+        self.over_balls = over_balls
+        self.stage = stage
+        self.over_deliveries = over_deliveries
 
 
 class Game:
-    def __init__(self, team1_name, team2_name):
-        self.team1 = Team(team1_name)
-        self.team2 = Team(team2_name)
+    def __init__(self, team1_name, team2_name, rng=None, dice=None, roll_weights=None,
+                 instruments=None, series=False, config=None, squads=None):
+        self.rng = random if rng is None else rng
+        # The match format, T20 unless given; see MatchConfig.
+        self.config = T20 if config is None else config
+        # An Instruments, timing each phase and counting each innings; see
+        # calculator_cricket_instruments.
+        self.instruments = instruments
+        self.outcomes = OUTCOMES if dice is None else outcome_table(dice)
+        # Faces roll uniformly unless weighted, e.g. to model pitch conditions.
+        faces = len(self.outcomes)
+        if roll_weights is None:
+            roll_weights = [1] * faces
+        if len(roll_weights) != faces:
+            raise ValueError(f"need {faces} roll weights, got {len(roll_weights)}")
+        self.roll_weights = list(roll_weights)
+        self.roll_table = AliasTable(range(faces), roll_weights)
+        # Set by the toss.
+        self.batting_first = self.batting_second = None
+        # The innings being played by innings_events(), if any.
+        self.progress = None
+        if instruments is not None:
+            start = instruments.start()
+        # With *series*, each team keeps a SeriesStats over every match
+        # simulated or played with this Game. *squads*, if given, is a pair
+        # of player name lists for the two teams.
+        names1, names2 = (None, None) if squads is None else squads
+        self.team1 = Team(team1_name, self.rng, series, self.config, names1)
+        self.team2 = Team(team2_name, self.rng, series, self.config, names2)
+        if instruments is not None:
+            instruments.stop("teams", start)
+
+    def _default_roll_fn(self):
+        return self.roll_table.sampler(self.rng)
 
     def _build_dismissal_description(self, how, bowler, bowling_team):
         if how == "Caught":
-            fielder = random.choice(bowling_team.players)
+            fielder = self.rng.choice(bowling_team.players)
             return f"c {fielder.short_name} b {bowler.short_name}"
         elif how == "Stumped":
             return f"st \u2020{bowling_team.keeper.short_name} b {bowler.short_name}"
@@ -116,72 +499,68 @@ class Game:
             return "Run Out"
         elif how == "Hit Wicket":
             return f"Hit Wicket b {bowler.short_name}"
-
-    def _process_ball(self, team, bowling_team, bowler, roll):
-        display_name = team.striker.short_name
-        new_batsman = None
-        is_wicket = False
-        is_legal = True
-        runs = 0
-
+        return how
+
+    def _score_ball(self, team, bowler, roll):
+        """Apply *roll* to the match state without building any text.
+
+        Returns the dismissal type on a wicket, otherwise None.
+        """
+        runs, bat_runs, legal, wicket, swap, _ = self.outcomes[roll]
+        batting = team.state
+        bowling = bowler.state
+        striker = team.striker_idx
+        b = bowler.index
         team.balls += 1
-
-        if roll in (0, 1, 2, 3, 4):
-            runs = roll
-            team.runs += roll
-            team.striker.runs += roll
-            team.striker.balls_faced += 1
-            bowler.runs_conceded += roll
-            bowler.bowling_balls += 1
-            team.legal_balls += 1
-            if roll == 0:
-                desc = "Dot ball"
-            else:
-                desc = f"{roll} run{'s' if roll > 1 else ''}"
-                if roll in (1, 3):
-                    team.striker_idx, team.non_striker_idx = (
-                        team.non_striker_idx, team.striker_idx)
-        elif roll == 6:
-            runs = 6
-            team.runs += 6
-            team.striker.runs += 6
-            team.striker.balls_faced += 1
-            bowler.runs_conceded += 6
-            bowler.bowling_balls += 1
-            team.legal_balls += 1
-            desc = "SIX!"
-        elif roll in (5, 7):
-            team.striker.balls_faced += 1
-            bowler.bowling_balls += 1
+        if runs:
+            team.runs += runs
+            batting.runs[striker] += bat_runs
+            bowling.runs_conceded[b] += runs
+        if legal:
             team.legal_balls += 1
-            desc = "Dot ball"
-        elif roll == 8:
-            runs = 1
-            is_legal = False
-            team.runs += 1
-            bowler.runs_conceded += 1
-            desc = "No-ball/Wide (+1 run)"
-        elif roll == 9:
-            is_wicket = True
+            batting.balls_faced[striker] += 1
+            bowling.bowling_balls[b] += 1
+        if swap:
+            team.striker_idx, team.non_striker_idx = (
+                team.non_striker_idx, team.striker_idx)
+        if wicket:
             team.outs += 1
-            team.striker.balls_faced += 1
-            bowler.bowling_balls += 1
-            bowler.wickets_taken += 1
-            team.legal_balls += 1
-            types, weights = zip(*DISMISSALS)
-            how = random.choices(types, weights=weights)[0]
-            team.striker.out = True
-            team.striker.how_out = self._build_dismissal_description(how, bowler, bowling_team)
-            desc = f"OUT! ({how})"
+            batting.out[striker] = 1
+            bowling.wickets_taken[b] += 1
             if team.next_idx < len(team.players):
                 team.striker_idx = team.next_idx
                 team.next_idx += 1
+            return self.config.dismissal_table.sample(self.rng)
+        return None
+
+    def _process_ball(self, team, bowling_team, bowler, roll):
+        return self._deliver(team, bowling_team, bowler, roll)[0]
+
+    def _deliver(self, team, bowling_team, bowler, roll):
+        """Play a ball as _process_ball does; return its BallResult and dismissal type."""
+        striker = team.striker
+        how = self._score_ball(team, bowler, roll)
+
+        if team.boards_stale:
+            team.rebuild_boards()
+        else:
+            team.batting_board.update(striker.index)
+        if bowling_team.boards_stale:
+            bowling_team.rebuild_boards()
+        elif bowler.bowling_balls:
+            bowling_team.bowling_board.update(bowler.index)
+
+        if how is not None:
+            striker.how_out = self._build_dismissal_description(how, bowler, bowling_team)
+            new_batsman = None
+            if team.striker is not striker:
                 new_batsman = team.striker.short_name
-            else:
-                new_batsman = None
+            return BallResult(desc=f"OUT! ({how})", runs=0, is_wicket=True,
+                              is_legal=True, new_batsman=new_batsman), how
 
-        return BallResult(desc=desc, runs=runs, is_wicket=is_wicket,
-                          is_legal=is_legal, new_batsman=new_batsman)
+        outcome = self.outcomes[roll]
+        return BallResult(desc=outcome.desc, runs=outcome.runs, is_wicket=False,
+                          is_legal=outcome.legal, new_batsman=None), None
 
     def _print_over_summary(self, team, bowler, over_number, target):
         overs_so_far = self._format_overs(team.legal_balls)
@@ -197,15 +576,114 @@ class Game:
               f"{bowler.wickets_taken}/{bowler.runs_conceded}")
         if target is not None:
             remaining = target - team.runs
-            print(f"  Need {remaining} runs from {MAX_OVERS * 6 - team.legal_balls} balls")
+            print(f"  Need {remaining} runs from {self.config.balls - team.legal_balls} balls")
         print()
 
-    def play_innings(self, team, bowling_team, target=None, roll_fn=None, input_fn=None):
+    def innings_events(self, team, bowling_team, target=None, roll_fn=None, record=None):
+        """Play an innings lazily, yielding an event for each step.
+
+        Each over yields OverStart, a Delivery per ball, then OverEnd; the
+        innings finishes with InningsEnd, whose reason is "all out",
+        "target" or "overs". The dice are only rolled when the next
+        Delivery is pulled: after a Delivery with last_ball set, the next
+        event is an OverEnd, and after an OverEnd with innings_over set it
+        is the InningsEnd. Strike changes at the end of an over once the
+        OverEnd has been consumed.
+
+        self.progress records how far the stream has got, so that a
+        restored snapshot can carry on with resume_innings(). *record* is
+        called after every delivery, as for simulate()'s log; see
+        BallLogWriter.recorder.
+        """
+        self.progress = InningsProgress(team, bowling_team, target)
+        return self.resume_innings(roll_fn, record)
+
+    def resume_innings(self, roll_fn=None, record=None):
+        """Carry on the innings in self.progress, yielding as innings_events()."""
+        if roll_fn is None:
+            roll_fn = self._default_roll_fn()
+        return self._innings_events(self.progress, roll_fn, record)
+
+    def _innings_reason(self, team, target):
+        if team.is_all_out():
+            return "all out"
+        if target is not None and team.runs >= target:
+            return "target"
+        return "overs"
+
+    def _innings_events(self, progress, roll_fn, record):
+        team, bowling_team, target = progress.team, progress.bowling_team, progress.target
+        config = self.config
+        bowlers = bowling_team.players[config.first_bowler:]
+
+        while True:
+            stage = progress.stage
+            if stage == "ball":
+                bowler = progress.bowler
+                roll = roll_fn()
+                striker, non_striker = team.striker, team.non_striker
+                runs = team.runs
+                result, how = self._deliver(team, bowling_team, bowler, roll)
+                progress.over_balls += result.is_legal
+                progress.over_deliveries += 1
+                if record is not None:
+                    record(progress.over_number - 1, progress.over_deliveries, roll,
+                           striker.index, bowler.index, team.runs - runs, result.is_legal, how)
+
+                innings_over = self._innings_reason(team, target) != "overs" or (
+                    progress.over_balls == 6 and progress.over_number == config.overs)
+                last_ball = innings_over or progress.over_balls == 6
+                if last_ball:
+                    progress.stage = "over end"
+                yield Delivery(progress.over_number, progress.over_balls, roll, result, bowler,
+                               striker, non_striker, team.runs, team.outs, last_ball)
+
+            elif stage == "over start":
+                eligible = [b for b in bowlers
+                            if b.bowling_balls < config.bowler_balls and b is not progress.bowler]
+                progress.bowler = bowler = self.rng.choice(eligible)
+                progress.over_number += 1
+                progress.over_balls = progress.over_deliveries = 0
+                progress.stage = "ball"
+                yield OverStart(progress.over_number, bowler)
+
+            elif stage == "over end":
+                reason = self._innings_reason(team, target)
+                innings_over = reason != "overs" or progress.over_number == config.overs
+                progress.stage = "change ends" if reason == "overs" else "innings end"
+                yield OverEnd(progress.over_number, progress.bowler, team.runs, team.outs,
+                              team.legal_balls, innings_over)
+
+            elif stage == "change ends":
+                team.striker_idx, team.non_striker_idx = (
+                    team.non_striker_idx, team.striker_idx)
+                if progress.over_number == config.overs:
+                    progress.stage = "innings end"
+                else:
+                    progress.stage = "over start"
+
+            elif stage == "innings end":
+                progress.stage = "done"
+                if self.instruments is not None:
+                    self.instruments.count_innings(team, progress.over_number)
+                yield InningsEnd(InningsResult(team.name, team.runs, team.outs,
+                                               team.legal_balls, team.balls),
+                                 self._innings_reason(team, target))
+
+            else:
+                return
+
+    def play_innings(self, team, bowling_team, target=None, roll_fn=None, input_fn=None,
+                     record=None):
         if roll_fn is None:
-            roll_fn = lambda: random.randint(0, 9)
+            roll_fn = self._default_roll_fn()
         if input_fn is None:
             input_fn = input
 
+        def paced_roll():
+            input_fn()
+            return roll_fn()
+
         print(f"\n{'='*40}")
         print(f"{team.name} batting")
         if target is not None:
@@ -215,63 +693,89 @@ class Game:
         print(f"Opening batsmen: {team.striker.short_name} & "
               f"{team.non_striker.short_name}\n")
 
-        bowlers = bowling_team.players[5:TEAM_SIZE]
-        over_number = 1
-        target_reached = False
-        last_bowler = None
-
-        while not team.is_all_out() and not target_reached and over_number <= MAX_OVERS:
-            eligible = [b for b in bowlers
-                        if b.bowling_balls < MAX_PER_BOWLER * 6 and b is not last_bowler]
-            bowler = random.choice(eligible)
-            last_bowler = bowler
-            print(f"--- Over {over_number}: {bowler.short_name} bowling ---")
-
-            balls_this_over = 0
-            while balls_this_over < 6 and not team.is_all_out():
-                input_fn()
-                roll = roll_fn()
-                display_name = team.striker.short_name
-
-                result = self._process_ball(team, bowling_team, bowler, roll)
-
-                if result.is_legal:
-                    balls_this_over += 1
+        instruments = self.instruments
+        if instruments is not None:
+            start = instruments.start()
+        for event in self.innings_events(team, bowling_team, target, paced_roll, record):
+            if isinstance(event, OverStart):
+                print(f"--- Over {event.over_number}: {event.bowler.short_name} bowling ---")
 
-                ball_display = f"{over_number - 1}.{balls_this_over}"
-                print(f"{ball_display}: [{roll}] {result.desc} "
-                      f"({display_name}*)  |  "
-                      f"Score: {team.runs}/{team.outs}")
+            elif isinstance(event, Delivery):
+                result = event.result
+                ball_display = f"{event.over_number - 1}.{event.ball}"
+                print(f"{ball_display}: [{event.roll}] {result.desc} "
+                      f"({event.striker.short_name}*)  |  "
+                      f"Score: {event.runs}/{event.outs}")
 
                 if result.is_wicket and not team.is_all_out():
                     print(f"  New batsman: {result.new_batsman}")
 
-                if target is not None and team.runs >= target:
-                    print(f"\n{team.name} reached the target!")
-                    target_reached = True
-                    break
-
-            # End of over summary
-            if not target_reached and not team.is_all_out():
-                self._print_over_summary(team, bowler, over_number, target)
+            elif isinstance(event, OverEnd):
+                if not team.is_all_out() and (target is None or team.runs < target):
+                    self._print_over_summary(team, event.bowler, event.over_number, target)
 
-            # End of over: swap strike
-            if not target_reached and not team.is_all_out():
-                team.striker_idx, team.non_striker_idx = (
-                    team.non_striker_idx, team.striker_idx)
-
-            over_number += 1
-
-        if team.is_all_out():
-            print(f"\n{team.name} all out!")
-        elif not target_reached:
-            print(f"\n{team.name} innings complete ({MAX_OVERS} overs)")
+            elif event.reason == "target":
+                print(f"\n{team.name} reached the target!")
+            elif event.reason == "all out":
+                print(f"\n{team.name} all out!")
+            else:
+                print(f"\n{team.name} innings complete ({self.config.overs} overs)")
 
         overs_display = self._format_overs(team.legal_balls)
         print(f"\n{team.name} final score: {team.runs}/{team.outs} "
               f"({overs_display} overs)")
 
+        if instruments is not None:
+            instruments.stop("innings", start)
+            start = instruments.start()
         self._print_scorecard(team, bowling_team)
+        if instruments is not None:
+            instruments.stop("scorecard", start)
+
+    def _simulate_innings(self, team, bowling_team, target=None, roll_fn=None, record=None):
+        """Headless counterpart of play_innings: same rules, no I/O.
+
+        Returns the number of overs started. *record*, if given, is called after every delivery as
+        record(over, ball, roll, striker, bowler, runs, legal, how); see
+        BallLogWriter.recorder.
+        """
+        rng = self.rng
+        if roll_fn is None:
+            roll_fn = self._default_roll_fn()
+        team.boards_stale = bowling_team.boards_stale = True
+
+        config = self.config
+        overs, quota, wickets = config.overs, config.bowler_balls, config.wickets
+        bowlers = bowling_team.players[config.first_bowler:]
+        bowled = bowling_team.state.bowling_balls
+        last_bowler = None
+
+        for over in range(overs):
+            eligible = [b for b in bowlers
+                        if bowled[b.index] < quota and b is not last_bowler]
+            bowler = rng.choice(eligible)
+            last_bowler = bowler
+
+            over_end = team.legal_balls + 6
+            ball = 0
+            while team.legal_balls < over_end and team.outs < wickets:
+                if record is None:
+                    self._score_ball(team, bowler, roll_fn())
+                else:
+                    ball += 1
+                    roll = roll_fn()
+                    striker, runs, legal = team.striker_idx, team.runs, team.legal_balls
+                    how = self._score_ball(team, bowler, roll)
+                    record(over, ball, roll, striker, bowler.index, team.runs - runs,
+                           team.legal_balls > legal, how)
+                if target is not None and team.runs >= target:
+                    return over + 1
+
+            if team.outs >= wickets:
+                return over + 1
+            team.striker_idx, team.non_striker_idx = (
+                team.non_striker_idx, team.striker_idx)
+        return overs
 
     @staticmethod
     def _format_overs(legal_balls):
@@ -293,20 +797,30 @@ class Game:
             else:
                 print(f"  {b.short_name:<18} did not bat")
 
-        top3 = sorted(team.players, key=lambda b: b.runs, reverse=True)[:3]
         print(f"\n--- Top 3 ---")
-        for i, b in enumerate(top3, 1):
+        for i, b in enumerate(team.top_batters(), 1):
             star = "" if b.out else "*"
             print(f"  {i}. {b.short_name}   {b.runs}{star}")
 
-        active_bowlers = [b for b in bowling_team.players if b.bowling_balls > 0]
-        active_bowlers.sort(key=lambda b: (-b.wickets_taken, b.runs_conceded))
         print(f"\n--- Bowling ---")
-        for b in active_bowlers:
+        for b in bowling_team.top_bowlers(None):
             overs_display = self._format_overs(b.bowling_balls)
             print(f"  {b.short_name:<18} {overs_display:<6} "
                   f"{b.wickets_taken}/{b.runs_conceded}")
 
+    def _result(self, bat_first, bat_second):
+        """Return (winning team or None for a tie, margin, "runs"/"wickets")."""
+        if bat_first.runs > bat_second.runs:
+            return bat_first, bat_first.runs - bat_second.runs, "runs"
+        if bat_second.runs > bat_first.runs:
+            return bat_second, self.config.wickets - bat_second.outs, "wickets"
+        return None, 0, None
+
+    def _add_to_series(self):
+        for team in (self.team1, self.team2):
+            if team.series is not None:
+                team.series.add(team.state)
+
     def declare_winner(self):
         bat_first = self.batting_first
         bat_second = self.batting_second
@@ -318,20 +832,16 @@ class Game:
         print(f"{bat_second.name}: {bat_second.runs}/{bat_second.outs}")
         print()
 
-        if bat_first.runs > bat_second.runs:
-            diff = bat_first.runs - bat_second.runs
-            print(f"{bat_first.name} wins by {diff} runs!")
-        elif bat_second.runs > bat_first.runs:
-            wickets = MAX_WICKETS - bat_second.outs
-            print(f"{bat_second.name} wins by {wickets} wickets!")
-        else:
+        winner, margin, margin_type = self._result(bat_first, bat_second)
+        if winner is None:
             print("It's a tie!")
+        else:
+            print(f"{winner.name} wins by {margin} {margin_type}!")
 
         print(f"\n--- Top Scorers ---")
         for team in (bat_first, bat_second):
             print(f"{team.name}:")
-            top3 = sorted(team.players, key=lambda b: b.runs, reverse=True)[:3]
-            for i, b in enumerate(top3, 1):
+            for i, b in enumerate(team.top_batters(), 1):
                 star = "" if b.out else "*"
                 print(f"  {i}. {b.short_name}   {b.runs}{star}")
 
@@ -339,13 +849,25 @@ class Game:
         for team, bowling_team in ((bat_first, bat_second),
                                    (bat_second, bat_first)):
             print(f"{bowling_team.name} (bowling vs {team.name}):")
-            active = [b for b in bowling_team.players if b.bowling_balls > 0]
-            top3 = sorted(active, key=lambda b: (-b.wickets_taken, b.runs_conceded))[:3]
-            for i, b in enumerate(top3, 1):
+            for i, b in enumerate(bowling_team.top_bowlers(), 1):
                 overs = self._format_overs(b.bowling_balls)
                 print(f"  {i}. {b.short_name}   {b.wickets_taken}/{b.runs_conceded} ({overs} ov)")
 
-    def play(self):
+    def recorders(self, log, match_id=0):
+        """Return the record functions for each innings of a match in *log*.
+
+        *log* is a BallLogWriter; both are None if it is None.
+        """
+        if log is None:
+            return None, None
+        return tuple(log.recorder(match_id, innings, self.config.dismissals)
+                     for innings in (1, 2))
+
+    def play(self, log=None, match_id=0):
+        """Play a match at the terminal, writing every delivery to *log* if given."""
+        instruments = self.instruments
+        if instruments is not None:
+            start = instruments.start()
         print(f"\nCoin Toss!")
         print(f"{self.team1.name} captain: {self.team1.captain.short_name} vs "
               f"{self.team2.name} captain: {self.team2.captain.short_name}")
@@ -357,7 +879,7 @@ class Game:
             print("Please enter 'h' or 't'.")
 
         call_name = "Heads" if call == "h" else "Tails"
-        flip = random.choice(["Heads", "Tails"])
+        flip = self.rng.choice(["Heads", "Tails"])
 
         if call_name == flip:
             print(f"It's {flip}! You win the toss!")
@@ -368,7 +890,7 @@ class Game:
                 print("Please enter 'bat' or 'bowl'.")
         else:
             print(f"It's {flip}! You lose the toss.")
-            choice = random.choice(["bat", "bowl"])
+            choice = self.rng.choice(["bat", "bowl"])
             print(f"{self.team2.name} choose to {choice}")
             # Invert: if opposition chooses to bat, player bowls and vice versa
             choice = "bowl" if choice == "bat" else "bat"
@@ -379,11 +901,96 @@ class Game:
         else:
             self.batting_first = self.team2
             self.batting_second = self.team1
+        if instruments is not None:
+            instruments.stop("toss", start)
 
-        self.play_innings(self.batting_first, self.batting_second)
+        records = self.recorders(log, match_id)
+        self.play_innings(self.batting_first, self.batting_second, record=records[0])
         target = self.batting_first.runs + 1
-        self.play_innings(self.batting_second, self.batting_first, target=target)
+        self.play_innings(self.batting_second, self.batting_first, target=target,
+                          record=records[1])
+        if instruments is not None:
+            start = instruments.start()
         self.declare_winner()
+        self._add_to_series()
+        if instruments is not None:
+            instruments.stop("result", start)
+
+    def simulate(self, seed=None, toss_policy="random", roll_fn=None, log=None, match_id=0):
+        """Play a full match with no I/O and return a MatchResult.
+
+        *toss_policy* is what team1 does if it wins the toss: "bat", "bowl",
+        "random", or a callable taking the Game and returning "bat" or "bowl".
+        Passing *seed* gives the match its own Random, so the result depends
+        only on the seed. Both teams are reset first, so a Game can be reused.
+        Every delivery is written to *log*, a BallLogWriter, under *match_id*.
+        """
+        if not callable(toss_policy) and toss_policy not in ("bat", "bowl", "random"):
+            raise ValueError(f"toss_policy must be 'bat', 'bowl', 'random' or a callable, "
+                             f"not {toss_policy!r}")
+        if seed is not None:
+            self.rng = random.Random(seed)
+        rng = self.rng
+        instruments = self.instruments
+        self.team1.reset()
+        self.team2.reset()
+        if instruments is not None:
+            start = instruments.start()
+
+        if rng.random() < 0.5:
+            toss_winner = self.team1
+            if callable(toss_policy):
+                choice = toss_policy(self)
+                if choice not in ("bat", "bowl"):
+                    raise ValueError(f"toss_policy must give 'bat' or 'bowl', not {choice!r}")
+            elif toss_policy == "random":
+                choice = rng.choice(["bat", "bowl"])
+            else:
+                choice = toss_policy
+        else:
+            toss_winner = self.team2
+            choice = rng.choice(["bat", "bowl"])
+
+        loser = self.team2 if toss_winner is self.team1 else self.team1
+        if choice == "bat":
+            self.batting_first, self.batting_second = toss_winner, loser
+        else:
+            self.batting_first, self.batting_second = loser, toss_winner
+
+        first, second = self.batting_first, self.batting_second
+        records = self.recorders(log, match_id)
+        if instruments is not None:
+            instruments.stop("toss", start)
+            start = instruments.start()
+        overs = self._simulate_innings(first, second, roll_fn=roll_fn, record=records[0])
+        if instruments is not None:
+            instruments.stop("innings", start)
+            instruments.count_innings(first, overs)
+            start = instruments.start()
+        overs = self._simulate_innings(second, first, target=first.runs + 1, roll_fn=roll_fn,
+                                       record=records[1])
+        if instruments is not None:
+            instruments.stop("innings", start)
+            instruments.count_innings(second, overs)
+            start = instruments.start()
+
+        winner, margin, margin_type = self._result(first, second)
+        if first.series is not None:
+            self._add_to_series()
+        result = MatchResult(
+            toss_winner=toss_winner.name,
+            toss_choice=choice,
+            first_innings=InningsResult(first.name, first.runs, first.outs,
+                                        first.legal_balls, first.balls),
+            second_innings=InningsResult(second.name, second.runs, second.outs,
+                                         second.legal_balls, second.balls),
+            winner=None if winner is None else winner.name,
+            margin=margin,
+            margin_type=margin_type,
+        )
+        if instruments is not None:
+            instruments.stop("result", start)
+        return result
 
 
 def main():
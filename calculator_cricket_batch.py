@@ -0,0 +1,429 @@
+"""NumPy batch engine for Calculator Cricket.
+
+Simulates many innings at once as arrays rather than one Team/Player object
+graph per match. Rolls are drawn as an (N, balls) matrix and the innings are
+stepped one delivery at a time across all N rows, so every operation is a
+vectorised update of N-long state vectors. The rules are exactly those of
+Game._score_ball and Game.play_innings; only the bookkeeping is vectorised.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from calculator_cricket import OUTCOMES, T20, outcome_table
+from calculator_cricket_sampling import AliasTable
+
+_EXTRA_BIT, _ILLEGAL_BIT, _WICKET_BIT, _SWAP_BIT = 8, 9, 10, 11
+
+
+def _roll_codes(outcomes):
+    """Pack an outcome table into one int16 code per roll.
+
+    A fancy-indexed lookup costs far more than bit arithmetic, so each roll
+    becomes batter runs in the low byte, then one bit each for extra run,
+    illegal delivery, wicket and strike swap.
+    """
+    codes = []
+    for o in outcomes:
+        extra = o.runs - o.bat_runs
+        if o.bat_runs > 0xFF or extra > 1:
+            raise ValueError(f"outcome {o} does not fit the batch engine")
+        codes.append(o.bat_runs
+                     | extra << _EXTRA_BIT
+                     | (not o.legal) << _ILLEGAL_BIT
+                     | o.wicket << _WICKET_BIT
+                     | o.swap << _SWAP_BIT)
+    return np.array(codes, dtype=np.int16)
+
+
+_ROLL_CODES = _roll_codes(OUTCOMES)
+
+# Deliveries drawn per T20 innings up front, scaled to the length of other
+# formats. Rows that extras carry past this are extended and re-run, which
+# is rare.
+ROLL_BLOCK = T20.balls + 40
+CHUNK_SIZE = 32768
+
+BatchInnings = namedtuple("BatchInnings", [
+    "runs", "outs", "legal_balls", "balls",
+    "bat_runs", "bat_balls", "bat_out",
+    "bowl_balls", "bowl_runs", "bowl_wickets",
+])
+BatchInnings.__doc__ = """Results of N innings.
+
+Team totals have shape (N,). bat_* have shape (N, config.team_size) indexed
+by batting order; bowl_* have shape (N, config.n_bowlers), where column j is
+players[config.first_bowler + j] of the bowling side.
+"""
+
+InningsFork = namedtuple("InningsFork", [
+    "config", "outcomes", "roll_weights", "target", "finished",
+    "runs", "outs", "legal_balls", "balls", "over_number", "over_balls", "in_over",
+    "bowler", "striker", "non_striker", "next_bat",
+    "bat_runs", "bat_balls", "bat_out", "bowl_balls", "bowl_runs", "bowl_wickets",
+])
+InningsFork.__doc__ = """An innings in progress as plain numbers; see fork_innings().
+
+over_number counts completed overs. With in_over, *bowler* is bowling the
+current over, of which over_balls legal balls are done; otherwise it bowled
+the last over, or is -1. Bowlers are columns as in BatchInnings, batters
+indexes in batting order, and the per-player arrays are as in
+BatchInnings for a single innings.
+"""
+
+Projection = namedtuple("Projection", ["innings", "scores", "win", "tie"])
+Projection.__doc__ = """Continuations of an innings; see project_innings().
+
+*innings* is a BatchInnings of the whole innings, balls before the fork
+included. scores[s] is the fraction that finished on s runs. *win* and
+*tie* are the fractions that reached the target and that finished one
+short of it, or None for a first innings.
+"""
+
+
+def _roll_block(config, balls=None):
+    """Rolls to draw up front for an innings with *balls* legal balls left."""
+    return -(-ROLL_BLOCK * (config.balls if balls is None else balls) // T20.balls)
+
+
+def _bowling_schedule(rng, n, config, fork=None):
+    """Return a (config.overs, n) array of bowler columns, one per over.
+
+    Each over picks uniformly among bowlers under quota who did not bowl
+    the previous over. Overs an innings never reaches are simply unused.
+    From an InningsFork, overs already bowled keep their quota and the
+    current over keeps its bowler.
+    """
+    n_bowlers = config.n_bowlers
+    schedule = np.empty((config.overs, n), dtype=np.int16)
+    overs = np.zeros((n_bowlers, n), dtype=np.int16)
+    last = np.full(n, -1, dtype=np.int16)
+    first = 0
+    if fork is not None:
+        used = fork.bowl_balls // 6
+        if fork.in_over:
+            used[fork.bowler] = (fork.bowl_balls[fork.bowler] - fork.over_balls) // 6 + 1
+            schedule[fork.over_number] = fork.bowler
+        overs += used[:, None].astype(np.int16)
+        last[:] = fork.bowler
+        first = min(fork.over_number + fork.in_over, config.overs)
+    u = rng.random((config.overs, n))
+    for over in range(first, config.overs):
+        eligible = (overs < config.overs_per_bowler) & (np.arange(n_bowlers)[:, None] != last)
+        k = (u[over] * eligible.sum(axis=0)).astype(np.int16)
+        # Take the k-th eligible bowler, counting from zero.
+        seen = np.zeros(n, dtype=np.int16)
+        for j in range(n_bowlers):
+            chosen = eligible[j] & (seen == k)
+            seen += eligible[j]
+            np.copyto(last, j, where=chosen)
+            overs[j] += chosen
+        schedule[over] = last
+    return schedule
+
+
+class _Block:
+    """Per-row state for one block of innings, stepped a delivery at a time.
+
+    Batters are tracked by end rather than by striker: the striker's end
+    flips on odd runs and at the end of an over, while the batter at an end
+    only changes on a wicket. Per-player totals are written out only on the
+    sparse wicket, over-end and innings-end rows.
+    """
+
+    def __init__(self, n, schedule, config, fork=None):
+        self.n = n
+        self.schedule = schedule
+        self.team_size = team_size = config.team_size
+        self.n_bowlers = n_bowlers = config.n_bowlers
+        self.wickets, self.balls_limit, self.overs = config.wickets, config.balls, config.overs
+        zeros = lambda: np.zeros(n, dtype=np.int16)
+        self.runs, self.outs, self.legal_balls, self.balls = zeros(), zeros(), zeros(), zeros()
+        self.over_balls, self.over_number = zeros(), zeros()
+        self.over_start_runs, self.over_start_outs = zeros(), zeros()
+        self.strike_end = zeros()
+        self.end_batter = [zeros(), np.ones(n, dtype=np.int16)]
+        self.end_runs = [zeros(), zeros()]
+        self.end_balls = [zeros(), zeros()]
+        self.next_bat = np.full(n, 2, dtype=np.int16)
+        self.alive = np.ones(n, dtype=np.int16)
+
+        self.bat_runs = np.zeros(n * team_size, dtype=np.int64)
+        self.bat_balls = np.zeros(n * team_size, dtype=np.int64)
+        self.bat_out = np.zeros(n * team_size, dtype=bool)
+        self.bowl_runs = np.zeros(n * n_bowlers, dtype=np.int64)
+        self.bowl_balls = np.zeros(n * n_bowlers, dtype=np.int64)
+        self.bowl_wickets = np.zeros(n * n_bowlers, dtype=np.int64)
+        if fork is not None:
+            self._fork(fork)
+
+    def _fork(self, fork):
+        """Start every row from InningsFork *fork*."""
+        n = self.n
+        self.runs[:], self.outs[:] = fork.runs, fork.outs
+        self.legal_balls[:], self.balls[:] = fork.legal_balls, fork.balls
+        self.over_balls[:], self.over_number[:] = fork.over_balls, fork.over_number
+        # The over in progress is credited to its bowler when it ends, from
+        # here on for runs and wickets but in full for balls.
+        self.over_start_runs[:], self.over_start_outs[:] = fork.runs, fork.outs
+        for end, batter in enumerate((fork.striker, fork.non_striker)):
+            self.end_batter[end][:] = batter
+            self.end_runs[end][:] = fork.bat_runs[batter]
+            self.end_balls[end][:] = fork.bat_balls[batter]
+        self.next_bat[:] = fork.next_bat
+        self.alive[:] = not fork.finished
+        self.bat_runs[:] = np.tile(fork.bat_runs, n)
+        self.bat_balls[:] = np.tile(fork.bat_balls, n)
+        self.bat_out[:] = np.tile(fork.bat_out, n)
+        bowl_balls = fork.bowl_balls.copy()
+        if fork.in_over:
+            bowl_balls[fork.bowler] -= fork.over_balls
+        self.bowl_balls[:] = np.tile(bowl_balls, n)
+        self.bowl_runs[:] = np.tile(fork.bowl_runs, n)
+        self.bowl_wickets[:] = np.tile(fork.bowl_wickets, n)
+
+    def step(self, code, limit):
+        alive = self.alive
+        code = code * alive
+        bat_runs = code & 0xFF
+        legal = alive - ((code >> _ILLEGAL_BIT) & 1)
+        wicket = (code >> _WICKET_BIT) & 1
+
+        self.runs += bat_runs + ((code >> _EXTRA_BIT) & 1)
+        self.legal_balls += legal
+        self.over_balls += legal
+        self.outs += wicket
+        self.balls += alive
+
+        on_strike = self.strike_end
+        self.end_runs[1] += bat_runs * on_strike
+        self.end_balls[1] += legal * on_strike
+        on_strike = 1 - on_strike
+        self.end_runs[0] += bat_runs * on_strike
+        self.end_balls[0] += legal * on_strike
+
+        if wicket.any():
+            self._wickets(np.flatnonzero(wicket))
+        self.strike_end ^= (code >> _SWAP_BIT) & 1
+        over_end = self.over_balls == 6
+        if over_end.any():
+            self._over_end(np.flatnonzero(over_end))
+
+        still_in = (self.outs < self.wickets) & (self.legal_balls < self.balls_limit)
+        still_in &= self.runs < limit
+        finished = alive & ~still_in
+        if finished.any():
+            self._innings_end(np.flatnonzero(finished))
+        alive &= still_in
+
+    def _batter_slots(self, rows, end):
+        return rows * self.team_size + self.end_batter[end][rows]
+
+    def _wickets(self, rows):
+        # The new batter takes the dismissed striker's end.
+        for end in (0, 1):
+            out = rows[self.strike_end[rows] == end]
+            slots = self._batter_slots(out, end)
+            self.bat_runs[slots] = self.end_runs[end][out]
+            self.bat_balls[slots] = self.end_balls[end][out]
+            self.bat_out[slots] = True
+            self.end_runs[end][out] = 0
+            self.end_balls[end][out] = 0
+            out = out[self.next_bat[out] < self.team_size]
+            self.end_batter[end][out] = self.next_bat[out]
+            self.next_bat[out] += 1
+
+    def _credit_bowlers(self, rows):
+        over = np.minimum(self.over_number[rows], self.overs - 1)
+        slots = rows * self.n_bowlers + self.schedule[over, rows]
+        self.bowl_runs[slots] += self.runs[rows] - self.over_start_runs[rows]
+        self.bowl_wickets[slots] += self.outs[rows] - self.over_start_outs[rows]
+        self.bowl_balls[slots] += self.over_balls[rows]
+
+    def _over_end(self, rows):
+        self._credit_bowlers(rows)
+        self.over_start_runs[rows] = self.runs[rows]
+        self.over_start_outs[rows] = self.outs[rows]
+        self.over_balls[rows] = 0
+        self.over_number[rows] += 1
+        self.strike_end[rows] ^= 1
+
+    def _innings_end(self, rows):
+        self._credit_bowlers(rows)
+        for end in (0, 1):
+            slots = self._batter_slots(rows, end)
+            not_out = ~self.bat_out[slots]
+            slots, at_end = slots[not_out], rows[not_out]
+            self.bat_runs[slots] = self.end_runs[end][at_end]
+            self.bat_balls[slots] = self.end_balls[end][at_end]
+
+    def totals(self):
+        batters, bowlers = (self.n, self.team_size), (self.n, self.n_bowlers)
+        return (self.runs.astype(np.int64), self.outs.astype(np.int64),
+                self.legal_balls.astype(np.int64), self.balls.astype(np.int64),
+                self.bat_runs.reshape(batters), self.bat_balls.reshape(batters),
+                self.bat_out.reshape(batters),
+                self.bowl_balls.reshape(bowlers), self.bowl_runs.reshape(bowlers),
+                self.bowl_wickets.reshape(bowlers))
+
+
+def _run_block(rolls, target, schedule, roll_codes, config, fork=None):
+    """Play every row of *rolls*; return (finished mask, totals tuple)."""
+    n, width = rolls.shape
+    limit = np.iinfo(np.int16).max if target is None else np.minimum(target, 30000).astype(np.int16)
+    # One row per delivery, so each step touches contiguous N-long vectors.
+    codes = roll_codes[np.ascontiguousarray(rolls.T)]
+    block = _Block(n, schedule, config, fork)
+    for t in range(width):
+        if not block.alive.any():
+            break
+        block.step(codes[t], limit)
+    return block.alive == 0, block.totals()
+
+
+def _simulate_rows(draw, rolls, target, schedule, extend, roll_codes, config, fork=None):
+    finished, totals = _run_block(rolls, target, schedule, roll_codes, config, fork)
+    todo = np.flatnonzero(~finished)
+    if len(todo):
+        if not extend:
+            raise ValueError("ran out of rolls before every innings finished")
+        more = draw((len(todo), _roll_block(config)))
+        redo = _simulate_rows(draw, np.hstack([rolls[todo], more]),
+                              None if target is None else target[todo],
+                              schedule[:, todo], extend, roll_codes, config, fork)
+        for column, fixed in zip(totals, redo):
+            column[todo] = fixed
+    return totals
+
+
+def _simulate_chunk(rng, draw, n, target, rolls, roll_codes, config, fork=None):
+    schedule = _bowling_schedule(rng, n, config, fork)
+    extend = rolls is None
+    if extend:
+        balls_left = None if fork is None else config.balls - fork.legal_balls
+        rolls = draw((n, _roll_block(config, balls_left)))
+    return _simulate_rows(draw, rolls, target, schedule, extend, roll_codes, config, fork)
+
+
+def _simulate(rng, draw, n, target, rolls, chunk_size, roll_codes, config, fork=None):
+    parts = []
+    for start in range(0, max(n, 1), chunk_size):
+        stop = min(start + chunk_size, n)
+        parts.append(_simulate_chunk(
+            rng, draw, stop - start,
+            None if target is None else target[start:stop],
+            None if rolls is None else rolls[start:stop], roll_codes, config, fork))
+    return BatchInnings(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def _roll_drawer(rng, faces, roll_weights):
+    """Return a function drawing a uint8 matrix of rolls of a given shape."""
+    if roll_weights is None:
+        return lambda size: rng.integers(0, faces, size=size, dtype=np.uint8)
+    if len(roll_weights) != faces:
+        raise ValueError(f"need {faces} roll weights, got {len(roll_weights)}")
+    table = AliasTable(range(faces), roll_weights)
+    return lambda size: table.sample_array(size, rng).astype(np.uint8)
+
+
+def simulate_innings(n, target=None, rng=None, rolls=None, chunk_size=CHUNK_SIZE, dice=None,
+                     roll_weights=None, config=None):
+    """Simulate *n* independent innings and return a BatchInnings.
+
+    *target* is None for a first innings, or an int or (n,) array of runs
+    to chase. *rng* is a numpy Generator or a seed; results are
+    reproducible for a given seed and *chunk_size*. *rolls* optionally
+    fixes the deliveries as an (n, k) matrix, row i being consumed in order
+    by innings i; a ValueError is raised if any row runs out. *dice*,
+    *roll_weights* and *config* are as for Game.
+    """
+    config = T20 if config is None else config
+    rng = np.random.default_rng(rng)
+    roll_codes = _ROLL_CODES if dice is None else _roll_codes(outcome_table(dice))
+    draw = _roll_drawer(rng, len(roll_codes), roll_weights)
+    if target is not None:
+        target = np.broadcast_to(np.asarray(target, dtype=np.int64), (n,))
+    if rolls is not None:
+        rolls = np.asarray(rolls, dtype=np.uint8)
+        chunk_size = max(n, 1)
+    return _simulate(rng, draw, n, target, rolls, chunk_size, roll_codes, config)
+
+
+def simulate_matches(n, rng=None, chunk_size=CHUNK_SIZE, dice=None, roll_weights=None,
+                     config=None):
+    """Simulate *n* matches; return (first innings, second innings).
+
+    The side batting second chases the first-innings total plus one, so
+    team 2 wins where second.runs > first.runs and ties where they are equal.
+    """
+    rng = np.random.default_rng(rng)
+    first = simulate_innings(n, rng=rng, chunk_size=chunk_size, dice=dice,
+                             roll_weights=roll_weights, config=config)
+    second = simulate_innings(n, target=first.runs + 1, rng=rng, chunk_size=chunk_size,
+                              dice=dice, roll_weights=roll_weights, config=config)
+    return first, second
+
+
+def fork_innings(game):
+    """Return an InningsFork of the innings *game* is playing.
+
+    The innings is the one in game.progress, played by innings_events().
+    Only numbers and a few small arrays are copied, so a fork can be taken
+    after every ball and the game played on regardless.
+    """
+    progress = game.progress
+    if progress is None:
+        raise ValueError("the game has no innings in progress")
+    config = game.config
+    team, target, stage = progress.team, progress.target, progress.stage
+    batting, bowling = team.state, progress.bowling_team.state
+    first = config.first_bowler
+    striker, non_striker = team.striker_idx, team.non_striker_idx
+    if stage in ("over end", "change ends"):
+        # The batters have yet to change ends for the next over.
+        striker, non_striker = non_striker, striker
+    in_over = stage == "ball"
+    weights = game.roll_weights
+    finished = (team.is_all_out() or team.legal_balls >= config.balls
+                or (target is not None and team.runs >= target))
+    return InningsFork(
+        config=config, outcomes=game.outcomes,
+        roll_weights=None if len(set(weights)) == 1 else list(weights),
+        target=target, finished=finished,
+        runs=team.runs, outs=team.outs, legal_balls=team.legal_balls, balls=team.balls,
+        over_number=progress.over_number - in_over,
+        over_balls=progress.over_balls if in_over else 0, in_over=in_over,
+        bowler=-1 if progress.bowler is None else progress.bowler.index - first,
+        striker=striker, non_striker=non_striker, next_bat=team.next_idx,
+        bat_runs=np.array(batting.runs, dtype=np.int64),
+        bat_balls=np.array(batting.balls_faced, dtype=np.int64),
+        bat_out=np.array(batting.out, dtype=bool),
+        bowl_balls=np.array(bowling.bowling_balls[first:], dtype=np.int64),
+        bowl_runs=np.array(bowling.runs_conceded[first:], dtype=np.int64),
+        bowl_wickets=np.array(bowling.wickets_taken[first:], dtype=np.int64))
+
+
+def project_innings(fork, n, rng=None, rolls=None, chunk_size=CHUNK_SIZE):
+    """Play InningsFork *fork* on to the end *n* times; return a Projection.
+
+    The continuations are batched as in simulate_innings(), every row
+    starting from the fork, with the fork's dice, roll weights and format.
+    *rng*, *rolls* and *chunk_size* are as for simulate_innings(), rolls
+    being those after the fork.
+    """
+    rng = np.random.default_rng(rng)
+    config = fork.config
+    roll_codes = _ROLL_CODES if fork.outcomes is OUTCOMES else _roll_codes(fork.outcomes)
+    draw = _roll_drawer(rng, len(roll_codes), fork.roll_weights)
+    target = None if fork.target is None else np.full(n, fork.target, dtype=np.int64)
+    if rolls is not None:
+        rolls = np.asarray(rolls, dtype=np.uint8)
+        chunk_size = max(n, 1)
+    innings = _simulate(rng, draw, n, target, rolls, chunk_size, roll_codes, config, fork)
+    scores = np.bincount(innings.runs) / max(n, 1)
+    if fork.target is None:
+        return Projection(innings, scores, None, None)
+    win = float(np.mean(innings.runs >= fork.target)) if n else 0.0
+    tie = float(np.mean(innings.runs == fork.target - 1)) if n else 0.0
+    return Projection(innings, scores, win, tie)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Benchmarks for the Calculator Cricket hot paths.
+
+    python calculator_cricket_bench.py                       # run them all
+    python calculator_cricket_bench.py match team            # just these
+    python calculator_cricket_bench.py --save bench.json     # keep the results
+    python calculator_cricket_bench.py --baseline bench.json # compare
+
+Each operation is timed in batches long enough for the clock to resolve,
+giving ops/sec over the whole run and p50/p90/p99 per-op latency across
+batches. With a baseline, the change in ops/sec is printed for every
+benchmark and the exit status is 1 if any slowed by more than --threshold.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import namedtuple
+
+from calculator_cricket import DISMISSALS, MAX_WICKETS, Game, Team, abbreviate_name
+
+# A batch is grown until it takes at least this long, so per-batch timings
+# are well clear of the clock's resolution.
+BATCH_NS = 200_000
+MIN_BATCHES = 20
+
+BenchResult = namedtuple("BenchResult", [
+    "name", "ops_per_sec", "mean_ns", "p50_ns", "p90_ns", "p99_ns", "batches", "batch_size",
+])
+Change = namedtuple("Change", ["name", "baseline", "current", "ratio", "regressed"])
+
+
+def _process_ball():
+    game = Game("Team A", "Team B", rng=random.Random(0))
+    team, bowling = game.team1, game.team2
+    bowler = bowling.players[5]
+    rolls = itertools.cycle(random.Random(1).choices(range(10), k=1009))
+
+    def op():
+        if team.outs >= MAX_WICKETS:
+            team.reset()
+        game._process_ball(team, bowling, bowler, next(rolls))
+
+    return op
+
+
+def _dismissal_description():
+    game = Game("Team A", "Team B", rng=random.Random(0))
+    bowling = game.team2
+    hows = itertools.cycle(how for how, _ in DISMISSALS)
+    bowlers = itertools.cycle(bowling.players[5:])
+
+    def op():
+        game._build_dismissal_description(next(hows), next(bowlers), bowling)
+
+    return op
+
+
+def _abbreviate_name():
+    names = itertools.cycle(p.name for p in Team("Team A", random.Random(0)).players)
+
+    def op():
+        abbreviate_name(next(names))
+
+    return op
+
+
+def _team():
+    rng = random.Random(0)
+
+    def op():
+        Team("Team A", rng)
+
+    return op
+
+
+def _play_innings():
+    game = Game("Team A", "Team B", rng=random.Random(0))
+    team, bowling = game.team1, game.team2
+
+    def op():
+        team.reset()
+        bowling.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.play_innings(team, bowling, input_fn=lambda: None)
+
+    return op
+
+
+def _match():
+    game = Game("Team A", "Team B", rng=random.Random(0))
+    seeds = itertools.count()
+
+    def op():
+        game.simulate(seed=next(seeds))
+
+    return op
+
+
+# name -> setup function returning the no-argument operation to time.
+BENCHMARKS = {
+    "process_ball": _process_ball,
+    "dismissal_description": _dismissal_description,
+    "abbreviate_name": _abbreviate_name,
+    "team": _team,
+    "play_innings": _play_innings,
+    "match": _match,
+}
+
+
+def _time_batch(op, batch):
+    loop = itertools.repeat(None, batch)
+    start = time.perf_counter_ns()
+    for _ in loop:
+        op()
+    return time.perf_counter_ns() - start
+
+
+def measure(name, op, min_time=1.0):
+    """Time *op* for at least *min_time* seconds and return a BenchResult."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        batch = 1
+        while _time_batch(op, batch) < BATCH_NS:
+            batch *= 2
+        samples, total = [], 0
+        while total < min_time * 1e9 or len(samples) < MIN_BATCHES:
+            elapsed = _time_batch(op, batch)
+            samples.append(elapsed / batch)
+            total += elapsed
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return summarise(name, samples, batch)
+
+
+def summarise(name, samples, batch_size=1):
+    """Return a BenchResult from per-op times in ns, one per batch of *batch_size*."""
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    mean = statistics.fmean(samples)
+    return BenchResult(
+        name=name,
+        ops_per_sec=1e9 / mean,
+        mean_ns=mean,
+        p50_ns=cuts[49],
+        p90_ns=cuts[89],
+        p99_ns=cuts[98],
+        batches=len(samples),
+        batch_size=batch_size,
+    )
+
+
+def run(names=None, min_time=1.0):
+    """Run the named benchmarks, or all of them, and return their results."""
+    if names is None:
+        names = list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    return {name: measure(name, BENCHMARKS[name](), min_time) for name in names}
+
+
+def save_results(results, path):
+    """Write *results* to *path* as JSON, with the interpreter they ran on."""
+    data = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": {name: r._asdict() for name, r in results.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path):
+    """Read results written by save_results()."""
+    with open(path) as f:
+        data = json.load(f)
+    return {name: BenchResult(**r) for name, r in data["results"].items()}
+
+
+def compare(results, baseline, threshold=0.1):
+    """Return a Change for each benchmark present in both *results* and *baseline*.
+
+    ratio is current ops/sec over baseline ops/sec; a benchmark has
+    regressed when it lost more than *threshold* of its throughput.
+    """
+    return [
+        Change(name, baseline[name].ops_per_sec, r.ops_per_sec,
+               r.ops_per_sec / baseline[name].ops_per_sec,
+               r.ops_per_sec < baseline[name].ops_per_sec * (1 - threshold))
+        for name, r in results.items() if name in baseline
+    ]
+
+
+def _format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def add_report_arguments(parser):
+    """Add the --save, --baseline and --threshold options used by report()."""
+    parser.add_argument("--save", metavar="PATH", help="write the results to PATH as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results in PATH")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fractional loss in ops/sec counted as a regression (default: 0.1)")
+
+
+def report(results, args):
+    """Print *results*, then save and compare them as *args* ask.
+
+    Returns the exit status: 1 if anything regressed against the baseline.
+    """
+    print(f"{'benchmark':<22} {'ops/sec':>12} {'p50':>10} {'p90':>10} {'p99':>10}")
+    for r in results.values():
+        print(f"{r.name:<22} {r.ops_per_sec:>12,.0f} {_format_ns(r.p50_ns):>10} "
+              f"{_format_ns(r.p90_ns):>10} {_format_ns(r.p99_ns):>10}")
+
+    if args.save:
+        save_results(results, args.save)
+
+    if args.baseline:
+        changes = compare(results, load_results(args.baseline), args.threshold)
+        print(f"\n{'benchmark':<22} {'baseline':>12} {'now':>12} {'change':>8}")
+        for c in changes:
+            flag = "  REGRESSED" if c.regressed else ""
+            print(f"{c.name:<22} {c.baseline:>12,.0f} {c.current:>12,.0f} "
+                  f"{c.ratio - 1:>+8.1%}{flag}")
+        if any(c.regressed for c in changes):
+            return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="seconds to spend timing each benchmark (default: 1.0)")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        results = run(args.names or None, args.min_time)
+    except ValueError as e:
+        parser.error(str(e))
+    return report(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,44 @@
 #!/usr/bin/env python3
 """PyGame GUI for Calculator Cricket."""
 
+import os
 import sys
 import math
+import heapq
+import struct
+import itertools
 import random
+from functools import lru_cache
 from enum import Enum
 
 import pygame
 
 from calculator_cricket import (
-    Game, Team, Player, BallResult,
-    MAX_OVERS, MAX_PER_BOWLER, TEAM_SIZE, MAX_WICKETS,
+    Game, Team, Player, BallResult, FORMATS, T20,
 )
+from calculator_cricket_sampling import BufferedRolls
+from calculator_cricket_snapshot import SnapshotReader, SnapshotWriter, read_game, write_game
+
+try:
+    from calculator_cricket_solver import ChaseTable, solve_chase
+except ImportError:
+    # The odds panel needs NumPy; without it the panel stays empty.
+    ChaseTable = solve_chase = None
 
 # ---------- Constants ----------
 
 WIDTH, HEIGHT = 1360, 900
 
+# Video drivers whose event.wait() sleeps until an event arrives. Others,
+# such as "dummy", emulate it by polling every millisecond, so the event
+# loop polls them itself every IDLE_POLL_MS instead.
+BLOCKING_DRIVERS = {"x11", "wayland", "windows", "cocoa"}
+IDLE_POLL_MS = 50
+
+# Rendered strings kept by CricketGUI.text. A full scorecard and both
+# innings' names come to a few hundred.
+TEXT_CACHE_SIZE = 1024
+
 COLORS = {
     'bg':          (34, 85, 34),
     'header_bg':   (20, 60, 20),
@@ -47,6 +69,31 @@ COLORS = {
 }
 
 
+# Screen regions of the match view, in drawing order. Together they tile
+# the window. The wagon wheel overlaps the right-hand end of the panels
+# from "over" to "scorecard", so it is repainted whenever one of them is.
+REGIONS = {
+    'header':     pygame.Rect(0, 0, WIDTH, 50),
+    'match_info': pygame.Rect(0, 50, WIDTH, 40),
+    'score':      pygame.Rect(0, 90, 1024, 60),
+    'odds':       pygame.Rect(1024, 90, WIDTH - 1024, 60),
+    'over':       pygame.Rect(0, 150, WIDTH, 70),
+    'bowler':     pygame.Rect(0, 220, WIDTH, 30),
+    'ball':       pygame.Rect(0, 250, WIDTH, 80),
+    'scorecard':  pygame.Rect(0, 330, WIDTH, 530),
+    'wagon':      pygame.Rect(1024, 150, 336, 710),
+    'status':     pygame.Rect(0, 860, WIDTH, 40),
+}
+
+# The wagon wheel's pitch circle, with the batsman at its centre.
+WAGON_CENTRE = (REGIONS['wagon'].centerx, REGIONS['wagon'].y + 240)
+WAGON_RADIUS = 120
+
+# Everything a delivery can change.
+DELIVERY_REGIONS = ('match_info', 'score', 'odds', 'over', 'bowler', 'ball', 'scorecard',
+                    'wagon')
+
+
 class GamePhase(Enum):
     TOSS_CALL = 1
     TOSS_RESULT = 2
@@ -58,8 +105,43 @@ class GamePhase(Enum):
     OVER_COMPLETE = 8
 
 
+# Phases drawn as a whole screen rather than the match view.
+FULL_SCREEN_PHASES = (GamePhase.TOSS_CALL, GamePhase.TOSS_RESULT, GamePhase.TOSS_CHOICE,
+                      GamePhase.MATCH_RESULT)
+
+# Phases in which SPACE moves the match on, and so auto-play and
+# fast-forward apply.
+PLAY_PHASES = (GamePhase.INNINGS_READY, GamePhase.WAITING_FOR_BALL,
+               GamePhase.OVER_COMPLETE, GamePhase.INNINGS_COMPLETE)
+
+# Fast-forward keys, each with the phases it stops at.
+FAST_FORWARD_KEYS = {
+    pygame.K_f: (GamePhase.OVER_COMPLETE, GamePhase.INNINGS_COMPLETE, GamePhase.MATCH_RESULT),
+    pygame.K_i: (GamePhase.INNINGS_COMPLETE, GamePhase.MATCH_RESULT),
+    pygame.K_m: (GamePhase.MATCH_RESULT,),
+}
+
+# CricketGUI.snapshot() fields after the game: phase, toss won, innings
+# number, rolls used from the current block, scorecard scroll, over complete
+# pending, last roll (-1 for none), last result shown, the two batters shown,
+# and the counts of deliveries this over and of bowlers this innings.
+_GUI_STATE = struct.Struct("<B?BIi?h?HHHH")
+
+# Delay between steps in auto-play.
+AUTO_PLAY_MS = 600
+# Fast-forward plays for one frame at this rate between redraws.
+FAST_FORWARD_FPS = 30
+
+
+@lru_cache(maxsize=None)
+def _solved_odds(config):
+    """The odds panel's ChaseTable for *config*, solved on first use."""
+    return solve_chase(config=config)
+
+
 class CricketGUI:
-    def __init__(self, team1_name="Team 1", team2_name="Team 2"):
+    def __init__(self, team1_name="Team 1", team2_name="Team 2", seed=None, config=None,
+                 odds=None, log=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Calculator Cricket")
@@ -71,9 +153,21 @@ class CricketGUI:
         self.font_small = pygame.font.SysFont("monospace", 18)
         self.font_tiny = pygame.font.SysFont("monospace", 14)
         self.font_result = pygame.font.SysFont("monospace", 40, bold=True)
-
-        # Game objects
-        self.game = Game(team1_name, team2_name)
+        # text(font, string, color) renders antialiased text, reusing the
+        # surface when the same string was drawn recently. Callers only blit
+        # the result, so one surface can be shared. text.cache_info() gives
+        # the hit and miss counts.
+        self.text = lru_cache(maxsize=TEXT_CACHE_SIZE)(self._render_text)
+
+        # Game objects. A seed fixes the teams, toss and every roll, so the
+        # same seed replays the same match. *config* is the MatchConfig,
+        # T20 by default.
+        rng = random if seed is None else random.Random(seed)
+        self.game = Game(team1_name, team2_name, rng=rng, config=config)
+        self.config = self.game.config
+        self.rolls = BufferedRolls(len(self.game.outcomes), seed=rng.getrandbits(64))
+        # Every delivery is written to *log*, a BallLogWriter, if given.
+        self.log = log
         self.phase = GamePhase.TOSS_CALL
 
         # Toss state
@@ -87,10 +181,9 @@ class CricketGUI:
         self.batting_team = None
         self.bowling_team = None
         self.target = None
+        self.innings = None
         self.over_number = 0
-        self.balls_this_over = 0
         self.current_bowler = None
-        self.last_bowler = None
         self.current_over_results = []
         self.last_result = None
         self.last_roll = None
@@ -98,22 +191,76 @@ class CricketGUI:
         self.scorecard_scroll = 0
         self.milestone_message = None
         self.over_complete_pending = False
-        self.bowlers = []
         self.current_over_angles = []
+        self.top_bat_idx = self.bot_bat_idx = 0
+        self.bowler_order = []
 
-    def _select_bowler(self):
-        eligible = [b for b in self.bowlers
-                    if b.bowling_balls < MAX_PER_BOWLER * 6 and b is not self.last_bowler]
-        return random.choice(eligible)
+        # The odds panel reads the win probability and projected score off
+        # *odds*, a ChaseTable for this format, after each delivery. By
+        # default one is solved once per format, before play starts.
+        if odds is None and solve_chase is not None:
+            odds = _solved_odds(self.config)
+        if odds is not None and odds.win_table.shape[:2] != (self.config.wickets + 1,
+                                                             self.config.balls + 1):
+            raise ValueError("odds table is for a different match format")
+        self.odds = odds
+        self.win_chance = None
+        self.projected = None
+
+        # Everything in the match view that stays put during an innings,
+        # composed once; see _build_background.
+        self.background = self._build_background()
+
+        # Regions to repaint on the next draw(); see _invalidate. Each
+        # painter draws only what changes, over the region's background.
+        self.painters = {
+            'header': None,
+            'match_info': self._draw_match_info,
+            'score': self._draw_score_banner,
+            'odds': self._draw_odds,
+            'over': self._draw_current_over_and_batsmen,
+            'bowler': self._draw_bowler_info,
+            'ball': self._draw_ball_result,
+            'scorecard': self._draw_scorecard,
+            'wagon': self._draw_wagon_wheel,
+            'status': None,
+        }
+        self.dirty = set()
+        self.full_redraw = True
+
+        # Pending (due tick in ms, sequence, callback) for schedule().
+        self.timers = []
+        self.timer_seq = itertools.count()
+
+        # A token per run of auto-play or fast-forward, so that stopping
+        # one strands any step it still has scheduled.
+        self.auto_play = None
+        self.fast_forward = None
+        self.fast_forward_stops = ()
+
+    @staticmethod
+    def _render_text(font, string, color):
+        return font.render(string, True, color)
+
+    def _invalidate(self, *regions):
+        """Mark *regions* for repainting, or the whole window if none are given."""
+        if regions:
+            self.dirty.update(regions)
+        else:
+            self.full_redraw = True
+
+    def _record(self):
+        """Return the log's record function for the current innings, or None."""
+        return self.game.recorders(self.log)[self.innings_number - 1]
 
     def _start_innings(self, batting, bowling, target=None):
         self.batting_team = batting
         self.bowling_team = bowling
         self.target = target
         self.innings_number += 1
-        self.over_number = 1
-        self.balls_this_over = 0
-        self.last_bowler = None
+        self.innings = self.game.innings_events(batting, bowling, target,
+                                                roll_fn=self.rolls.roll,
+                                                record=self._record())
         self.current_over_results = []
         self.last_result = None
         self.last_roll = None
@@ -125,62 +272,53 @@ class CricketGUI:
         self.top_bat_idx = batting.striker_idx
         self.bot_bat_idx = batting.non_striker_idx
         self.bowler_order = []
-        self.bowlers = bowling.players[5:TEAM_SIZE]
-        self.current_bowler = self._select_bowler()
-        self.bowler_order.append(self.current_bowler)
+        self._start_over()
+        self._update_odds()
+        self.background = self._build_background()
+        self._invalidate()
+
+    def _start_over(self):
+        event = next(self.innings)
+        self.over_number = event.over_number
+        self.current_bowler = event.bowler
+        if self.current_bowler not in self.bowler_order:
+            self.bowler_order.append(self.current_bowler)
 
     def _end_over(self):
         """Handle end-of-over housekeeping."""
-        self.last_bowler = self.current_bowler
-        # Swap strike
-        self.batting_team.striker_idx, self.batting_team.non_striker_idx = (
-            self.batting_team.non_striker_idx, self.batting_team.striker_idx)
-        self.over_number += 1
-        self.balls_this_over = 0
         self.current_over_results = []
         self.current_over_angles = []
-        if self.over_number <= MAX_OVERS:
-            self.current_bowler = self._select_bowler()
-            if self.current_bowler not in self.bowler_order:
-                self.bowler_order.append(self.current_bowler)
-
-    def _check_innings_end(self):
-        """Return True if innings should end."""
-        if self.batting_team.is_all_out():
-            return True
-        if self.target is not None and self.batting_team.runs >= self.target:
-            return True
-        if self.batting_team.legal_balls >= MAX_OVERS * 6:
-            return True
-        return False
+        self._start_over()
+        self._invalidate('over', 'bowler', 'ball', 'wagon')
 
     def bowl_delivery(self):
-        roll = random.randint(0, 9)
+        delivery = next(self.innings)
+        self._invalidate(*DELIVERY_REGIONS)
+        result, roll, striker = delivery.result, delivery.roll, delivery.striker
         self.last_roll = roll
-        self.last_batsman_name = self.batting_team.striker.short_name
+        self.last_batsman_name = striker.short_name
         self.milestone_message = None
 
-        old_striker_idx = self.batting_team.striker_idx
-        runs_before = self.batting_team.striker.runs
-
-        result = self.game._process_ball(
-            self.batting_team, self.bowling_team, self.current_bowler, roll)
+        old_striker_idx = striker.index
+        runs_before = striker.runs - (result.runs if result.is_legal else 0)
 
         self.last_result = result
         self.current_over_results.append((roll, result))
 
-        # Generate wagon wheel angle and length for scoring legal deliveries
+        # Generate wagon wheel angle and length for scoring legal deliveries.
+        # They come from the game's rng, so a snapshot carries them on.
+        rng = self.game.rng
         if result.runs > 0 and result.is_legal:
-            angle = random.uniform(math.radians(30), math.radians(330))
+            angle = rng.uniform(math.radians(30), math.radians(330))
             runs = result.runs
             if runs >= 4:
                 frac = 1.0
             elif runs == 3:
-                frac = random.uniform(5/8, 7/8)
+                frac = rng.uniform(5/8, 7/8)
             elif runs == 2:
-                frac = random.uniform(2/4, 3/4)
+                frac = rng.uniform(2/4, 3/4)
             else:
-                frac = random.uniform(1/4, 2/4)
+                frac = rng.uniform(1/4, 2/4)
             self.current_over_angles.append((angle, frac))
         else:
             self.current_over_angles.append(None)
@@ -195,25 +333,139 @@ class CricketGUI:
 
         # Check milestones on the batsman who faced the ball
         if not result.is_wicket:
-            runs_after = self.batting_team.striker.runs
+            runs_after = striker.runs
             if runs_before < 100 <= runs_after:
                 self.milestone_message = "CENTURY!"
             elif runs_before < 50 <= runs_after:
                 self.milestone_message = "HALF-CENTURY!"
 
-        if result.is_legal:
-            self.balls_this_over += 1
-
-        # Check if innings is done
-        if self._check_innings_end():
-            self.phase = GamePhase.INNINGS_COMPLETE
-        # Flag over as complete (transition happens on next SPACE)
-        elif self.balls_this_over >= 6:
-            self.over_complete_pending = True
+        # The over or innings ended with this ball: the stream's next events
+        # are bookkeeping only, so take them now.
+        if delivery.last_ball:
+            over_end = next(self.innings)
+            if over_end.innings_over:
+                next(self.innings)
+                self.phase = GamePhase.INNINGS_COMPLETE
+            else:
+                # Transition to the next over happens on the next SPACE
+                self.over_complete_pending = True
+        self._update_odds()
+
+    def _update_odds(self):
+        """Look up the odds panel's figures for the batting side."""
+        odds, team = self.odds, self.batting_team
+        if odds is None or team is None:
+            self.win_chance = self.projected = None
+            return
+        balls_left = self.config.balls - team.legal_balls
+        wickets_left = self.config.wickets - team.outs
+        needed = None
+        self.win_chance = None
+        if self.target is not None:
+            # Beyond the table the chase is as good as lost.
+            needed = min(self.target - team.runs, odds.max_needed)
+            self.win_chance = odds.win(needed, balls_left, wickets_left)
+        self.projected = team.runs + odds.expected_runs(needed, balls_left, wickets_left)
 
     def _format_overs(self, legal_balls):
         return Game._format_overs(legal_balls)
 
+    # ---------- Snapshots ----------
+
+    def snapshot(self):
+        """Return the match and what the window shows as bytes.
+
+        The format is calculator_cricket_snapshot's, with the view's state
+        after the game. Auto-play and fast-forward are not saved.
+        """
+        w = SnapshotWriter()
+        write_game(w, self.game)
+        block_state, skip = self.rolls.getstate()
+        w.rng_state(block_state)
+        results = self.current_over_results
+        w.pack(_GUI_STATE, self.phase.value, self.toss_won, self.innings_number, skip,
+               self.scorecard_scroll, self.over_complete_pending,
+               -1 if self.last_roll is None else self.last_roll,
+               self.last_result is not None, self.top_bat_idx, self.bot_bat_idx,
+               len(results), len(self.bowler_order))
+        w.strings([self.toss_call, self.toss_flip, self.toss_message,
+                   self.last_batsman_name, self.milestone_message]
+                  + [field for _, result in results
+                     for field in (result.desc, result.new_batsman)])
+        w.ints([value for roll, result in results
+                for value in (roll, result.runs, result.is_wicket, result.is_legal)])
+        # An undrawn delivery is stored as a NaN angle.
+        w.pack(f"{2 * len(results)}d",
+               *[value for shot in self.current_over_angles
+                 for value in (shot or (math.nan, math.nan))])
+        w.ints([bowler.index for bowler in self.bowler_order])
+        return w.getvalue()
+
+    def restore(self, data):
+        """Carry on from bytes returned by snapshot(), in this window.
+
+        Raises ValueError, leaving the window as it was, if *data* is not a
+        valid snapshot.
+        """
+        r = SnapshotReader(data)
+        game = read_game(r)
+        block_state = r.rng_state()
+        (phase, toss_won, innings_number, skip, scroll, over_complete_pending, last_roll,
+         has_last_result, top_bat_idx, bot_bat_idx, n_results, n_bowlers) = r.unpack(_GUI_STATE)
+        (toss_call, toss_flip, toss_message, last_batsman_name, milestone_message,
+         *names) = r.strings(5 + 2 * n_results)
+        values = r.ints(4 * n_results)
+        results = [(values[i], BallResult(names[2 * n], values[i + 1], bool(values[i + 2]),
+                                          bool(values[i + 3]), names[2 * n + 1]))
+                   for n, i in enumerate(range(0, 4 * n_results, 4))]
+        angles = r.unpack(f"{2 * n_results}d")
+        angles = [None if math.isnan(angle) else (angle, frac)
+                  for angle, frac in zip(angles[::2], angles[1::2])]
+        bowlers = r.ints(n_bowlers)
+        r.finish()
+        phase = GamePhase(phase)
+        size = game.config.team_size
+        if not all(0 <= i < size for i in bowlers + [top_bat_idx, bot_bat_idx]):
+            raise ValueError("player index out of range")
+        if game.progress is not None and innings_number not in (1, 2):
+            raise ValueError("innings number out of range")
+        rolls = BufferedRolls(len(game.outcomes))
+        rolls.setstate((block_state, skip))
+        # A snapshot of another format needs that format's odds.
+        odds = self.odds
+        if game.config != self.config:
+            odds = None if solve_chase is None else _solved_odds(game.config)
+
+        self.game, self.config, self.rolls, self.phase = game, game.config, rolls, phase
+        self.odds = odds
+        self.toss_call, self.toss_flip = toss_call, toss_flip
+        self.toss_won, self.toss_message = toss_won, toss_message
+        self.innings_number = innings_number
+        progress = game.progress
+        if progress is None:
+            self.batting_team = self.bowling_team = self.target = self.innings = None
+            self.over_number, self.current_bowler = 0, None
+        else:
+            self.batting_team, self.bowling_team = progress.team, progress.bowling_team
+            self.target = progress.target
+            self.over_number, self.current_bowler = progress.over_number, progress.bowler
+            self.innings = game.resume_innings(rolls.roll, self._record())
+        self.current_over_results = results
+        self.last_result = results[-1][1] if has_last_result and results else None
+        self.last_roll = None if last_roll < 0 else last_roll
+        self.last_batsman_name = last_batsman_name
+        self.scorecard_scroll = scroll
+        self.milestone_message = milestone_message
+        self.over_complete_pending = over_complete_pending
+        self.current_over_angles = angles
+        self.top_bat_idx, self.bot_bat_idx = top_bat_idx, bot_bat_idx
+        bowling = self.bowling_team or game.team2
+        self.bowler_order = [bowling.players[i] for i in bowlers]
+        self.auto_play = self.fast_forward = None
+        self._update_odds()
+        self.background = self._build_background()
+        self._invalidate()
+
     # ---------- Event handling ----------
 
     def handle_event(self, event):
@@ -227,9 +479,34 @@ class CricketGUI:
             self._handle_key(event.key)
         if event.type == pygame.MOUSEWHEEL:
             self.handle_scroll(-event.y)
+        if event.type == pygame.VIDEOEXPOSE:
+            self._invalidate()
         return True
 
     def _handle_key(self, key):
+        if self.phase in PLAY_PHASES:
+            if self.fast_forward is not None:
+                # Any key stops a fast-forward where it is.
+                self.fast_forward = None
+                return
+            if key == pygame.K_a:
+                self._toggle_auto_play()
+                return
+            if key in FAST_FORWARD_KEYS:
+                self._start_fast_forward(FAST_FORWARD_KEYS[key])
+                return
+        self._press(key)
+
+    def _press(self, key):
+        before = self.phase
+        self._dispatch_key(key)
+        if self.phase is not before:
+            if self.phase in FULL_SCREEN_PHASES or before in FULL_SCREEN_PHASES:
+                self._invalidate()
+            else:
+                self._invalidate('ball')
+
+    def _dispatch_key(self, key):
         if self.phase == GamePhase.TOSS_CALL:
             if key == pygame.K_h:
                 self._do_toss("Heads")
@@ -242,7 +519,7 @@ class CricketGUI:
                     self.phase = GamePhase.TOSS_CHOICE
                 else:
                     # Opposition decides
-                    choice = random.choice(["bat", "bowl"])
+                    choice = self.game.rng.choice(["bat", "bowl"])
                     # Opposition chose — invert for team1
                     if choice == "bat":
                         self.game.batting_first = self.game.team2
@@ -299,9 +576,56 @@ class CricketGUI:
             if key == pygame.K_SPACE:
                 return  # will be caught by quit
 
+    def _toggle_auto_play(self):
+        if self.auto_play is None:
+            self.auto_play = next(self.timer_seq)
+            self._schedule_auto_play()
+        else:
+            self.auto_play = None
+        self._invalidate('ball')
+
+    def _schedule_auto_play(self):
+        token = self.auto_play
+        self.schedule(AUTO_PLAY_MS, lambda: self._auto_play_step(token))
+
+    def _auto_play_step(self, token):
+        if token != self.auto_play:
+            return
+        self._press(pygame.K_SPACE)
+        if self.phase in PLAY_PHASES:
+            self._schedule_auto_play()
+        else:
+            self.auto_play = None
+
+    def _start_fast_forward(self, stops):
+        """Play on as SPACE would, without pausing, until a phase in *stops*.
+
+        Each step takes the same path as a key press, so the scorecard and
+        wagon wheel end up exactly as if every ball had been bowled by
+        hand. Only the states in between go undrawn.
+        """
+        self.auto_play = None
+        self.fast_forward = next(self.timer_seq)
+        self.fast_forward_stops = stops
+        self._fast_forward_slice(self.fast_forward)
+
+    def _fast_forward_slice(self, token):
+        if token != self.fast_forward:
+            return
+        deadline = pygame.time.get_ticks() + 1000 // FAST_FORWARD_FPS
+        while True:
+            self._press(pygame.K_SPACE)
+            if self.phase in self.fast_forward_stops or self.phase not in PLAY_PHASES:
+                self.fast_forward = None
+                return
+            if pygame.time.get_ticks() >= deadline:
+                # Let the loop draw a frame, then carry on.
+                self.schedule(0, lambda: self._fast_forward_slice(token))
+                return
+
     def _do_toss(self, call):
         self.toss_call = call
-        self.toss_flip = random.choice(["Heads", "Tails"])
+        self.toss_flip = self.game.rng.choice(["Heads", "Tails"])
         self.toss_won = (self.toss_call == self.toss_flip)
         if self.toss_won:
             self.toss_message = f"It's {self.toss_flip}! You win the toss!"
@@ -310,69 +634,157 @@ class CricketGUI:
         self.phase = GamePhase.TOSS_RESULT
 
     def handle_scroll(self, direction):
+        # The scorecard is only shown in the match view.
+        if self.phase not in PLAY_PHASES:
+            return
         self.scorecard_scroll += direction * 20
         self.scorecard_scroll = max(0, self.scorecard_scroll)
+        self._invalidate('scorecard')
 
     # ---------- Drawing ----------
 
     def draw(self):
-        self.screen.fill(COLORS['bg'])
+        """Repaint whatever changed since the last draw and push it to the display.
+
+        Only the invalidated regions are redrawn and updated, so an idle
+        screen costs nothing per frame. Full-screen phases have no regions,
+        so anything dirty repaints them whole.
+        """
+        if self.dirty and self.phase in FULL_SCREEN_PHASES:
+            self.full_redraw = True
+        if self.full_redraw:
+            if self.phase in (GamePhase.TOSS_CALL, GamePhase.TOSS_RESULT, GamePhase.TOSS_CHOICE):
+                self._draw_toss_screen()
+            elif self.phase == GamePhase.MATCH_RESULT:
+                self._draw_result_screen()
+            else:
+                for name in self.painters:
+                    self._paint(name)
+            pygame.display.flip()
+        elif self.dirty:
+            dirty = self.dirty
+            if 'wagon' not in dirty and any(
+                    REGIONS[name].colliderect(REGIONS['wagon']) for name in dirty):
+                dirty.add('wagon')
+            rects = []
+            for name in self.painters:
+                if name in dirty:
+                    self._paint(name)
+                    rects.append(REGIONS[name])
+            pygame.display.update(rects)
+        self.full_redraw = False
+        self.dirty = set()
+
+    def _paint(self, name):
+        # Restore the region's background, then draw its contents clipped,
+        # so nothing strays into a neighbour that is not being repainted.
+        rect = REGIONS[name]
+        self.screen.blit(self.background, rect, rect)
+        if self.painters[name] is not None:
+            self.screen.set_clip(rect)
+            self.painters[name]()
+            self.screen.set_clip(None)
 
-        if self.phase in (GamePhase.TOSS_CALL, GamePhase.TOSS_RESULT, GamePhase.TOSS_CHOICE):
-            self._draw_toss_screen()
-        elif self.phase == GamePhase.MATCH_RESULT:
-            self._draw_result_screen()
-        else:
-            self._draw_header()
-            self._draw_match_info()
-            self._draw_score_banner()
-            self._draw_current_over_and_batsmen()
-            self._draw_bowler_info()
-            self._draw_ball_result()
-            self._draw_scorecard()
-            self._draw_wagon_wheel()
-            self._draw_status_bar()
-
-        pygame.display.flip()
-
-    def _draw_header(self):
-        pygame.draw.rect(self.screen, COLORS['header_bg'], (0, 0, WIDTH, 50))
-        text = self.font_large.render("Calculator Cricket", True, COLORS['text_white'])
-        self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 10))
+    def _build_background(self):
+        """Compose the panels, separators and fixed labels of the match view.
+
+        Rebuilt when an innings starts; the window is a fixed size.
+        """
+        surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        surface.fill(COLORS['bg'])
+        draw, blit = pygame.draw, surface.blit
+
+        # Header
+        self._draw_header(surface)
+
+        # Match info
+        draw.rect(surface, COLORS['panel_bg'], (0, 50, WIDTH, 40))
+        draw.line(surface, COLORS['separator'], (0, 50), (WIDTH, 50))
+
+        # Score banner, with the odds panel on the right
+        draw.rect(surface, COLORS['header_bg'], (0, 90, WIDTH, 60))
+        odds_x = REGIONS['odds'].x
+        draw.line(surface, COLORS['separator'], (odds_x, 90), (odds_x, 150))
+
+        # Current over and batsmen
+        draw.rect(surface, COLORS['panel_bg'], (0, 150, WIDTH // 2, 70))
+        draw.rect(surface, COLORS['panel_bg'], (WIDTH // 2, 150, WIDTH // 2, 70))
+        draw.line(surface, COLORS['separator'], (WIDTH // 2, 150), (WIDTH // 2, 220))
+        draw.line(surface, COLORS['separator'], (0, 150), (WIDTH, 150))
+
+        # Bowler
+        draw.rect(surface, COLORS['panel_bg'], (0, 220, WIDTH, 30))
+        draw.line(surface, COLORS['separator'], (0, 220), (WIDTH, 220))
+
+        # Ball result
+        draw.rect(surface, COLORS['bg'], (0, 250, WIDTH, 80))
+        draw.line(surface, COLORS['separator'], (0, 250), (WIDTH, 250))
+
+        # Scorecard
+        draw.rect(surface, COLORS['bg'], (0, 330, WIDTH, 530))
+        draw.line(surface, COLORS['separator'], (0, 330), (WIDTH, 330))
+        blit(self.text(self.font_small, "SCORECARD", COLORS['text_gray']), (15, 335))
+
+        # Wagon wheel
+        panel_x, panel_y, panel_w, panel_h = REGIONS['wagon']
+        draw.rect(surface, COLORS['panel_bg'], (panel_x, panel_y, panel_w, panel_h))
+        draw.line(surface, COLORS['separator'], (panel_x, panel_y), (panel_x, panel_y + panel_h))
+        title = self.text(self.font_small, "WAGON WHEEL", COLORS['text_gray'])
+        blit(title, (panel_x + panel_w // 2 - title.get_width() // 2, panel_y + 5))
+        draw.circle(surface, COLORS['pitch'], WAGON_CENTRE, WAGON_RADIUS)
+        blit(self.text(self.font_tiny, "This Over:", COLORS['text_gray']),
+             (panel_x + 15, panel_y + 400))
+
+        # Status bar
+        draw.rect(surface, COLORS['header_bg'], (0, 860, WIDTH, 40))
+        text = self.text(self.font_tiny,
+                         "SPACE = Bowl  |  A = Auto-play  |  F/I/M = Skip to end of over/innings/match"
+                         "  |  ESC = Quit  |  Scroll = Scorecard",
+                         COLORS['text_gray'])
+        blit(text, (WIDTH // 2 - text.get_width() // 2, 872))
+        return surface
+
+    def _draw_header(self, surface):
+        pygame.draw.rect(surface, COLORS['header_bg'], (0, 0, WIDTH, 50))
+        text = self.text(self.font_large, "Calculator Cricket", COLORS['text_white'])
+        surface.blit(text, (WIDTH // 2 - text.get_width() // 2, 10))
 
     def _draw_match_info(self):
-        pygame.draw.rect(self.screen, COLORS['panel_bg'], (0, 50, WIDTH, 40))
-        pygame.draw.line(self.screen, COLORS['separator'], (0, 50), (WIDTH, 50))
-
         innings_text = f"{'1st' if self.innings_number == 1 else '2nd'} Innings"
-        overs_text = f"Overs: {self._format_overs(self.batting_team.legal_balls)}/{MAX_OVERS}"
+        overs_text = f"Overs: {self._format_overs(self.batting_team.legal_balls)}/{self.config.overs}"
 
         parts = [innings_text, overs_text]
         if self.target is not None:
             remaining = self.target - self.batting_team.runs
-            balls_left = MAX_OVERS * 6 - self.batting_team.legal_balls
+            balls_left = self.config.balls - self.batting_team.legal_balls
             parts.append(f"Target: {self.target}")
             parts.append(f"Need {remaining} from {balls_left} balls")
 
         info_str = "  |  ".join(parts)
-        text = self.font_small.render(info_str, True, COLORS['text_gray'])
+        text = self.text(self.font_small, info_str, COLORS['text_gray'])
         self.screen.blit(text, (20, 60))
 
     def _draw_score_banner(self):
-        pygame.draw.rect(self.screen, COLORS['header_bg'], (0, 90, WIDTH, 60))
         overs = self._format_overs(self.batting_team.legal_balls)
         score_str = f"{self.batting_team.name}: {self.batting_team.runs}/{self.batting_team.outs}  ({overs} ov)"
-        text = self.font_large.render(score_str, True, COLORS['text_yellow'])
+        text = self.text(self.font_large, score_str, COLORS['text_yellow'])
         self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 103))
 
+    def _draw_odds(self):
+        if self.projected is None:
+            return
+        x, y = REGIONS['odds'].x + 20, REGIONS['odds'].y
+        lines = [f"Projected: {self.projected:.0f}"]
+        if self.win_chance is not None:
+            lines.insert(0, f"Win chance: {self.win_chance:.1%}")
+        y += 30 - 12 * len(lines)
+        for line in lines:
+            self.screen.blit(self.text(self.font_small, line, COLORS['text_white']), (x, y))
+            y += 24
+
     def _draw_current_over_and_batsmen(self):
         # Left panel: current over
-        pygame.draw.rect(self.screen, COLORS['panel_bg'], (0, 150, WIDTH // 2, 70))
-        pygame.draw.rect(self.screen, COLORS['panel_bg'], (WIDTH // 2, 150, WIDTH // 2, 70))
-        pygame.draw.line(self.screen, COLORS['separator'], (WIDTH // 2, 150), (WIDTH // 2, 220))
-        pygame.draw.line(self.screen, COLORS['separator'], (0, 150), (WIDTH, 150))
-
-        label = self.font_tiny.render(f"Over {self.over_number}", True, COLORS['text_gray'])
+        label = self.text(self.font_tiny, f"Over {self.over_number}", COLORS['text_gray'])
         self.screen.blit(label, (15, 155))
 
         x = 15
@@ -388,7 +800,7 @@ class CricketGUI:
                 btext = "NB"
             else:
                 btext = str(result.runs)
-            bt = self.font_tiny.render(btext, True, COLORS['text_white'])
+            bt = self.text(self.font_tiny, btext, COLORS['text_white'])
             self.screen.blit(bt, (x + 15 - bt.get_width() // 2, 192 - bt.get_height() // 2))
             x += 36
 
@@ -403,61 +815,54 @@ class CricketGUI:
             bot_str = f"{'*' if bot_on_strike else ' '} {bot.short_name}  {bot.runs} ({bot.balls_faced}b)"
             top_color = COLORS['text_yellow'] if top_on_strike else COLORS['text_gray']
             bot_color = COLORS['text_yellow'] if bot_on_strike else COLORS['text_gray']
-            self.screen.blit(self.font_small.render(top_str, True, top_color), (WIDTH // 2 + 15, 160))
-            self.screen.blit(self.font_small.render(bot_str, True, bot_color), (WIDTH // 2 + 15, 185))
+            self.screen.blit(self.text(self.font_small, top_str, top_color), (WIDTH // 2 + 15, 160))
+            self.screen.blit(self.text(self.font_small, bot_str, bot_color), (WIDTH // 2 + 15, 185))
 
     def _draw_bowler_info(self):
-        pygame.draw.rect(self.screen, COLORS['panel_bg'], (0, 220, WIDTH, 30))
-        pygame.draw.line(self.screen, COLORS['separator'], (0, 220), (WIDTH, 220))
         if self.current_bowler:
             overs = self._format_overs(self.current_bowler.bowling_balls)
             b_str = (f"Bowling: {self.current_bowler.short_name}  "
                      f"{overs} ov  {self.current_bowler.wickets_taken}/{self.current_bowler.runs_conceded}")
-            text = self.font_small.render(b_str, True, COLORS['text_white'])
+            text = self.text(self.font_small, b_str, COLORS['text_white'])
             self.screen.blit(text, (15, 225))
 
     def _draw_ball_result(self):
-        pygame.draw.rect(self.screen, COLORS['bg'], (0, 250, WIDTH, 80))
-        pygame.draw.line(self.screen, COLORS['separator'], (0, 250), (WIDTH, 250))
-
         if self.phase == GamePhase.INNINGS_READY:
-            text = self.font_medium.render("Press SPACE to start innings", True, COLORS['text_white'])
+            text = self.text(self.font_medium, "Press SPACE to start innings", COLORS['text_white'])
             self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 270))
         elif self.phase == GamePhase.OVER_COMPLETE:
             over_done = self.over_number
-            over_text = self.font_result.render(f"End of Over {over_done}", True, COLORS['text_white'])
+            over_text = self.text(self.font_result, f"End of Over {over_done}", COLORS['text_white'])
             self.screen.blit(over_text, (WIDTH // 2 - over_text.get_width() // 2, 255))
-            prompt = self.font_tiny.render("Press SPACE to start next over", True, COLORS['text_gray'])
+            prompt = self.text(self.font_tiny, "Press SPACE to start next over", COLORS['text_gray'])
             self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, 305))
         elif self.last_result is not None:
             # Big result text
             color = COLORS['text_yellow'] if self.last_result.runs >= 4 else COLORS['text_white']
             if self.last_result.is_wicket:
                 color = COLORS['ball_wicket']
-            result_text = self.font_result.render(self.last_result.desc, True, color)
+            result_text = self.text(self.font_result, self.last_result.desc, color)
             self.screen.blit(result_text, (WIDTH // 2 - result_text.get_width() // 2, 255))
 
+            if self.auto_play is not None:
+                prompt_str = "Auto-play on - press A to stop"
+            else:
+                prompt_str = "Press SPACE to bowl next delivery"
             if self.milestone_message:
-                milestone_text = self.font_medium.render(self.milestone_message, True, COLORS['text_yellow'])
+                milestone_text = self.text(self.font_medium, self.milestone_message, COLORS['text_yellow'])
                 self.screen.blit(milestone_text, (WIDTH // 2 - milestone_text.get_width() // 2, 295))
-                prompt = self.font_tiny.render("Press SPACE to bowl next delivery", True, COLORS['text_gray'])
+                prompt = self.text(self.font_tiny, prompt_str, COLORS['text_gray'])
                 self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, 320))
             else:
-                prompt = self.font_tiny.render("Press SPACE to bowl next delivery", True, COLORS['text_gray'])
+                prompt = self.text(self.font_tiny, prompt_str, COLORS['text_gray'])
                 self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, 305))
         else:
-            text = self.font_medium.render("Press SPACE to bowl", True, COLORS['text_white'])
+            text = self.text(self.font_medium, "Press SPACE to bowl", COLORS['text_white'])
             self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 275))
 
     def _draw_scorecard(self):
         y_start = 330
         card_height = 530
-        pygame.draw.rect(self.screen, COLORS['bg'], (0, y_start, WIDTH, card_height))
-        pygame.draw.line(self.screen, COLORS['separator'], (0, y_start), (WIDTH, y_start))
-
-        # Title
-        title = self.font_small.render("SCORECARD", True, COLORS['text_gray'])
-        self.screen.blit(title, (15, y_start + 5))
 
         # Clipping region
         clip_y = y_start + 25
@@ -492,19 +897,19 @@ class CricketGUI:
                 continue
             if i % 2 == 1:
                 pygame.draw.rect(self.screen, COLORS['row_alt'], (0, ry, WIDTH, row_h))
-            name_t = self.font_tiny.render(f"  {name:<18}", True, COLORS['text_white'])
-            stat_t = self.font_tiny.render(f"{status:<28}", True, COLORS['text_gray'])
-            runs_t = self.font_tiny.render(runs_str, True, COLORS['text_yellow'])
+            name_t = self.text(self.font_tiny, f"  {name:<18}", COLORS['text_white'])
+            stat_t = self.text(self.font_tiny, f"{status:<28}", COLORS['text_gray'])
+            runs_t = self.text(self.font_tiny, runs_str, COLORS['text_yellow'])
             self.screen.blit(name_t, (10, ry + 2))
             self.screen.blit(stat_t, (200, ry + 2))
             self.screen.blit(runs_t, (520, ry + 2))
-        self.screen.set_clip(None)
+        self.screen.set_clip(REGIONS['scorecard'])
 
         # Bowling figures below batting
         bowl_y = clip_y + len(rows) * row_h - self.scorecard_scroll + 10
         if bowl_y < clip_y + clip_h:
             self.screen.set_clip(clip_rect)
-            bl = self.font_small.render("BOWLING", True, COLORS['text_gray'])
+            bl = self.text(self.font_small, "BOWLING", COLORS['text_gray'])
             self.screen.blit(bl, (15, bowl_y))
             bowl_y += 22
             active = [b for b in self.bowler_order if b.bowling_balls > 0]
@@ -515,64 +920,63 @@ class CricketGUI:
                 if i % 2 == 1:
                     pygame.draw.rect(self.screen, COLORS['row_alt'], (0, by, WIDTH, row_h))
                 overs = self._format_overs(b.bowling_balls)
-                nt = self.font_tiny.render(f"  {b.short_name:<18}", True, COLORS['text_white'])
-                st = self.font_tiny.render(f"{overs} ov   {b.wickets_taken}/{b.runs_conceded}", True, COLORS['text_gray'])
+                nt = self.text(self.font_tiny, f"  {b.short_name:<18}", COLORS['text_white'])
+                st = self.text(self.font_tiny, f"{overs} ov   {b.wickets_taken}/{b.runs_conceded}", COLORS['text_gray'])
                 self.screen.blit(nt, (10, by + 2))
                 self.screen.blit(st, (200, by + 2))
-            self.screen.set_clip(None)
-
-    def _draw_status_bar(self):
-        pygame.draw.rect(self.screen, COLORS['header_bg'], (0, 860, WIDTH, 40))
-        text = self.font_tiny.render("SPACE = Bowl  |  ESC = Quit  |  Scroll = Scorecard", True, COLORS['text_gray'])
-        self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 872))
+            self.screen.set_clip(REGIONS['scorecard'])
 
     def _draw_toss_screen(self):
-        self._draw_header()
+        self.screen.fill(COLORS['bg'])
+        self._draw_header(self.screen)
         cy = HEIGHT // 2 - 80
 
         # Show team info
-        t1 = self.font_small.render(
+        t1 = self.text(
+            self.font_small,
             f"{self.game.team1.name} — Captain: {self.game.team1.captain.short_name}",
-            True, COLORS['text_white'])
-        t2 = self.font_small.render(
+            COLORS['text_white'])
+        t2 = self.text(
+            self.font_small,
             f"{self.game.team2.name} — Captain: {self.game.team2.captain.short_name}",
-            True, COLORS['text_white'])
+            COLORS['text_white'])
         self.screen.blit(t1, (WIDTH // 2 - t1.get_width() // 2, cy))
         self.screen.blit(t2, (WIDTH // 2 - t2.get_width() // 2, cy + 30))
 
         if self.phase == GamePhase.TOSS_CALL:
-            prompt = self.font_medium.render("COIN TOSS", True, COLORS['text_yellow'])
+            prompt = self.text(self.font_medium, "COIN TOSS", COLORS['text_yellow'])
             self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, cy + 80))
-            prompt2 = self.font_small.render("Press H for Heads, T for Tails", True, COLORS['text_white'])
+            prompt2 = self.text(self.font_small, "Press H for Heads, T for Tails", COLORS['text_white'])
             self.screen.blit(prompt2, (WIDTH // 2 - prompt2.get_width() // 2, cy + 120))
 
         elif self.phase == GamePhase.TOSS_RESULT:
-            msg = self.font_medium.render(self.toss_message, True, COLORS['text_yellow'])
+            msg = self.text(self.font_medium, self.toss_message, COLORS['text_yellow'])
             self.screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, cy + 80))
-            prompt = self.font_small.render("Press SPACE to continue", True, COLORS['text_gray'])
+            prompt = self.text(self.font_small, "Press SPACE to continue", COLORS['text_gray'])
             self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, cy + 120))
 
         elif self.phase == GamePhase.TOSS_CHOICE:
-            msg = self.font_medium.render("You won the toss!", True, COLORS['text_yellow'])
+            msg = self.text(self.font_medium, "You won the toss!", COLORS['text_yellow'])
             self.screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, cy + 80))
-            prompt = self.font_small.render("Press B to Bat first, O to Bowl first", True, COLORS['text_white'])
+            prompt = self.text(self.font_small, "Press B to Bat first, O to Bowl first", COLORS['text_white'])
             self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, cy + 120))
 
     def _draw_result_screen(self):
-        self._draw_header()
+        self.screen.fill(COLORS['bg'])
+        self._draw_header(self.screen)
 
         bat_first = self.game.batting_first
         bat_second = self.game.batting_second
 
         cy = 80
-        title = self.font_large.render("MATCH RESULT", True, COLORS['text_yellow'])
+        title = self.text(self.font_large, "MATCH RESULT", COLORS['text_yellow'])
         self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, cy))
 
         cy += 60
         s1 = f"{bat_first.name}: {bat_first.runs}/{bat_first.outs} ({self._format_overs(bat_first.legal_balls)} ov)"
         s2 = f"{bat_second.name}: {bat_second.runs}/{bat_second.outs} ({self._format_overs(bat_second.legal_balls)} ov)"
-        t1 = self.font_medium.render(s1, True, COLORS['text_white'])
-        t2 = self.font_medium.render(s2, True, COLORS['text_white'])
+        t1 = self.text(self.font_medium, s1, COLORS['text_white'])
+        t2 = self.text(self.font_medium, s2, COLORS['text_white'])
         self.screen.blit(t1, (WIDTH // 2 - t1.get_width() // 2, cy))
         self.screen.blit(t2, (WIDTH // 2 - t2.get_width() // 2, cy + 35))
 
@@ -582,65 +986,51 @@ class CricketGUI:
             diff = bat_first.runs - bat_second.runs
             winner = f"{bat_first.name} wins by {diff} runs!"
         elif bat_second.runs > bat_first.runs:
-            wickets = MAX_WICKETS - bat_second.outs
+            wickets = self.config.wickets - bat_second.outs
             winner = f"{bat_second.name} wins by {wickets} wickets!"
         else:
             winner = "It's a tie!"
 
-        wt = self.font_large.render(winner, True, COLORS['text_yellow'])
+        wt = self.text(self.font_large, winner, COLORS['text_yellow'])
         self.screen.blit(wt, (WIDTH // 2 - wt.get_width() // 2, cy))
 
         # Top scorers
         cy += 60
         for team in (bat_first, bat_second):
-            label = self.font_small.render(f"{team.name} - Top Scorers:", True, COLORS['text_gray'])
+            label = self.text(self.font_small, f"{team.name} - Top Scorers:", COLORS['text_gray'])
             self.screen.blit(label, (60, cy))
             cy += 25
-            top3 = sorted(team.players, key=lambda b: b.runs, reverse=True)[:3]
-            for i, b in enumerate(top3, 1):
+            for i, b in enumerate(team.top_batters(), 1):
                 star = "" if b.out else "*"
                 line = f"  {i}. {b.short_name}   {b.runs}{star} ({b.balls_faced}b)"
-                lt = self.font_tiny.render(line, True, COLORS['text_white'])
+                lt = self.text(self.font_tiny, line, COLORS['text_white'])
                 self.screen.blit(lt, (80, cy))
                 cy += 20
             cy += 10
 
         # Top bowlers
         for team, bowling_team in ((bat_first, bat_second), (bat_second, bat_first)):
-            label = self.font_small.render(f"{bowling_team.name} - Top Bowlers:", True, COLORS['text_gray'])
+            label = self.text(self.font_small, f"{bowling_team.name} - Top Bowlers:", COLORS['text_gray'])
             self.screen.blit(label, (60, cy))
             cy += 25
-            active = [b for b in bowling_team.players if b.bowling_balls > 0]
-            top3 = sorted(active, key=lambda b: (-b.wickets_taken, b.runs_conceded))[:3]
-            for i, b in enumerate(top3, 1):
+            for i, b in enumerate(bowling_team.top_bowlers(), 1):
                 overs = self._format_overs(b.bowling_balls)
                 line = f"  {i}. {b.short_name}   {b.wickets_taken}/{b.runs_conceded} ({overs} ov)"
-                lt = self.font_tiny.render(line, True, COLORS['text_white'])
+                lt = self.text(self.font_tiny, line, COLORS['text_white'])
                 self.screen.blit(lt, (80, cy))
                 cy += 20
             cy += 10
 
-        prompt = self.font_small.render("Press SPACE or ESC to exit", True, COLORS['text_gray'])
+        prompt = self.text(self.font_small, "Press SPACE or ESC to exit", COLORS['text_gray'])
         self.screen.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT - 50))
 
     def _draw_wagon_wheel(self):
-        panel_x, panel_y, panel_w, panel_h = 1024, 150, 336, 710
-
-        # Background
-        pygame.draw.rect(self.screen, COLORS['panel_bg'], (panel_x, panel_y, panel_w, panel_h))
-        pygame.draw.line(self.screen, COLORS['separator'], (panel_x, panel_y), (panel_x, panel_y + panel_h))
-
-        # Title
-        title = self.font_small.render("WAGON WHEEL", True, COLORS['text_gray'])
-        self.screen.blit(title, (panel_x + panel_w // 2 - title.get_width() // 2, panel_y + 5))
-
-        # Pitch circle with batsman at centre
-        circle_cx, circle_cy = panel_x + panel_w // 2, panel_y + 240
-        circle_r = 120
-        pygame.draw.circle(self.screen, COLORS['pitch'], (circle_cx, circle_cy), circle_r)
+        # The panel, title and pitch circle are in the background.
+        panel_x, panel_y = REGIONS['wagon'].topleft
+        circle_r = WAGON_RADIUS
 
         # Shot lines — colour by ball number, length proportional to runs
-        bat_x, bat_y = circle_cx, circle_cy
+        bat_x, bat_y = WAGON_CENTRE
         for i, (roll, result) in enumerate(self.current_over_results):
             if i < len(self.current_over_angles) and self.current_over_angles[i] is not None:
                 angle, frac = self.current_over_angles[i]
@@ -653,11 +1043,8 @@ class CricketGUI:
         # Batsman marker at centre (drawn on top of lines)
         pygame.draw.circle(self.screen, COLORS['batsman'], (bat_x, bat_y), 5)
 
-        # Legend
-        legend_y = panel_y + 400
-        legend_label = self.font_tiny.render("This Over:", True, COLORS['text_gray'])
-        self.screen.blit(legend_label, (panel_x + 15, legend_y))
-        legend_y += 20
+        # Legend, under its "This Over:" label
+        legend_y = panel_y + 420
 
         for i, (roll, result) in enumerate(self.current_over_results):
             color = COLORS['shot_colors'][i % len(COLORS['shot_colors'])]
@@ -675,7 +1062,7 @@ class CricketGUI:
                 desc = f"Ball {i + 1}: ."
             else:
                 desc = f"Ball {i + 1}: {result.runs} run{'s' if result.runs != 1 else ''}"
-            text = self.font_tiny.render(desc, True, COLORS['text_white'])
+            text = self.text(self.font_tiny, desc, COLORS['text_white'])
             self.screen.blit(text, (panel_x + 40, cy))
 
     def _ball_color(self, roll, result):
@@ -693,23 +1080,76 @@ class CricketGUI:
 
     # ---------- Main loop ----------
 
-    def run(self):
+    def schedule(self, delay_ms, callback):
+        """Call *callback* from the main loop after at least *delay_ms*."""
+        due = pygame.time.get_ticks() + delay_ms
+        heapq.heappush(self.timers, (due, next(self.timer_seq), callback))
+
+    def _run_timers(self):
+        now = pygame.time.get_ticks()
+        while self.timers and self.timers[0][0] <= now:
+            _, _, callback = heapq.heappop(self.timers)
+            callback()
+
+    def _wait_for_events(self):
+        # Sleep until an event arrives or the next timer is due.
+        if pygame.display.get_driver() in BLOCKING_DRIVERS:
+            if not self.timers:
+                events = [pygame.event.wait()]
+            else:
+                timeout = self.timers[0][0] - pygame.time.get_ticks()
+                events = [pygame.event.wait(max(1, timeout))]
+            return events + pygame.event.get()
+        while True:
+            events = pygame.event.get()
+            if events:
+                return events
+            delay = IDLE_POLL_MS
+            if self.timers:
+                delay = min(delay, self.timers[0][0] - pygame.time.get_ticks())
+                if delay <= 0:
+                    return events
+            pygame.time.wait(delay)
+
+    def run(self, fps=None):
+        """Run until the window is closed.
+
+        By default the loop sleeps in pygame.event.wait() and wakes only
+        for input or a scheduled timer, so a match waiting for SPACE uses
+        no CPU. Passing *fps* polls and redraws at that rate instead.
+        """
         running = True
+        self.draw()
         while running:
-            for event in pygame.event.get():
+            events = pygame.event.get() if fps else self._wait_for_events()
+            for event in events:
                 running = self.handle_event(event)
                 if not running:
                     break
             if running:
+                self._run_timers()
                 self.draw()
-                self.clock.tick(30)
+                if fps:
+                    self.clock.tick(fps)
         pygame.quit()
 
 
 def main():
     team1 = sys.argv[1] if len(sys.argv) > 1 else "Team 1"
     team2 = sys.argv[2] if len(sys.argv) > 2 else "Team 2"
-    gui = CricketGUI(team1, team2)
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3] else None
+    config = FORMATS[sys.argv[4].lower()] if len(sys.argv) > 4 else None
+    # An odds table file is memory-mapped if it exists, otherwise solved
+    # and written there for next time.
+    odds = None
+    if len(sys.argv) > 5 and ChaseTable is not None:
+        path = sys.argv[5]
+        if os.path.exists(path):
+            odds = ChaseTable.load(path)
+        else:
+            odds = _solved_odds(config or T20)
+            odds.save(path)
+    gui = CricketGUI(team1, team2, seed, config, odds)
     gui.run()
 
 
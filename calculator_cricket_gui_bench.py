@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Frame-time benchmark for the Calculator Cricket GUI, with no display.
+
+    python calculator_cricket_gui_bench.py                       # 5 matches
+    python calculator_cricket_gui_bench.py --matches 20 --save gui.json
+    python calculator_cricket_gui_bench.py --baseline gui.json
+
+CricketGUI runs on SDL's dummy video driver unless SDL_VIDEODRIVER is
+already set. Scripted key and wheel events go through handle_event(), just
+as run() would pass them, taking every match through every GamePhase, and
+each draw() that follows is timed. Frames are grouped by screen:
+
+    gui_toss        toss screens, repainted in full
+    gui_in_play     the match view after each SPACE: deliveries, end of
+                    over and innings screens
+    gui_scorecard   the match view after a scorecard scroll
+    gui_result      the result screen, repainted in full
+
+Results, saving and baselines work as in calculator_cricket_bench.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from calculator_cricket_bench import add_report_arguments, report, summarise
+
+SCREENS = ("gui_toss", "gui_in_play", "gui_scorecard", "gui_result")
+
+# Full repaints timed for each of the toss and result screens.
+REPAINTS = 20
+# Scroll the scorecard down and back up after every this many steps.
+SCROLL_EVERY = 10
+SCROLL_STEPS = 3
+
+
+def _timed_draw(gui):
+    start = time.perf_counter_ns()
+    gui.draw()
+    return time.perf_counter_ns() - start
+
+
+def play_match(gui, frames):
+    """Drive *gui* through a match, appending draw() times in ns to *frames*."""
+    import pygame
+    from calculator_cricket_gui import FULL_SCREEN_PHASES, GamePhase
+
+    def key(k):
+        gui.handle_event(pygame.event.Event(pygame.KEYDOWN, key=k))
+
+    def repaint(screen):
+        for _ in range(REPAINTS):
+            gui._invalidate()
+            frames[screen].append(_timed_draw(gui))
+
+    gui.draw()
+    repaint("gui_toss")
+    # Call heads, then bat if the toss is won.
+    for k in (pygame.K_h, pygame.K_SPACE, pygame.K_b):
+        if k == pygame.K_b and gui.phase != GamePhase.TOSS_CHOICE:
+            break
+        key(k)
+        if gui.phase in FULL_SCREEN_PHASES:
+            repaint("gui_toss")
+        else:
+            frames["gui_in_play"].append(_timed_draw(gui))
+
+    steps = 0
+    while gui.phase != GamePhase.MATCH_RESULT:
+        key(pygame.K_SPACE)
+        if gui.phase == GamePhase.MATCH_RESULT:
+            break
+        frames["gui_in_play"].append(_timed_draw(gui))
+        steps += 1
+        if steps % SCROLL_EVERY == 0:
+            for direction in [1] * SCROLL_STEPS + [-1] * SCROLL_STEPS:
+                gui.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-direction,
+                                                    flipped=False))
+                frames["gui_scorecard"].append(_timed_draw(gui))
+    frames["gui_result"].append(_timed_draw(gui))
+    repaint("gui_result")
+
+
+def run(matches=5, seed=0):
+    """Play *matches* seeded matches and return a BenchResult per screen."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from calculator_cricket_gui import CricketGUI
+
+    frames = {screen: [] for screen in SCREENS}
+    try:
+        for i in range(matches):
+            play_match(CricketGUI("Team A", "Team B", seed + i), frames)
+    finally:
+        pygame.quit()
+    return {screen: summarise(screen, frames[screen]) for screen in SCREENS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matches", type=int, default=5,
+                        help="matches to play (default: 5)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first match (default: 0)")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+    return report(run(args.matches, args.seed), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
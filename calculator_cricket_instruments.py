@@ -0,0 +1,69 @@
+"""Phase timers and counters for Calculator Cricket games.
+
+Pass an Instruments to Game(..., instruments=...) to see where a run spends
+its time without a profiler. Game times these phases:
+
+    teams      generating both sides, in Game()
+    toss       the toss and the choice to bat or bowl
+    innings    one innings, ball by ball
+    scorecard  printing an innings scorecard (play only)
+    result     deciding, and in play printing, the result
+
+and counts balls, legal balls, wickets, extras, bowler selections (one per
+over started) and innings as each innings ends. A Game without instruments
+only ever tests `instruments is not None`, once per phase, never per ball.
+"""
+
+import time
+from collections import Counter, namedtuple
+
+PHASES = ("teams", "toss", "innings", "scorecard", "result")
+COUNTERS = ("innings", "balls", "legal_balls", "wickets", "extras", "bowler_selections")
+
+InstrumentSnapshot = namedtuple("InstrumentSnapshot", ["timings", "calls", "counts"])
+
+
+class Instruments:
+    """Accumulates time per phase and counts per innings.
+
+    *callback*, if given, is called as callback(phase, seconds) each time
+    a phase finishes. *clock* returns seconds; it defaults to
+    time.perf_counter.
+    """
+
+    def __init__(self, callback=None, clock=time.perf_counter):
+        self.callback = callback
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """Zero every timer and counter."""
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.calls = Counter(dict.fromkeys(PHASES, 0))
+        self.counts = Counter(dict.fromkeys(COUNTERS, 0))
+
+    def start(self):
+        """Return a start time to pass to stop()."""
+        return self.clock()
+
+    def stop(self, phase, start):
+        """Record that *phase* ran from *start* until now."""
+        seconds = self.clock() - start
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+        self.calls[phase] += 1
+        if self.callback is not None:
+            self.callback(phase, seconds)
+
+    def count_innings(self, team, overs):
+        """Add a finished innings by *team*, in which *overs* overs were started."""
+        counts = self.counts
+        counts["innings"] += 1
+        counts["balls"] += team.balls
+        counts["legal_balls"] += team.legal_balls
+        counts["wickets"] += team.outs
+        counts["extras"] += team.balls - team.legal_balls
+        counts["bowler_selections"] += overs
+
+    def snapshot(self):
+        """Return copies of the timings (seconds), calls and counts so far."""
+        return InstrumentSnapshot(dict(self.timings), dict(self.calls), dict(self.counts))
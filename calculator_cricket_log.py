@@ -0,0 +1,132 @@
+"""Binary ball-by-ball log for Calculator Cricket.
+
+Every delivery is one fixed-width little-endian record:
+
+    match     uint32  match id chosen by the caller
+    innings   uint8   1 or 2
+    over      uint8   0-based over number
+    ball      uint8   1-based delivery in the over, extras included
+    roll      uint8   the dice roll
+    striker   uint8   batting-order index of the striker
+    bowler    uint8   bowling side's player index of the bowler
+    runs      uint8   runs added to the total, extras included
+    flags     uint8   FLAG_WICKET | FLAG_LEGAL | dismissal code << 2
+
+The dismissal code is 1 + the index into the match's dismissal types
+(MatchConfig.dismissals, DISMISSALS by default), or 0 for no wicket.
+A file is an 8-byte header followed by records, so open_log() can map it
+straight into a NumPy structured array without copying.
+"""
+
+import os
+import struct
+
+from calculator_cricket import DISMISSALS
+
+MAGIC = b"CCBL\x01\x00\x00\x00"
+RECORD = struct.Struct("<IBBBBBBBB")
+FIELDS = ("match", "innings", "over", "ball", "roll", "striker", "bowler", "runs", "flags")
+
+FLAG_WICKET = 1
+FLAG_LEGAL = 2
+DISMISSAL_SHIFT = 2
+# Codes that fit in the flags byte above the two flag bits.
+MAX_DISMISSAL_CODE = 0xFF >> DISMISSAL_SHIFT
+
+# Records buffered in memory before a write.
+BUFFER_RECORDS = 65536
+
+
+class BallLogWriter:
+    """Append deliveries to a binary ball log.
+
+    Use as a context manager, or call close(). A new file gets a header;
+    an existing one must already be a ball log and is appended to.
+    """
+
+    def __init__(self, path):
+        if os.path.exists(path) and os.path.getsize(path):
+            _check_header(path)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._buffer = bytearray()
+        self._limit = BUFFER_RECORDS * RECORD.size
+
+    def recorder(self, match_id, innings, dismissal_types=DISMISSALS):
+        """Return a function recording one delivery of this innings.
+
+        It takes (over, ball, roll, striker, bowler, runs, legal, how), where
+        *how* is the dismissal type or None; Game calls it after each ball.
+        *dismissal_types* are the match's (type, weight) pairs.
+        """
+        codes = {how: i + 1 for i, (how, _) in enumerate(dismissal_types)}
+        if len(codes) > MAX_DISMISSAL_CODE:
+            raise ValueError(f"a log holds at most {MAX_DISMISSAL_CODE} dismissal types")
+        buffer, pack = self._buffer, RECORD.pack
+
+        def record(over, ball, roll, striker, bowler, runs, legal, how):
+            flags = FLAG_LEGAL if legal else 0
+            if how is not None:
+                flags |= FLAG_WICKET | codes[how] << DISMISSAL_SHIFT
+            buffer.extend(pack(match_id, innings, over, ball, roll, striker, bowler, runs, flags))
+            if len(buffer) >= self._limit:
+                self.flush()
+
+        return record
+
+    def flush(self):
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC))
+    if header != MAGIC:
+        raise ValueError(f"{path} is not a ball log")
+    size = os.path.getsize(path) - len(MAGIC)
+    if size % RECORD.size:
+        raise ValueError(f"{path} ends with a partial record")
+    return size // RECORD.size
+
+
+def log_dtype():
+    """Return the NumPy structured dtype of one record."""
+    import numpy as np
+
+    return np.dtype([(name, "<u4" if name == "match" else "u1") for name in FIELDS])
+
+
+def open_log(path):
+    """Memory-map a ball log as a read-only NumPy structured array.
+
+    Fields are zero-copy views, e.g. log["runs"] or log["flags"] & FLAG_WICKET.
+    """
+    import numpy as np
+
+    count = _check_header(path)
+    if count == 0:
+        return np.zeros(0, dtype=log_dtype())
+    return np.memmap(path, dtype=log_dtype(), mode="r", offset=len(MAGIC), shape=(count,))
+
+
+def dismissals(log, dismissal_types=DISMISSALS):
+    """Return the dismissal type for each record, or None where no wicket fell.
+
+    *dismissal_types* must be those the log was written with.
+    """
+    names = [None] + [how for how, _ in dismissal_types]
+    return [names[code] for code in (log["flags"] >> DISMISSAL_SHIFT).tolist()]
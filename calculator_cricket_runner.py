@@ -0,0 +1,129 @@
+"""Run many headless matches across processes.
+
+Match i of a run is played with its own random.Random seeded from the
+master seed and i alone, so results are identical whatever the number of
+workers or the chunk size. Workers are sent contiguous ranges of match
+indices and reuse one Game per range.
+"""
+
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from calculator_cricket import Game
+from calculator_cricket_stats import MatchStats
+
+CHUNK_SIZE = 2000
+
+TournamentSummary = namedtuple("TournamentSummary", [
+    "matches", "team1_wins", "team2_wins", "ties",
+    "bat_first_wins", "toss_winner_wins",
+    "first_innings_runs", "second_innings_runs",
+])
+
+
+def match_seed(seed, index):
+    """Return the seed for match *index* of a run with master *seed*."""
+    return (seed << 64) | index
+
+
+def _play_range(seed, start, stop, team1, team2, toss_policy, config, game=None):
+    if game is None:
+        game = Game(team1, team2, rng=random.Random(seed), config=config)
+    for i in range(start, stop):
+        yield game.simulate(seed=match_seed(seed, i), toss_policy=toss_policy)
+
+
+def _play_chunk(args):
+    return list(_play_range(*args))
+
+
+def _summarise_chunk(args):
+    team1 = args[3]
+    matches = team1_wins = team2_wins = ties = 0
+    bat_first_wins = toss_winner_wins = first_runs = second_runs = 0
+    for result in _play_range(*args):
+        matches += 1
+        first_runs += result.first_innings.runs
+        second_runs += result.second_innings.runs
+        if result.winner is None:
+            ties += 1
+            continue
+        if result.winner == team1:
+            team1_wins += 1
+        else:
+            team2_wins += 1
+        bat_first_wins += result.winner == result.first_innings.team
+        toss_winner_wins += result.winner == result.toss_winner
+    return TournamentSummary(matches, team1_wins, team2_wins, ties,
+                             bat_first_wins, toss_winner_wins, first_runs, second_runs)
+
+
+def _stats_chunk(args):
+    seed, _, _, team1, team2, _, config = args
+    game = Game(team1, team2, rng=random.Random(seed), config=config)
+    stats = MatchStats(config)
+    for result in _play_range(*args, game=game):
+        stats.add_match(game, result)
+    return stats
+
+
+def _map_chunks(fn, n, seed, workers, chunk_size, team1, team2, toss_policy, config):
+    """Yield fn(chunk) for each chunk of the run, in match order."""
+    if not isinstance(seed, int):
+        raise TypeError("seed must be an int")
+    if team1 == team2:
+        raise ValueError("team names must differ")
+    chunks = [(seed, start, min(start + chunk_size, n), team1, team2, toss_policy, config)
+              for start in range(0, n, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        yield from map(fn, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        yield from pool.map(fn, chunks)
+
+
+def imap_matches(n, seed, workers=None, chunk_size=CHUNK_SIZE,
+                 team1="Team 1", team2="Team 2", toss_policy="random", config=None):
+    """Play *n* matches and yield their MatchResults in match order.
+
+    *workers* defaults to the number of CPUs; 1 runs in this process.
+    A callable *toss_policy* must be picklable to be sent to workers.
+    *config* is the MatchConfig, T20 if None.
+    """
+    for results in _map_chunks(_play_chunk, n, seed, workers, chunk_size,
+                               team1, team2, toss_policy, config):
+        yield from results
+
+
+def run_tournament(n, seed, workers=None, chunk_size=CHUNK_SIZE,
+                   team1="Team 1", team2="Team 2", toss_policy="random", config=None):
+    """Play *n* matches and return a TournamentSummary.
+
+    Workers summarise their own chunks, so only counts cross process
+    boundaries; use this rather than imap_matches for long runs.
+    """
+    total = TournamentSummary(*[0] * len(TournamentSummary._fields))
+    for part in _map_chunks(_summarise_chunk, n, seed, workers, chunk_size,
+                            team1, team2, toss_policy, config):
+        total = TournamentSummary(*(a + b for a, b in zip(total, part)))
+    return total
+
+
+def tournament_stats(n, seed, workers=None, chunk_size=CHUNK_SIZE,
+                     team1="Team 1", team2="Team 2", toss_policy="random", config=None):
+    """Play *n* matches and return their MatchStats.
+
+    As with run_tournament, each worker fills a MatchStats for its own
+    chunks, which are of a fixed size however long the run, and they are
+    merged here. The histograms are the same for any *workers* and
+    *chunk_size*; a sketch's mean may differ in the last bits, being
+    summed in a different order.
+    """
+    total = MatchStats(config)
+    for part in _map_chunks(_stats_chunk, n, seed, workers, chunk_size,
+                            team1, team2, toss_policy, config):
+        total.merge(part)
+    return total
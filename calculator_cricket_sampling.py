@@ -0,0 +1,173 @@
+"""Weighted sampling with Walker alias tables, and buffered dice rolls.
+
+An AliasTable is built once from a list of weights, after which every draw
+costs one uniform variate and one comparison, however many values there
+are. random.choices, by contrast, rebuilds its cumulative weights on every
+call.
+
+BufferedRolls draws dice rolls a block at a time and hands them out one per
+call, which is several times cheaper than a randint per ball.
+"""
+
+import itertools
+import math
+import operator
+import random
+
+# Rolls drawn per block by BufferedRolls.
+BLOCK_SIZE = 4096
+
+
+class AliasTable:
+    """Draw from *values* with probability proportional to *weights*."""
+
+    def __init__(self, values, weights):
+        values, weights = list(values), [float(w) for w in weights]
+        if len(values) != len(weights):
+            raise ValueError(f"{len(values)} values but {len(weights)} weights")
+        if not values:
+            raise ValueError("need at least one value")
+        if any(w < 0 or not math.isfinite(w) for w in weights):
+            raise ValueError("weights must be finite and non-negative")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("weights must not all be zero")
+
+        # Vose's method: scale to mean 1, then pair each short column with
+        # a tall one that tops it up.
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        prob, alias = [1.0] * n, list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1 up to rounding.
+
+        self.values = values
+        self.probabilities = [w / total for w in weights]
+        self._n = n
+        self._prob = prob
+        self._alias = alias
+        # The value each column yields when its coin comes up alias.
+        self._alias_values = [values[a] for a in alias]
+
+    def __len__(self):
+        return self._n
+
+    def sample(self, rng=random):
+        """Draw one value using *rng*'s random()."""
+        u = rng.random() * self._n
+        i = int(u)
+        return self.values[i] if u - i < self._prob[i] else self._alias_values[i]
+
+    def sampler(self, rng=random):
+        """Return a no-argument function drawing one value per call.
+
+        Everything is bound up front, so this is the form to use per ball.
+        """
+        uniform, n = rng.random, self._n
+        values, prob, alias_values = self.values, self._prob, self._alias_values
+
+        def draw():
+            u = uniform() * n
+            i = int(u)
+            return values[i] if u - i < prob[i] else alias_values[i]
+
+        return draw
+
+    def sample_many(self, k, rng=random):
+        """Return a list of *k* draws."""
+        draw = self.sampler(rng)
+        return [draw() for _ in range(k)]
+
+    def sample_array(self, size, rng=None):
+        """Return a NumPy array of draws with shape *size*.
+
+        *rng* is a numpy Generator or a seed. The values must be numbers.
+        """
+        import numpy as np
+
+        rng = np.random.default_rng(rng)
+        column = rng.integers(0, self._n, size=size)
+        coin = rng.random(size=size)
+        values = np.asarray(self.values)
+        alias_values = np.asarray(self._alias_values)
+        return np.where(coin < np.asarray(self._prob)[column],
+                        values[column], alias_values[column])
+
+
+class BufferedRolls:
+    """Rolls of a *faces*-sided die, drawn a block at a time.
+
+    The instance is a roll_fn: each call returns the next roll. The bound
+    method ``roll`` does the same without the extra call layer, and is the
+    form to hand to a hot loop; it is replaced by setstate().
+
+    Rolls come from *rng*, or from a private random.Random(*seed*). Uniform
+    rolls are bytes from rng.randbytes() folded onto the faces, with the
+    uneven top of the byte range thrown away; weighted rolls are filled in
+    from an AliasTable. getstate() and setstate() capture the position in
+    the stream, so a match can be replayed exactly from any ball. The same
+    seed gives the same rolls only with the same block_size.
+    """
+
+    def __init__(self, faces=10, seed=None, rng=None, weights=None, block_size=BLOCK_SIZE):
+        if not 1 <= faces <= 256:
+            raise ValueError(f"faces must be between 1 and 256, got {faces}")
+        if seed is not None and rng is not None:
+            raise ValueError("pass a seed or an rng, not both")
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.faces = faces
+        self.block_size = block_size
+        self._rng = random.Random(seed) if rng is None else rng
+        if weights is None:
+            self._alias = None
+            self._fold = bytes(i % faces for i in range(256))
+            self._spill = bytes(range(256 - 256 % faces, 256))
+        else:
+            self._alias = AliasTable(range(faces), weights)
+        self._block_state, self._block_len, self._rolls = self._rng.getstate(), 0, iter(())
+        self.roll = self._stream(0).__next__
+
+    def __call__(self):
+        return self.roll()
+
+    def _block(self):
+        if self._alias is None:
+            return self._rng.randbytes(self.block_size).translate(self._fold, self._spill)
+        return bytes(self._alias.sample_many(self.block_size, self._rng))
+
+    def _stream(self, skip):
+        # The rng state before each block is kept so getstate() can describe
+        # the position as (state, rolls used from the block). Snapshotting
+        # costs a few microseconds, so blocks should be long.
+        while True:
+            self._block_state = self._rng.getstate()
+            block = self._block()
+            self._block_len = len(block)
+            rolls = self._rolls = iter(block)
+            if skip:
+                next(itertools.islice(rolls, skip - 1, None), None)
+                skip = 0
+            yield from rolls
+
+    def getstate(self):
+        """Return an opaque state for setstate()."""
+        return self._block_state, self._block_len - operator.length_hint(self._rolls)
+
+    def setstate(self, state):
+        """Continue from a state returned by getstate().
+
+        This also resets the underlying rng, so with a shared rng it
+        rewinds everything else drawn from it too.
+        """
+        self._block_state, skip = state
+        # Until the next roll, getstate() gives back *state*.
+        self._block_len, self._rolls = skip, iter(())
+        self._rng.setstate(self._block_state)
+        self.roll = self._stream(skip).__next__
@@ -0,0 +1,374 @@
+"""Binary snapshots of Calculator Cricket games.
+
+    data = snapshot(game)       # bytes
+    game = restore(data)        # an equivalent Game
+
+A snapshot holds everything a Game needs to carry on exactly where it left
+off: its MatchConfig, dice and roll weights, the rng state, both sides'
+names, captains, keepers, batters' indexes and every player's stats, series
+totals if kept, the batting order, and the InningsProgress of an innings
+under way (over number, bowler, legal balls and deliveries of the over, and
+the next step). After restore(), game.resume_innings() continues the same innings with the
+same rolls. The restored Game has its own random.Random, even if the
+original drew from the random module. Instruments are not game state and
+are left out.
+
+The format is little-endian: MAGIC, a uint16 VERSION, then the game's
+fields in a fixed order, with strings and lists length-prefixed. Nothing is
+unpickled, so a damaged or hostile snapshot can only fail to load, with a
+ValueError. SnapshotWriter and SnapshotReader are public so that callers
+holding more state, such as CricketGUI, can append their own fields after
+write_game().
+"""
+
+import random
+import struct
+from collections import namedtuple
+from functools import lru_cache
+
+from calculator_cricket import (
+    DEFAULT_DICE, Game, InningsProgress, MatchConfig,
+)
+from calculator_cricket_sampling import AliasTable
+
+MAGIC = b"CCGS"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sH")
+# random.Random.getstate(): (3, 624 words and a position, gauss_next).
+_RNG_VERSION = 3
+_RNG_WORDS = struct.Struct("<625I")
+_GAUSS = struct.Struct("<?d")
+_GAME = struct.Struct("<HHHHHH??")
+_TEAM = struct.Struct("<HHiiiiHHH")
+_PROGRESS = struct.Struct("<BiHHHBH")
+# A length meaning None in place of a string.
+_NONE = 0xFFFF
+STAGES = ("over start", "ball", "over end", "change ends", "innings end", "done")
+# Dice faces are stored as their runs, or one of these.
+_EXTRA, _WICKET = -1, -2
+_COLUMNS = ("runs", "balls_faced", "out", "bowling_balls", "runs_conceded", "wickets_taken")
+_SERIES_COLUMNS = ("runs", "balls_faced", "bowling_balls", "runs_conceded", "wickets_taken")
+
+# What read_game() has read and checked, before it touches a Game. A side's
+# header is its _TEAM fields; series is its series totals, or None.
+_TeamData = namedtuple("_TeamData", ["header", "columns", "how_out", "series"])
+_GameData = namedtuple("_GameData", [
+    "config", "codes", "roll_weights", "series", "names", "squads", "team2_first",
+    "rng_state", "teams", "progress",
+])
+
+
+@lru_cache(maxsize=None)
+def _struct(fmt):
+    return struct.Struct("<" + fmt)
+
+
+class SnapshotWriter:
+    """Builds a snapshot: the header, then whatever is written, in order.
+
+    *fmt* arguments are struct formats, little-endian, as strings or
+    precompiled struct.Structs.
+    """
+
+    def __init__(self):
+        self._parts = [_HEADER.pack(MAGIC, VERSION)]
+
+    def pack(self, fmt, *values):
+        if isinstance(fmt, str):
+            fmt = _struct(fmt)
+        self._parts.append(fmt.pack(*values))
+
+    def ints(self, values):
+        """Write a sequence of int32s; the reader must know how many."""
+        self._parts.append(_struct(f"{len(values)}i").pack(*values))
+
+    def strings(self, values):
+        """Write a sequence of strs or Nones; the reader must know how many.
+
+        They are stored as their lengths in characters, then one UTF-8 blob.
+        """
+        if any(len(value) >= _NONE for value in values if value is not None):
+            raise ValueError("string too long for a snapshot")
+        lengths = [_NONE if value is None else len(value) for value in values]
+        blob = "".join(value for value in values if value is not None).encode()
+        self._parts.append(_struct(f"{len(lengths)}HI").pack(*lengths, len(blob)))
+        self._parts.append(blob)
+
+    def rng_state(self, state):
+        """Write a random.Random.getstate()."""
+        version, words, gauss = state
+        if version != _RNG_VERSION or len(words) != 625:
+            raise ValueError("unsupported random state")
+        self._parts.append(_RNG_WORDS.pack(*words))
+        self._parts.append(_GAUSS.pack(gauss is not None, 0.0 if gauss is None else gauss))
+
+    def getvalue(self):
+        return b"".join(self._parts)
+
+
+class SnapshotReader:
+    """Reads back what a SnapshotWriter wrote, in the same order."""
+
+    def __init__(self, data):
+        self._data = memoryview(data)
+        self._pos = 0
+        magic, version = self.unpack(_HEADER)
+        if magic != MAGIC:
+            raise ValueError("not a Calculator Cricket snapshot")
+        if version != VERSION:
+            raise ValueError(f"snapshot version {version} is not supported (need {VERSION})")
+
+    def unpack(self, fmt):
+        if isinstance(fmt, str):
+            fmt = _struct(fmt)
+        try:
+            values = fmt.unpack_from(self._data, self._pos)
+        except struct.error:
+            raise ValueError("snapshot is truncated") from None
+        self._pos += fmt.size
+        return values
+
+    def ints(self, n):
+        return list(self.unpack(f"{n}i"))
+
+    def strings(self, n):
+        *lengths, size = self.unpack(f"{n}HI")
+        end = self._pos + size
+        if end > len(self._data):
+            raise ValueError("snapshot is truncated")
+        text = str(self._data[self._pos:end], "utf-8")
+        self._pos = end
+        values, start = [], 0
+        for length in lengths:
+            if length == _NONE:
+                values.append(None)
+            else:
+                values.append(text[start:start + length])
+                start += length
+        if start != len(text):
+            raise ValueError("string lengths do not match their text")
+        return values
+
+    def rng_state(self):
+        words = self.unpack(_RNG_WORDS)
+        has_gauss, gauss = self.unpack(_GAUSS)
+        return _RNG_VERSION, words, gauss if has_gauss else None
+
+    def finish(self):
+        """Check that everything written has been read."""
+        if self._pos != len(self._data):
+            raise ValueError(f"{len(self._data) - self._pos} unexpected bytes after snapshot")
+
+
+def _face_code(outcome):
+    if outcome.wicket:
+        return _WICKET
+    if not outcome.legal:
+        return _EXTRA
+    return outcome.runs
+
+
+def _face(code):
+    if code == _WICKET:
+        return "wicket"
+    if code == _EXTRA:
+        return "extra"
+    return code
+
+
+@lru_cache(maxsize=64)
+def _config(overs, overs_per_bowler, team_size, first_bowler, dismissals):
+    # Worker pools restore the same few formats over and over.
+    return MatchConfig(overs, overs_per_bowler, team_size, first_bowler, dismissals)
+
+
+def _write_team(w, team):
+    w.pack(_TEAM, team.captain.index, team.keeper.index,
+           team.runs, team.outs, team.balls, team.legal_balls,
+           team.striker_idx, team.non_striker_idx, team.next_idx)
+    state = team.state
+    w.ints([value for column in _COLUMNS for value in getattr(state, column)])
+    w.strings(state.how_out)
+    if team.series is not None:
+        series = team.series
+        w.ints([series.matches] + [value for column in _SERIES_COLUMNS
+                                   for value in getattr(series, column)])
+
+
+def _read_team(r, config, series):
+    """Read and check one side's fields, without touching any Team."""
+    header = r.unpack(_TEAM)
+    captain, keeper, _, _, _, _, striker, non_striker, next_idx = header
+    size = config.team_size
+    if not (captain < size and keeper < size):
+        raise ValueError("captain or keeper out of range")
+    if not (striker < size and non_striker < size and next_idx <= size):
+        raise ValueError("batter index out of range")
+    values = r.ints(len(_COLUMNS) * size)
+    columns = {column: values[i * size:(i + 1) * size] for i, column in enumerate(_COLUMNS)}
+    how_out = r.strings(size)
+    # Out-of-turn or over-quota bowlers could leave no one to bowl an over.
+    bowled = columns["bowling_balls"]
+    if any(bowled[:config.first_bowler]) or max(bowled) > config.bowler_balls:
+        raise ValueError("bowling figures do not fit the format")
+    totals = r.ints(1 + len(_SERIES_COLUMNS) * size) if series else None
+    return _TeamData(header, columns, how_out, totals)
+
+
+def _load_team(team, data):
+    (captain, keeper, team.runs, team.outs, team.balls, team.legal_balls,
+     team.striker_idx, team.non_striker_idx, team.next_idx) = data.header
+    team.captain, team.keeper = team.players[captain], team.players[keeper]
+    state = team.state
+    for column, values in data.columns.items():
+        getattr(state, column)[:] = values
+    state.how_out[:] = data.how_out
+    team.boards_stale = True
+    series = team.series
+    if series is not None:
+        values, size = data.series, len(team.players)
+        series.matches = values[0]
+        for i, column in enumerate(_SERIES_COLUMNS):
+            getattr(series, column)[:] = values[1 + i * size:1 + (i + 1) * size]
+        series.batting.rebuild(range(size))
+        series.bowling.rebuild(i for i, balls in enumerate(series.bowling_balls) if balls)
+
+
+def _rename(game, name1, name2, squads):
+    for team, name, names in ((game.team1, name1, squads[0]), (game.team2, name2, squads[1])):
+        team.name = name
+        for player, player_name in zip(team.players, names):
+            player.name = player_name
+
+
+def write_game(w, game):
+    """Write *game*'s state to SnapshotWriter *w*."""
+    config, outcomes = game.config, game.outcomes
+    team1, team2 = game.team1, game.team2
+    first = game.batting_first
+    w.pack(_GAME, config.overs, config.overs_per_bowler, config.team_size,
+           config.first_bowler, len(config.dismissals), len(outcomes),
+           team1.series is not None, first is not None and first is team2)
+    w.pack(f"{len(config.dismissals)}d", *[weight for _, weight in config.dismissals])
+    w.pack(f"{len(outcomes)}h", *map(_face_code, outcomes))
+    w.pack(f"{len(outcomes)}d", *game.roll_weights)
+    w.strings([how for how, _ in config.dismissals] + [team1.name, team2.name]
+              + [player.name for player in team1.players + team2.players])
+    w.pack("?", first is not None)
+    w.rng_state(game.rng.getstate())
+    _write_team(w, team1)
+    _write_team(w, team2)
+
+    progress = game.progress
+    w.pack("?", progress is not None)
+    if progress is not None:
+        bowler = progress.bowler
+        w.pack(_PROGRESS, 1 if progress.team is team1 else 2,
+               -1 if progress.target is None else progress.target,
+               progress.over_number, _NONE if bowler is None else bowler.index,
+               progress.over_balls, STAGES.index(progress.stage), progress.over_deliveries)
+
+
+def _parse_game(r):
+    """Read and check a game written by write_game(), building nothing."""
+    (overs, per_bowler, size, first_bowler, n_dismissals, faces,
+     series, team2_first) = r.unpack(_GAME)
+    weights = [int(w) if w.is_integer() else w for w in r.unpack(f"{n_dismissals}d")]
+    codes = r.unpack(f"{faces}h")
+    roll_weights = list(r.unpack(f"{faces}d"))
+    names = r.strings(n_dismissals + 2 + 2 * size)
+    config = _config(overs, per_bowler, size, first_bowler,
+                     tuple(zip(names[:n_dismissals], weights)))
+    squads = names[n_dismissals + 2:n_dismissals + 2 + size], names[n_dismissals + 2 + size:]
+    has_order, = r.unpack("?")
+    rng_state = r.rng_state()
+    teams = _read_team(r, config, series), _read_team(r, config, series)
+
+    progress = None
+    has_progress, = r.unpack("?")
+    if has_progress:
+        progress = r.unpack(_PROGRESS)
+        batting, _, over_number, bowler, over_balls, stage, _ = progress
+        if (batting not in (1, 2) or stage >= len(STAGES) or over_number > overs
+                or over_balls > 6 or not (bowler == _NONE or bowler < size)):
+            raise ValueError("bad innings progress")
+        legal_balls = teams[batting - 1].header[5]
+        if (sum(teams[2 - batting].columns["bowling_balls"]) != legal_balls
+                or legal_balls > 6 * over_number):
+            raise ValueError("bad innings progress")
+    return _GameData(config, codes, roll_weights, series, names[n_dismissals:n_dismissals + 2],
+                     squads, team2_first if has_order else None, rng_state, teams, progress)
+
+
+def _load_game(data, game=None):
+    """Return a Game holding parsed *data*, loaded into *game* if it fits."""
+    config, codes, roll_weights = data.config, data.codes, data.roll_weights
+    name1, name2 = data.names
+    if (game is not None and game.config == config
+            and (game.team1.series is not None) == data.series
+            and tuple(map(_face_code, game.outcomes)) == codes):
+        _rename(game, name1, name2, data.squads)
+        if game.roll_weights != roll_weights:
+            game.roll_weights = roll_weights
+            game.roll_table = AliasTable(range(len(codes)), roll_weights)
+        if not isinstance(game.rng, random.Random):
+            game.rng = random.Random(0)
+        game.batting_first = game.batting_second = game.progress = None
+    else:
+        # The rng only picks captains and keepers here, which are then
+        # overwritten, and is reset below.
+        dice = [_face(code) for code in codes]
+        game = Game(name1, name2, rng=random.Random(0),
+                    dice=None if dice == DEFAULT_DICE else dice,
+                    roll_weights=roll_weights, series=data.series, config=config,
+                    squads=data.squads)
+    _load_team(game.team1, data.teams[0])
+    _load_team(game.team2, data.teams[1])
+    if data.team2_first is not None:
+        if data.team2_first:
+            game.batting_first, game.batting_second = game.team2, game.team1
+        else:
+            game.batting_first, game.batting_second = game.team1, game.team2
+    if data.progress is not None:
+        batting, target, over_number, bowler, over_balls, stage, over_deliveries = data.progress
+        team, bowling_team = ((game.team1, game.team2) if batting == 1
+                              else (game.team2, game.team1))
+        game.progress = InningsProgress(
+            team, bowling_team, None if target < 0 else target, over_number,
+            None if bowler == _NONE else bowling_team.players[bowler], over_balls,
+            STAGES[stage], over_deliveries)
+    game.rng.setstate(data.rng_state)
+    return game
+
+
+def read_game(r, game=None):
+    """Read a Game written by write_game() from SnapshotReader *r*.
+
+    *game*, if it has the same MatchConfig, dice and series setting, is
+    loaded in place instead of building a new Game; see restore(). It is
+    only changed once the whole game has been read and checked.
+    """
+    return _load_game(_parse_game(r), game)
+
+
+def snapshot(game):
+    """Return *game*'s state as bytes."""
+    w = SnapshotWriter()
+    write_game(w, game)
+    return w.getvalue()
+
+
+def restore(data, game=None):
+    """Return a Game rebuilt from snapshot() bytes.
+
+    Passing a *game* of the same format, dice and series setting, such as
+    the one the last restore() returned, loads the snapshot into it and
+    returns it, which is several times faster than building a new one.
+    Otherwise a new Game is made. Bad data raises ValueError and leaves
+    *game* as it was.
+    """
+    r = SnapshotReader(data)
+    parsed = _parse_game(r)
+    r.finish()
+    return _load_game(parsed, game)
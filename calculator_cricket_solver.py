@@ -0,0 +1,267 @@
+"""Exact match probabilities for Calculator Cricket.
+
+Game._score_ball makes an innings a finite Markov chain, so instead of
+sampling matches we can solve it. For team totals only runs, legal balls and
+wickets matter: who is on strike, and where in the over we are, change which
+batter scores but not how many runs the side makes, so those are left out of
+the state.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from calculator_cricket import OUTCOMES, T20, outcome_table
+
+# Scores above this are treated as impossible. A 20-over innings passes 400
+# with probability around 1e-13 under the standard dice; a 50-over one
+# passes 500 with probability around 4e-5, so raise it for exact ODI odds.
+DEFAULT_MAX_RUNS = 500
+
+# Probabilities below this are treated as zero by innings_pmf().
+_TINY = 1e-280
+
+MatchOdds = namedtuple("MatchOdds", ["bat_first", "tie", "bat_second"])
+
+InningsPMF = namedtuple("InningsPMF", ["joint", "runs", "wickets"])
+InningsPMF.__doc__ = """Probability mass functions of a whole innings; see innings_pmf().
+
+joint[w, s] is P(w wickets down and s runs), runs[s] and wickets[w] its
+marginals. The arrays are shared between calls, so read-only.
+"""
+
+
+def _outcomes(roll_weights, dice):
+    """Group roll probabilities into (scoring, extras, wicket probability).
+
+    scoring and extras are lists of (runs, probability) for legal and
+    illegal non-wicket deliveries.
+    """
+    outcomes = OUTCOMES if dice is None else outcome_table(dice)
+    if roll_weights is None:
+        roll_weights = [1] * len(outcomes)
+    if len(roll_weights) != len(outcomes):
+        raise ValueError(f"need {len(outcomes)} roll weights, got {len(roll_weights)}")
+    total = sum(roll_weights)
+    if total <= 0 or min(roll_weights) < 0:
+        raise ValueError("roll weights must be non-negative and not all zero")
+    scoring, extras = {}, {}
+    wicket = 0.0
+    for outcome, weight in zip(outcomes, roll_weights):
+        p = weight / total
+        if not p:
+            continue
+        if outcome.wicket:
+            wicket += p
+        else:
+            group = scoring if outcome.legal else extras
+            group[outcome.runs] = group.get(outcome.runs, 0.0) + p
+    return sorted(scoring.items()), sorted(extras.items()), wicket
+
+
+def _step(table, col, scoring, extras, p_wicket, add=0.0):
+    """Fill diagonal *col* of a skewed (wickets, balls, runs + balls) table.
+
+    Every cell depends on one ball fewer (one diagonal back, less any runs
+    scored) or on an extra at the same ball count (back by the extra's
+    runs), so a whole diagonal is a few slice operations. *add* is added to
+    every cell, for expectations.
+    """
+    value = add + p_wicket * table[:-1, :-1, col - 1]
+    for runs, p in scoring:
+        value += p * table[1:, :-1, col - 1 - runs]
+    for runs, p in extras:
+        value += p * table[1:, 1:, col - runs]
+    table[1:, 1:, col] = value
+
+
+def _pad(scoring, extras):
+    return max([runs for runs, _ in scoring + extras] + [1])
+
+
+class ChaseTable:
+    """Win and tie probabilities, and expected runs, for every state of a chase.
+
+    A state is (runs needed, legal balls left, wickets left). Build one
+    with solve_chase(), or load one saved with save() using load(). The
+    arrays are indexed [wickets, balls, runs].
+    """
+
+    def __init__(self, win, tie, runs):
+        self.win_table = win
+        self.tie_table = tie
+        self.runs_table = runs
+        self.max_needed = win.shape[2] - 1
+
+    def save(self, path):
+        """Write the tables to *path* as a single .npy array."""
+        with open(path, "wb") as f:
+            np.save(f, np.stack([self.win_table, self.tie_table, self.runs_table]))
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Read a table written by save(), memory-mapped unless *mmap_mode* is None.
+
+        Nothing records the dice or format it was solved for, beyond the
+        shape: check that against the MatchConfig in use.
+        """
+        tables = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        if tables.ndim != 4 or len(tables) != 3:
+            raise ValueError(f"{path} does not hold a ChaseTable")
+        return cls(*tables)
+
+    def _lookup(self, table, done, needed, balls_left, wickets_left):
+        if needed <= 0:
+            return done
+        if needed > self.max_needed:
+            raise ValueError(f"table only covers up to {self.max_needed} runs needed")
+        return float(table[wickets_left, balls_left, needed])
+
+    def win(self, needed, balls_left, wickets_left):
+        return self._lookup(self.win_table, 1.0, needed, balls_left, wickets_left)
+
+    def tie(self, needed, balls_left, wickets_left):
+        return self._lookup(self.tie_table, 0.0, needed, balls_left, wickets_left)
+
+    def loss(self, needed, balls_left, wickets_left):
+        return (1 - self.win(needed, balls_left, wickets_left)
+                - self.tie(needed, balls_left, wickets_left))
+
+    def expected_runs(self, needed, balls_left, wickets_left):
+        """Mean runs still to come, the chase stopping at the target.
+
+        With *needed* None the innings has no target: the table's widest
+        chase stands in, which is exact unless an innings can make
+        max_needed runs more.
+        """
+        if needed is None:
+            needed = self.max_needed
+        return self._lookup(self.runs_table, 0.0, needed, balls_left, wickets_left)
+
+
+def solve_chase(max_needed=DEFAULT_MAX_RUNS, roll_weights=None, dice=None, config=None):
+    """Solve every chase state up to *max_needed* runs and return a ChaseTable.
+
+    *dice*, *roll_weights* and *config* are as for Game: a face list
+    (DEFAULT_DICE if None), relative weights per face (uniform if None) and
+    the MatchConfig (T20 if None).
+    """
+    config = T20 if config is None else config
+    scoring, extras, p_wicket = _outcomes(roll_weights, dice)
+    balls = config.balls
+    pad = _pad(scoring, extras)
+    width = pad + max_needed + balls + 1
+
+    # Column pad + d holds the states with runs needed + balls left == d.
+    ball_idx = np.arange(balls + 1)[:, None]
+    needed = np.arange(width)[None, :] - pad - ball_idx
+    win = np.zeros((config.wickets + 1, balls + 1, width))
+    win[:, needed <= 0] = 1.0
+    tie = np.zeros_like(win)
+    # Out of balls or wickets one run short is a tie.
+    tie[0, needed == 1] = 1.0
+    tie[:, 0, needed[0] == 1] = 1.0
+    # Runs still to come: none once the chase is over, otherwise the mean
+    # off the next ball plus those expected after it.
+    runs = np.zeros_like(win)
+    mean = sum(r * p for r, p in scoring + extras)
+
+    for d in range(1, max_needed + balls + 1):
+        col = pad + d
+        for table, done, add in ((win, 1.0, 0.0), (tie, 0.0, 0.0), (runs, 0.0, mean)):
+            _step(table, col, scoring, extras, p_wicket, add)
+            # Balls left >= d means the target is already reached.
+            table[1:, d:, col] = done
+
+    cols = pad + np.arange(max_needed + 1)[None, :] + ball_idx
+    return ChaseTable(*(np.take_along_axis(table, cols[None], axis=2)
+                        for table in (win, tie, runs)))
+
+
+def first_innings_distribution(max_runs=DEFAULT_MAX_RUNS, roll_weights=None, dice=None,
+                               config=None):
+    """Return an array of P(first-innings total == s) for s in 0..max_runs.
+
+    Mass above *max_runs* is dropped, so it sums to just under 1.
+    """
+    config = T20 if config is None else config
+    scoring, extras, p_wicket = _outcomes(roll_weights, dice)
+    balls, wickets = config.balls, config.wickets
+    pad = _pad(scoring, extras)
+
+    # dist[w, b, pad + s + b] is P(s more runs) with b balls and w wickets
+    # left. An innings with neither left scores nothing more.
+    dist = np.zeros((wickets + 1, balls + 1, pad + max_runs + balls + 1))
+    dist[0, np.arange(balls + 1), pad + np.arange(balls + 1)] = 1.0
+    dist[:, 0, pad] = 1.0
+    for e in range(1, max_runs + balls + 1):
+        _step(dist, pad + e, scoring, extras, p_wicket)
+    return dist[wickets, balls, pad + balls:]
+
+
+def match_probabilities(roll_weights=None, max_runs=DEFAULT_MAX_RUNS, dice=None, config=None):
+    """Return MatchOdds for the side batting first winning, a tie, or a loss."""
+    config = T20 if config is None else config
+    first = first_innings_distribution(max_runs, roll_weights, dice, config)
+    chase = solve_chase(max_runs + 1, roll_weights, dice, config)
+    balls, wickets = config.balls, config.wickets
+    targets = np.arange(len(first)) + 1
+    second = float(first @ chase.win_table[wickets, balls, targets])
+    tie = float(first @ chase.tie_table[wickets, balls, targets])
+    return MatchOdds(bat_first=float(first.sum()) - second - tie, tie=tie, bat_second=second)
+
+
+def innings_pmf(max_runs=DEFAULT_MAX_RUNS, roll_weights=None, dice=None, config=None):
+    """Return the InningsPMF of an innings with no target.
+
+    Runs above *max_runs* are dropped, as in first_innings_distribution().
+    Results are memoized on what they depend on: the format's balls and
+    wickets and the probabilities of each outcome.
+    """
+    config = T20 if config is None else config
+    scoring, extras, p_wicket = _outcomes(roll_weights, dice)
+    return _innings_pmf(max_runs, tuple(scoring), tuple(extras), p_wicket,
+                        config.balls, config.wickets)
+
+
+@lru_cache(maxsize=32)
+def _innings_pmf(max_runs, scoring, extras, p_wicket, balls, wickets):
+    size = max_runs + 1
+    # Runs off the extras bowled before each ball that counts. There can be
+    # any number of them, so these are the coefficients of 1 / (1 - X) for
+    # X the extras' generating function.
+    before = np.zeros(size)
+    before[0] = 1.0
+    for s in range(1, size):
+        before[s] = sum(p * before[s - runs] for runs, p in extras if runs <= s)
+    ball = np.zeros(size)
+    for runs, p in scoring:
+        if runs < size:
+            ball[runs] += p
+
+    # Score to score transition matrices for one legal ball, extras first,
+    # without and with a wicket, side by side so that each ball is one
+    # matrix product. Scores past max_runs fall off the end. Far tails
+    # underflow to subnormals, which make every product several times
+    # slower, so they are flushed to zero.
+    gap = np.arange(size)[None, :] - np.arange(size)[:, None]
+    upper, gap = gap >= 0, np.maximum(gap, 0)
+    transition = np.hstack([np.where(upper, np.convolve(before, ball)[gap], 0.0),
+                            np.where(upper, p_wicket * before[gap], 0.0)])
+    transition[transition < _TINY] = 0.0
+
+    # dist[w, s] after each legal ball. An innings all out stays put, and
+    # before ball b + 1 at most b wickets are down.
+    dist = np.zeros((wickets + 1, size))
+    dist[0, 0] = 1.0
+    for b in range(balls):
+        batting = min(b + 1, wickets)
+        step = dist[:batting] @ transition
+        step[step < _TINY] = 0.0
+        dist[:batting] = step[:, :size]
+        dist[1:batting + 1] += step[:, size:]
+    runs, by_wickets = dist.sum(axis=0), dist.sum(axis=1)
+    for array in (dist, runs, by_wickets):
+        array.setflags(write=False)
+    return InningsPMF(dist, runs, by_wickets)
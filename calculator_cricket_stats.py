@@ -0,0 +1,272 @@
+"""Streaming, mergeable statistics over many Calculator Cricket matches.
+
+    stats = MatchStats()
+    for ...:
+        result = game.simulate()
+        stats.add_match(game, result)
+    stats.first_innings.summary()
+
+Nothing is kept per match, so memory stays the same however many matches
+are added. Bounded integers, such as totals, scores and margins, are
+counted exactly in a Histogram. Unbounded or fractional values, such as
+economy rates, go in a QuantileSketch. Both merge by adding counts, so
+workers can each fill their own and send them back to be combined; see
+calculator_cricket_runner.tournament_stats.
+"""
+
+import math
+import operator
+from collections import namedtuple
+
+from calculator_cricket import T20
+
+# Values counted in a Histogram's list; larger ones go in its overflow dict.
+# Team totals under the standard dice pass 400 with probability around 1e-13.
+HISTOGRAM_SIZE = 512
+
+Summary = namedtuple("Summary", ["count", "mean", "min", "p5", "median", "p95", "max"])
+Summary.__doc__ = """The count, mean and chosen quantiles of a distribution.
+
+Everything but the count is None when it is empty.
+"""
+
+
+class Histogram:
+    """Exact counts of non-negative integers.
+
+    Values below *size* are counted in a list. Larger ones, which should
+    be rare, are counted in a dict, so nothing is approximated.
+    """
+
+    __slots__ = ("counts", "overflow", "count", "total")
+
+    def __init__(self, size=HISTOGRAM_SIZE):
+        self.counts = [0] * size
+        self.overflow = {}
+        self.count = 0
+        self.total = 0
+
+    def add(self, value, count=1):
+        """Count *value*, *count* times."""
+        if value < 0:
+            raise ValueError(f"histogram values must be non-negative, got {value}")
+        if value < len(self.counts):
+            self.counts[value] += count
+        else:
+            self.overflow[value] = self.overflow.get(value, 0) + count
+        self.count += count
+        self.total += value * count
+
+    def merge(self, other):
+        """Add *other*'s counts to this histogram and return it."""
+        if len(other.counts) != len(self.counts):
+            raise ValueError("histograms of different sizes cannot be merged")
+        self.counts[:] = map(operator.add, self.counts, other.counts)
+        for value, count in other.overflow.items():
+            self.overflow[value] = self.overflow.get(value, 0) + count
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def items(self):
+        """Yield (value, count) for every value counted, in order."""
+        for value, count in enumerate(self.counts):
+            if count:
+                yield value, count
+        yield from sorted(self.overflow.items())
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """Return the smallest value with at least a fraction *q* of counts at or below it."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"quantile must be between 0 and 1, got {q}")
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for value, count in self.items():
+            seen += count
+            if seen >= rank:
+                return value
+
+    def summary(self):
+        return _summary(self)
+
+
+class QuantileSketch:
+    """Approximate quantiles of non-negative numbers, to a relative error.
+
+    Positive values are counted in logarithmic buckets, so that every
+    quantile() is within *accuracy* of a value of that rank, relatively.
+    Sketches of the same accuracy merge by adding bucket counts. At most
+    *max_buckets* are kept: past that the lowest are folded together,
+    which coarsens only the smallest quantiles.
+    """
+
+    __slots__ = ("accuracy", "max_buckets", "buckets", "zeros", "count", "total",
+                 "min", "max", "_gamma", "_log_gamma")
+
+    def __init__(self, accuracy=0.01, max_buckets=2048):
+        if not 0 < accuracy < 1:
+            raise ValueError(f"accuracy must be between 0 and 1, got {accuracy}")
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = self.max = None
+
+    def add(self, value):
+        if value < 0:
+            raise ValueError(f"sketch values must be non-negative, got {value}")
+        if value == 0:
+            self.zeros += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        folded = sum(self.buckets.pop(key) for key in keys[:excess])
+        self.buckets[keys[excess]] += folded
+
+    def merge(self, other):
+        """Add *other*'s counts to this sketch and return it."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("sketches of different accuracy cannot be merged")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                if self.min is None or value < self.min:
+                    self.min = value
+                if self.max is None or value > self.max:
+                    self.max = value
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """Return a value within the sketch's accuracy of the *q* quantile."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"quantile must be between 0 and 1, got {q}")
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        if rank <= self.zeros:
+            return 0.0
+        # The extremes are known exactly.
+        if rank == 1:
+            return self.min
+        if rank == self.count:
+            return self.max
+        seen = self.zeros
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                # The bucket covers (gamma^(key-1), gamma^key]; this is the
+                # point within accuracy of both ends.
+                estimate = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+
+    def summary(self):
+        return _summary(self)
+
+
+def _summary(dist):
+    if not dist.count:
+        return Summary(0, None, None, None, None, None, None)
+    q = dist.quantile
+    return Summary(dist.count, dist.mean, q(0), q(0.05), q(0.5), q(0.95), q(1))
+
+
+class MatchStats:
+    """Distributions over every match added, in constant memory.
+
+    Histograms: first_innings and second_innings (team totals),
+    team_wickets (both innings), batter_runs (every batter who went in),
+    bowler_runs and bowler_wickets (every bowler who bowled), margin_runs
+    and margin_wickets (by how much matches were won). QuantileSketch:
+    bowler_economy (runs per six legal balls, for bowlers with one).
+    *config* is the MatchConfig of the matches, T20 if None.
+    """
+
+    HISTOGRAMS = ("first_innings", "second_innings", "team_wickets", "batter_runs",
+                  "bowler_runs", "bowler_wickets", "margin_runs", "margin_wickets")
+    SKETCHES = ("bowler_economy",)
+
+    def __init__(self, config=None):
+        self.config = T20 if config is None else config
+        self.matches = 0
+        self.ties = 0
+        for name in self.HISTOGRAMS:
+            setattr(self, name, Histogram())
+        for name in self.SKETCHES:
+            setattr(self, name, QuantileSketch())
+
+    def add_match(self, game, result):
+        """Add the match *game* has just played, with MatchResult *result*.
+
+        The players' figures are read from the game, so call this before
+        the next match is played with it.
+        """
+        self.matches += 1
+        self.first_innings.add(result.first_innings.runs)
+        self.second_innings.add(result.second_innings.runs)
+        if result.margin_type == "runs":
+            self.margin_runs.add(result.margin)
+        elif result.margin_type == "wickets":
+            self.margin_wickets.add(result.margin)
+        else:
+            self.ties += 1
+        for batting, bowling in ((game.batting_first, game.batting_second),
+                                 (game.batting_second, game.batting_first)):
+            self.team_wickets.add(batting.outs)
+            add = self.batter_runs.add
+            for runs in batting.state.runs[:batting.next_idx]:
+                add(runs)
+            state = bowling.state
+            for balls, runs, wickets in zip(state.bowling_balls, state.runs_conceded,
+                                            state.wickets_taken):
+                if balls or runs:
+                    self.bowler_runs.add(runs)
+                    self.bowler_wickets.add(wickets)
+                    if balls:
+                        self.bowler_economy.add(6 * runs / balls)
+
+    def merge(self, other):
+        """Add *other*'s matches to these stats and return them."""
+        if other.config != self.config:
+            raise ValueError("stats of different formats cannot be merged")
+        self.matches += other.matches
+        self.ties += other.ties
+        for name in self.HISTOGRAMS + self.SKETCHES:
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+    def summary(self):
+        """Return a dict of a Summary for each distribution."""
+        return {name: getattr(self, name).summary()
+                for name in self.HISTOGRAMS + self.SKETCHES}
@@ -1,11 +1,13 @@
+import dataclasses
 import random
 from unittest.mock import patch
 
 import pytest
 
 from calculator_cricket import (
-    MAX_OVERS, MAX_PER_BOWLER, MAX_WICKETS, TEAM_SIZE,
-    BallResult, Game, Player, Team, abbreviate_name,
+    DEFAULT_DICE, MAX_OVERS, MAX_PER_BOWLER, MAX_WICKETS, ODI, T10, T20, TEAM_SIZE,
+    BallResult, Delivery, Game, InningsEnd, Leaderboard, MatchConfig, MatchResult, OverEnd,
+    OverStart, Player, Team, abbreviate_name, load_dice, outcome_table,
 )
 
 
@@ -113,6 +115,28 @@ class TestTeam:
         assert t.captain in t.players
         assert t.keeper in t.players[:6]
 
+    def test_players_are_views_of_team_state(self):
+        t = Team("Test")
+        t.players[3].runs = 12
+        t.players[3].out = True
+        assert t.state.runs[3] == 12
+        assert t.state.out[3] == 1
+        assert t.players[3].out is True
+        assert not hasattr(t.players[3], "__dict__")
+
+    def test_reset_clears_state_in_place(self):
+        t = Team("Test")
+        players, runs = list(t.players), t.state.runs
+        t.players[0].runs = 40
+        t.players[6].wickets_taken = 2
+        t.players[1].how_out = "b X. Smith"
+        t.reset()
+        assert t.players == players and t.state.runs is runs
+        assert t.players[0].runs == 0
+        assert t.players[6].wickets_taken == 0
+        assert t.players[1].how_out is None
+        assert len(t.state.runs) == TEAM_SIZE
+
 
 # ---------------------------------------------------------------------------
 # State logic tests — _process_ball (controlled rolls)
@@ -215,6 +239,72 @@ class TestProcessBall:
         assert team.striker_idx == original_striker
 
 
+# ---------------------------------------------------------------------------
+# Outcome table and custom dice
+# ---------------------------------------------------------------------------
+
+class TestCustomDice:
+    def test_default_table(self):
+        outcomes = outcome_table()
+        assert len(outcomes) == len(DEFAULT_DICE) == 10
+        assert [o.runs for o in outcomes] == [0, 1, 2, 3, 4, 0, 6, 0, 1, 0]
+        assert [o.swap for o in outcomes].count(True) == 2
+        assert not outcomes[8].legal and outcomes[9].wicket
+
+    @pytest.mark.parametrize("face", ["six", -1, 2.5, True])
+    def test_unknown_face(self, face):
+        with pytest.raises(ValueError):
+            outcome_table([0, face])
+
+    def test_empty_dice(self):
+        with pytest.raises(ValueError):
+            outcome_table([])
+
+    def test_no_legal_face(self):
+        with pytest.raises(ValueError, match="legal"):
+            outcome_table(["extra", "extra"])
+        with pytest.raises(ValueError):
+            Game("Team A", "Team B", dice=["extra"])
+
+    def test_five_run_face(self):
+        random.seed(42)
+        game = Game("Team A", "Team B", dice=[5, "wicket"])
+        team, bowling_team = game.team1, game.team2
+        striker = team.striker
+        result = game._process_ball(team, bowling_team, bowling_team.players[5], 0)
+        assert result == BallResult("5 runs", 5, False, True, None)
+        assert striker.runs == 5
+        assert team.non_striker is striker
+
+    def test_simulate_uses_dice(self):
+        random.seed(42)
+        game = Game("Team A", "Team B", dice=[6, 6, "extra"])
+        result = game.simulate(seed=3)
+        assert result.first_innings.outs == 0
+        assert result.first_innings.legal_balls == MAX_OVERS * 6
+
+    def test_roll_weights(self):
+        game = Game("Team A", "Team B", rng=random.Random(0),
+                    roll_weights=[0, 0, 0, 0, 0, 0, 1, 0, 0, 0])
+        result = game.simulate(seed=1)
+        assert result.first_innings.runs == MAX_OVERS * 36
+
+    def test_roll_weights_length(self):
+        with pytest.raises(ValueError):
+            Game("Team A", "Team B", roll_weights=[1, 1])
+
+    def test_load_dice(self, tmp_path):
+        path = tmp_path / "dice.json"
+        path.write_text('[0, 1, 2, "extra", "wicket"]')
+        assert load_dice(path) == [0, 1, 2, "extra", "wicket"]
+        path.write_text('{"faces": [0]}')
+        with pytest.raises(ValueError):
+            load_dice(path)
+        path.write_text('["extra", "extra"]')
+        with pytest.raises(ValueError):
+            load_dice(path)
+
+
 # ---------------------------------------------------------------------------
 # Dismissal description tests
 # ---------------------------------------------------------------------------
@@ -303,6 +393,87 @@ class TestFullInnings:
         assert total_overs >= MAX_OVERS
 
 
+# ---------------------------------------------------------------------------
+# Event stream — innings_events
+# ---------------------------------------------------------------------------
+
+class TestInningsEvents:
+    def _events(self, seed, target=None, roll_fn=None):
+        game = Game("Team A", "Team B", rng=random.Random(seed))
+        events = list(game.innings_events(game.team1, game.team2, target, roll_fn))
+        return game.team1, events
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_event_order(self, seed):
+        team, events = self._events(seed)
+        assert isinstance(events[0], OverStart)
+        assert isinstance(events[-1], InningsEnd)
+        deliveries = [e for e in events if isinstance(e, Delivery)]
+        assert len(deliveries) == team.balls
+        for before, after in zip(events, events[1:]):
+            if isinstance(before, Delivery) and before.last_ball:
+                assert isinstance(after, OverEnd)
+            if isinstance(after, OverEnd):
+                assert isinstance(before, Delivery) and before.last_ball
+            if isinstance(before, OverEnd) and before.innings_over:
+                assert isinstance(after, InningsEnd)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_headless_innings(self, seed):
+        # Wickets draw a fielder for the scorecard, which the headless loop
+        # skips, so compare on rolls with no wickets.
+        roll_rng = random.Random(seed)
+        rolls = [roll_rng.randint(0, 8) for _ in range(300)]
+        team, events = self._events(seed, target=seed * 100 or None,
+                                    roll_fn=make_roll_fn(rolls))
+        game = Game("Team A", "Team B", rng=random.Random(seed))
+        game._simulate_innings(game.team1, game.team2, target=seed * 100 or None,
+                               roll_fn=make_roll_fn(rolls))
+        end = events[-1].result
+        assert (end.runs, end.outs, end.legal_balls, end.balls) == (
+            game.team1.runs, game.team1.outs, game.team1.legal_balls, game.team1.balls)
+        assert [p.runs for p in team.players] == [p.runs for p in game.team1.players]
+        assert team.striker_idx == game.team1.striker_idx
+
+    def test_delivery_fields(self):
+        team, events = self._events(1)
+        bowlers = [e.bowler for e in events if isinstance(e, OverStart)]
+        assert all(a is not b for a, b in zip(bowlers, bowlers[1:]))
+        first = next(e for e in events if isinstance(e, Delivery))
+        assert first.over_number == 1
+        assert first.striker is team.players[0] or first.striker is team.players[1]
+        assert first.runs == first.result.runs
+
+    def test_rolls_only_when_a_delivery_is_pulled(self):
+        rolls = []
+
+        def roll_fn():
+            rolls.append(4)
+            return 4
+
+        game = Game("Team A", "Team B", rng=random.Random(0))
+        stream = game.innings_events(game.team1, game.team2, roll_fn=roll_fn)
+        assert isinstance(next(stream), OverStart)
+        assert rolls == []
+        for _ in range(6):
+            event = next(stream)
+        assert event.last_ball and len(rolls) == 6
+        assert isinstance(next(stream), OverEnd)
+        assert isinstance(next(stream), OverStart)
+        assert len(rolls) == 6
+
+    def test_end_reasons(self):
+        _, events = self._events(0, roll_fn=lambda: 9)
+        assert events[-1].reason == "all out"
+        assert events[-1].result.outs == MAX_WICKETS
+        _, events = self._events(0, target=10, roll_fn=lambda: 6)
+        assert events[-1].reason == "target"
+        assert events[-1].result.runs == 12
+        _, events = self._events(0, roll_fn=lambda: 0)
+        assert events[-1].reason == "overs"
+        assert events[-1].result.legal_balls == MAX_OVERS * 6
+
+
 # ---------------------------------------------------------------------------
 # Integration tests — declare_winner
 # ---------------------------------------------------------------------------
@@ -336,3 +507,229 @@ class TestDeclareWinner:
         game.declare_winner()
         captured = capsys.readouterr()
         assert "It's a tie!" in captured.out
+
+
+# ---------------------------------------------------------------------------
+# Match formats — MatchConfig
+# ---------------------------------------------------------------------------
+
+class TestMatchConfig:
+    def test_default_is_t20(self):
+        assert MatchConfig() == T20
+        assert (T20.overs, T20.overs_per_bowler, T20.team_size) == (
+            MAX_OVERS, MAX_PER_BOWLER, TEAM_SIZE)
+        assert T20.balls == MAX_OVERS * 6
+        assert T20.bowler_balls == MAX_PER_BOWLER * 6
+        assert T20.wickets == MAX_WICKETS
+        assert _make_game().config is T20
+
+    def test_frozen_and_hashable(self):
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            T20.overs = 50
+        assert len({T10, T20, ODI, MatchConfig(overs=10, overs_per_bowler=2)}) == 3
+
+    @pytest.mark.parametrize("kwargs", [
+        {"overs": 0},
+        {"team_size": 1},
+        {"first_bowler": 11},
+        {"overs": 22},
+        {"overs": 50, "overs_per_bowler": 9},
+        {"dismissals": ()},
+    ])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            MatchConfig(**kwargs)
+
+    @pytest.mark.parametrize("config", [T10, ODI])
+    def test_simulate_respects_format(self, config):
+        game = Game("Team A", "Team B", rng=random.Random(0), config=config)
+        longest = 0
+        for seed in range(30):
+            result = game.simulate(seed=seed)
+            for innings in (result.first_innings, result.second_innings):
+                assert innings.legal_balls <= config.balls
+                assert innings.outs <= config.wickets
+                longest = max(longest, innings.legal_balls)
+            for team in (game.team1, game.team2):
+                assert max(p.bowling_balls for p in team.players) <= config.bowler_balls
+        if config is ODI:
+            assert longest > T20.balls
+        else:
+            assert longest == T10.balls
+
+    def test_innings_events_follow_format(self, capsys):
+        game = Game("Team A", "Team B", rng=random.Random(1), config=T10)
+        events = list(game.innings_events(game.team1, game.team2, roll_fn=lambda: 0))
+        assert sum(isinstance(e, OverStart) for e in events) == T10.overs
+        assert events[-1].result.legal_balls == T10.balls
+
+    def test_small_sides_and_custom_dismissals(self):
+        config = MatchConfig(overs=5, overs_per_bowler=3, team_size=6, first_bowler=3,
+                             dismissals=[("Retired", 1)])
+        game = Game("Team A", "Team B", rng=random.Random(2), config=config)
+        result = game.simulate(seed=3, roll_fn=lambda: 9)
+        assert len(game.team1.players) == 6
+        assert result.first_innings.outs == 5
+        assert result.winner is None
+        assert {p.index for p in game.batting_second.players if p.bowling_balls} <= {3, 4, 5}
+
+    def test_large_sides(self):
+        config = MatchConfig(team_size=30, first_bowler=20)
+        game = Game("Team A", "Team B", rng=random.Random(5), config=config)
+        names = [p.name for p in game.team1.players + game.team2.players]
+        assert len(set(names[:30])) == len(set(names[30:])) == 30
+        result = game.simulate(seed=6)
+        assert result.first_innings.outs <= 29
+        with pytest.raises(ValueError, match="squads"):
+            Game("Team A", "Team B", config=MatchConfig(team_size=3000, first_bowler=2990))
+
+    def test_unknown_dismissal_is_described_by_type(self):
+        game = Game("Team A", "Team B", rng=random.Random(2),
+                    config=MatchConfig(dismissals=[("Retired Out", 1)]))
+        bowler = game.team2.players[5]
+        result = game._process_ball(game.team1, game.team2, bowler, 9)
+        assert result.desc == "OUT! (Retired Out)"
+        assert game.team1.players[0].how_out == "Retired Out"
+
+    def test_formats_share_a_process(self):
+        results = {config: Game("A", "B", config=config).simulate(seed=4)
+                   for config in (T10, T20, ODI)}
+        assert results[T20] == Game("A", "B").simulate(seed=4)
+
+
+# ---------------------------------------------------------------------------
+# Leaderboards
+# ---------------------------------------------------------------------------
+
+def _sorted_batters(team):
+    return sorted(team.players, key=lambda b: b.runs, reverse=True)
+
+
+def _sorted_bowlers(team):
+    bowled = [b for b in team.players if b.bowling_balls > 0]
+    return sorted(bowled, key=lambda b: (-b.wickets_taken, b.runs_conceded))
+
+
+class TestLeaderboards:
+    def test_updates_match_a_stable_sort(self):
+        rng = random.Random(0)
+        scores = [0] * 8
+        full = Leaderboard(lambda i: -scores[i])
+        top = Leaderboard(lambda i: -scores[i], 3)
+        for _ in range(200):
+            i = rng.randrange(8)
+            scores[i] += rng.choice([0, 1, 1, 4])
+            full.update(i)
+            top.update(i)
+            ranked = sorted(set(full.rows), key=lambda j: -scores[j])
+            assert full.top() == ranked
+            assert top.top() == ranked[:3]
+
+    def test_simulate_matches_sort(self):
+        game = _make_game()
+        for seed in range(10):
+            game.simulate(seed=seed)
+            for team in (game.team1, game.team2):
+                assert team.top_batters() == _sorted_batters(team)[:3]
+                assert team.top_bowlers(None) == _sorted_bowlers(team)
+
+    def test_play_innings_keeps_boards_current(self, capsys):
+        game = Game("Team A", "Team B", rng=random.Random(3))
+        team, bowling = game.team1, game.team2
+        rolls = random.Random(4).choices(range(10), k=400)
+        game.play_innings(team, bowling, roll_fn=make_roll_fn(rolls), input_fn=noop_input)
+        assert not team.boards_stale and not bowling.boards_stale
+        assert team.top_batters() == _sorted_batters(team)[:3]
+        assert bowling.top_bowlers(None) == _sorted_bowlers(bowling)
+
+    def test_series_totals(self):
+        game = Game("Team A", "Team B", rng=random.Random(5), series=True)
+        runs = [0] * TEAM_SIZE
+        wickets = [0] * TEAM_SIZE
+        for seed in range(5):
+            game.simulate(seed=seed)
+            runs = [r + p.runs for r, p in zip(runs, game.team1.players)]
+            wickets = [w + p.wickets_taken for w, p in zip(wickets, game.team1.players)]
+        series = game.team1.series
+        assert series.matches == 5
+        assert series.runs == runs
+        assert series.wickets_taken == wickets
+        assert series.batting.top() == sorted(range(TEAM_SIZE), key=lambda i: -runs[i])[:3]
+        assert _make_game().team1.series is None
+
+
+# ---------------------------------------------------------------------------
+# Headless simulation — Game.simulate
+# ---------------------------------------------------------------------------
+
+class TestSimulate:
+    def test_returns_match_result_without_output(self, capsys):
+        game = _make_game()
+        result = game.simulate(seed=1)
+        assert isinstance(result, MatchResult)
+        assert capsys.readouterr().out == ""
+
+    def test_same_seed_same_result(self):
+        assert _make_game().simulate(seed=7) == _make_game().simulate(seed=7)
+
+    def test_game_is_reusable(self):
+        game = _make_game()
+        first = game.simulate(seed=3)
+        game.simulate(seed=4)
+        assert game.simulate(seed=3) == first
+
+    def test_result_matches_team_state(self):
+        game = _make_game()
+        result = game.simulate(seed=11)
+        first, second = game.batting_first, game.batting_second
+        assert result.first_innings.runs == first.runs
+        assert result.second_innings.runs == second.runs
+        assert second.runs <= first.runs + 6
+        if result.winner is None:
+            assert first.runs == second.runs
+        elif result.margin_type == "runs":
+            assert result.winner == first.name
+            assert result.margin == first.runs - second.runs
+        else:
+            assert result.winner == second.name
+            assert result.margin == MAX_WICKETS - second.outs
+
+    def test_innings_respects_limits(self):
+        game = _make_game()
+        for seed in range(20):
+            result = game.simulate(seed=seed)
+            for innings in (result.first_innings, result.second_innings):
+                assert innings.legal_balls <= MAX_OVERS * 6
+                assert innings.outs <= MAX_WICKETS
+
+    @pytest.mark.parametrize("policy", ["bat", "bowl"])
+    def test_toss_policy(self, policy):
+        game = _make_game()
+        for seed in range(20):
+            result = game.simulate(seed=seed, toss_policy=policy)
+            if result.toss_winner == game.team1.name:
+                assert result.toss_choice == policy
+                bats_first = game.batting_first is game.team1
+                assert bats_first == (policy == "bat")
+
+    def test_invalid_toss_policy(self):
+        game = _make_game()
+        # Team 1 loses this toss, so its policy is never asked for.
+        assert game.simulate(seed=0).toss_winner == game.team2.name
+        with pytest.raises(ValueError):
+            game.simulate(seed=0, toss_policy="field")
+
+    def test_invalid_toss_policy_choice(self):
+        game = _make_game()
+        # Team 1 wins this toss.
+        assert game.simulate(seed=1).toss_winner == game.team1.name
+        with pytest.raises(ValueError):
+            game.simulate(seed=1, toss_policy=lambda game: "field")
+
+    def test_controlled_rolls(self):
+        game = _make_game()
+        result = game.simulate(seed=5, roll_fn=lambda: 9)
+        assert result.first_innings.runs == 0
+        assert result.first_innings.outs == MAX_WICKETS
+        assert result.first_innings.legal_balls == MAX_WICKETS
+        assert result.winner is None
@@ -0,0 +1,228 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from calculator_cricket import (
+    MAX_OVERS, MAX_PER_BOWLER, MAX_WICKETS, ODI, T10, T20, TEAM_SIZE, Game, MatchConfig,
+)
+import calculator_cricket_batch
+from calculator_cricket_batch import (
+    fork_innings, project_innings, simulate_innings, simulate_matches,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _reference_innings(rolls, target=None, dice=None, config=None):
+    """Play one row of rolls through the object engine."""
+    random.seed(0)
+    game = Game("Batting XI", "Bowling XI", dice=dice, config=config)
+    it = iter(int(r) for r in rolls)
+    game._simulate_innings(game.team1, game.team2, target=target,
+                           roll_fn=lambda: next(it))
+    return game.team1
+
+
+def _random_rolls(n, width=400, seed=0):
+    return np.random.default_rng(seed).integers(0, 10, size=(n, width), dtype=np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Agreement with Game._simulate_innings
+# ---------------------------------------------------------------------------
+
+class TestMatchesObjectEngine:
+    @pytest.mark.parametrize("target", [None, 40, 150])
+    def test_team_and_batter_totals(self, target):
+        rolls = _random_rolls(60, seed=target or 1)
+        batch = simulate_innings(len(rolls), target=target, rng=1, rolls=rolls)
+        for i, row in enumerate(rolls):
+            team = _reference_innings(row, target)
+            assert batch.runs[i] == team.runs
+            assert batch.outs[i] == team.outs
+            assert batch.legal_balls[i] == team.legal_balls
+            assert batch.balls[i] == team.balls
+            assert list(batch.bat_runs[i]) == [p.runs for p in team.players]
+            assert list(batch.bat_balls[i]) == [p.balls_faced for p in team.players]
+            assert list(batch.bat_out[i]) == [p.out for p in team.players]
+
+    def test_custom_dice(self):
+        dice = [0, 5, 6, 1, "extra", "wicket"]
+        rolls = _random_rolls(40, seed=2) % len(dice)
+        batch = simulate_innings(len(rolls), rng=1, rolls=rolls, dice=dice)
+        for i, row in enumerate(rolls):
+            team = _reference_innings(row, dice=dice)
+            assert batch.runs[i] == team.runs
+            assert list(batch.bat_runs[i]) == [p.runs for p in team.players]
+
+    @pytest.mark.parametrize("config", [
+        T10, ODI, MatchConfig(overs=6, overs_per_bowler=2, team_size=7, first_bowler=3),
+    ])
+    def test_other_formats(self, config):
+        rolls = _random_rolls(40, width=config.balls + 80, seed=config.overs)
+        batch = simulate_innings(len(rolls), target=60, rng=1, rolls=rolls, config=config)
+        assert batch.bat_runs.shape == (40, config.team_size)
+        assert batch.bowl_balls.shape == (40, config.n_bowlers)
+        assert (batch.bowl_balls <= config.bowler_balls).all()
+        for i, row in enumerate(rolls):
+            team = _reference_innings(row, target=60, config=config)
+            assert batch.runs[i] == team.runs
+            assert batch.legal_balls[i] == team.legal_balls
+            assert list(batch.bat_runs[i]) == [p.runs for p in team.players]
+
+    def test_all_out(self):
+        rolls = np.tile(np.array([5, 5, 5, 5, 5, 9], dtype=np.uint8), (3, 20))
+        batch = simulate_innings(3, rng=1, rolls=rolls)
+        assert list(batch.outs) == [MAX_WICKETS] * 3
+        assert list(batch.legal_balls) == [60] * 3
+
+    def test_extras_do_not_use_a_ball(self):
+        rolls = np.full((1, 300), 8, dtype=np.uint8)
+        rolls[0, 1::2] = 0
+        batch = simulate_innings(1, rng=1, rolls=rolls)
+        assert batch.legal_balls[0] == MAX_OVERS * 6
+        assert batch.balls[0] == MAX_OVERS * 6 * 2
+        assert batch.runs[0] == MAX_OVERS * 6
+        assert batch.bat_runs[0].sum() == 0
+
+    def test_too_few_rolls(self):
+        with pytest.raises(ValueError):
+            simulate_innings(1, rng=1, rolls=np.zeros((1, 10), dtype=np.uint8))
+
+
+# ---------------------------------------------------------------------------
+# Invariants on drawn innings
+# ---------------------------------------------------------------------------
+
+class TestInvariants:
+    def setup_method(self):
+        self.first, self.second = simulate_matches(2000, rng=7, chunk_size=512)
+
+    def test_limits(self):
+        for innings in (self.first, self.second):
+            assert (innings.legal_balls <= MAX_OVERS * 6).all()
+            assert (innings.outs <= MAX_WICKETS).all()
+
+    def test_totals_add_up(self):
+        for innings in (self.first, self.second):
+            extras = innings.balls - innings.legal_balls
+            assert (innings.bat_runs.sum(axis=1) + extras == innings.runs).all()
+            assert (innings.bat_balls.sum(axis=1) == innings.legal_balls).all()
+            assert (innings.bat_out.sum(axis=1) == innings.outs).all()
+            assert (innings.bowl_runs.sum(axis=1) == innings.runs).all()
+            assert (innings.bowl_balls.sum(axis=1) == innings.legal_balls).all()
+            assert (innings.bowl_wickets.sum(axis=1) == innings.outs).all()
+
+    def test_bowler_quota(self):
+        assert self.first.bowl_balls.shape[1] == T20.n_bowlers
+        assert (self.first.bowl_balls <= MAX_PER_BOWLER * 6).all()
+
+    def test_chase_stops_at_target(self):
+        # A chase can overshoot the target by at most one scoring shot.
+        assert (self.second.runs <= self.first.runs + 6).all()
+
+    def test_reproducible(self):
+        again = simulate_matches(2000, rng=7, chunk_size=512)
+        assert (again[0].runs == self.first.runs).all()
+        assert (again[1].bat_runs == self.second.bat_runs).all()
+
+    def test_rows_longer_than_first_block(self, monkeypatch):
+        monkeypatch.setattr(calculator_cricket_batch, "ROLL_BLOCK", 25)
+        innings = simulate_innings(200, rng=3)
+        assert (innings.bat_balls.sum(axis=1) == innings.legal_balls).all()
+        assert ((innings.legal_balls == MAX_OVERS * 6) | (innings.outs == MAX_WICKETS)).all()
+
+    def test_shapes(self):
+        assert self.first.bat_runs.shape == (2000, TEAM_SIZE)
+        assert simulate_innings(0, rng=1).runs.shape == (0,)
+
+
+# ---------------------------------------------------------------------------
+# Forks of an innings in progress
+# ---------------------------------------------------------------------------
+
+def _fork_and_finish(consumed, target=None, seed=0, dice=None, config=None):
+    """Fork an innings after *consumed* events, then play it out.
+
+    Returns the fork, the rolls left at the fork, and the finished Team.
+    """
+    game = Game("Batting XI", "Bowling XI", rng=random.Random(seed), dice=dice, config=config)
+    faces = len(game.outcomes)
+    rolls = iter(np.random.default_rng(seed).integers(0, faces, size=600).tolist())
+    events = game.innings_events(game.team1, game.team2, target, lambda: next(rolls))
+    for _ in zip(range(consumed), events):
+        pass
+    fork = fork_innings(game)
+    rest = list(rolls)
+    left = iter(rest)
+    for _ in game.resume_innings(lambda: next(left)):
+        pass
+    return fork, rest, game.team1
+
+
+class TestProjections:
+    # 16 and 8 stop between overs, before and after the OverEnd.
+    @pytest.mark.parametrize("consumed", [0, 1, 5, 8, 16, 60, 500])
+    def test_matches_game(self, consumed):
+        fork, rest, team = _fork_and_finish(consumed, seed=consumed)
+        innings = project_innings(fork, 1, rng=0, rolls=[rest]).innings
+        assert innings.runs[0] == team.runs
+        assert innings.outs[0] == team.outs
+        assert innings.balls[0] == team.balls
+        assert innings.bat_runs[0].tolist() == team.state.runs
+        assert innings.bat_balls[0].tolist() == team.state.balls_faced
+        assert innings.bat_out[0].tolist() == [bool(out) for out in team.state.out]
+
+    @pytest.mark.parametrize("consumed", [3, 40])
+    def test_chase_and_other_format(self, consumed):
+        fork, rest, team = _fork_and_finish(consumed, target=45, seed=4, config=T10,
+                                            dice=[0, 1, 2, 4, 6, "extra", "wicket", 0])
+        innings = project_innings(fork, 1, rolls=[rest]).innings
+        assert (innings.runs[0], innings.outs[0]) == (team.runs, team.outs)
+        assert innings.bat_runs[0].tolist() == team.state.runs
+
+    def test_totals_add_up(self):
+        fork, _, _ = _fork_and_finish(47, target=170, seed=5)
+        assert fork.in_over
+        projection = project_innings(fork, 3000, rng=1, chunk_size=1024)
+        innings = projection.innings
+        assert (innings.bowl_runs.sum(axis=1) == innings.runs).all()
+        assert (innings.bowl_balls.sum(axis=1) == innings.legal_balls).all()
+        assert (innings.bowl_wickets.sum(axis=1) == innings.outs).all()
+        assert (innings.bowl_balls <= MAX_PER_BOWLER * 6).all()
+        assert (innings.runs >= fork.runs).all()
+        assert projection.scores.sum() == pytest.approx(1)
+        assert projection.win == pytest.approx(np.mean(innings.runs >= 170))
+
+    def test_agrees_with_solver(self):
+        solver = pytest.importorskip("calculator_cricket_solver")
+        fork, _, _ = _fork_and_finish(80, target=150, seed=6)
+        projection = project_innings(fork, 20000, rng=2)
+        win = solver.solve_chase(200).win(150 - fork.runs, MAX_OVERS * 6 - fork.legal_balls,
+                                           MAX_WICKETS - fork.outs)
+        assert abs(projection.win - win) < 4 * (win * (1 - win) / 20000) ** 0.5
+
+    def test_first_innings(self):
+        fork, _, _ = _fork_and_finish(20)
+        projection = project_innings(fork, 100, rng=3)
+        assert projection.win is None and projection.tie is None
+
+    def test_finished(self):
+        fork, _, team = _fork_and_finish(10 ** 4, target=30)
+        assert fork.finished
+        projection = project_innings(fork, 5, rng=4)
+        assert (projection.innings.runs == team.runs).all()
+        assert projection.scores[team.runs] == 1
+
+    def test_reproducible(self):
+        fork, _, _ = _fork_and_finish(30)
+        a, b = project_innings(fork, 500, rng=5), project_innings(fork, 500, rng=5)
+        assert (a.innings.runs == b.innings.runs).all()
+
+    def test_needs_innings(self):
+        with pytest.raises(ValueError):
+            fork_innings(Game("Team A", "Team B"))
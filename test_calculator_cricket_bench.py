@@ -0,0 +1,60 @@
+import pytest
+
+import calculator_cricket_bench
+from calculator_cricket_bench import (
+    BENCHMARKS, BenchResult, compare, load_results, main, measure, run, save_results,
+)
+
+
+def _result(name, ops_per_sec):
+    return BenchResult(name, ops_per_sec, 1e9 / ops_per_sec, 1.0, 2.0, 3.0, 20, 1)
+
+
+@pytest.fixture(autouse=True)
+def quick(monkeypatch):
+    monkeypatch.setattr(calculator_cricket_bench, "BATCH_NS", 10_000)
+    monkeypatch.setattr(calculator_cricket_bench, "MIN_BATCHES", 5)
+
+
+class TestMeasure:
+    def test_counts_ops(self):
+        calls = []
+        result = measure("append", lambda: calls.append(None), min_time=0.01)
+        assert result.batches >= 5
+        assert len(calls) >= result.batches * result.batch_size
+        assert result.ops_per_sec == pytest.approx(1e9 / result.mean_ns)
+        assert result.p50_ns <= result.p90_ns <= result.p99_ns
+
+    @pytest.mark.parametrize("name", list(BENCHMARKS))
+    def test_every_benchmark_runs(self, name):
+        result = run([name], min_time=0)[name]
+        assert result.name == name
+        assert result.ops_per_sec > 0
+
+    def test_unknown_name(self):
+        with pytest.raises(ValueError):
+            run(["nonsense"])
+
+
+class TestBaseline:
+    def test_round_trip(self, tmp_path):
+        results = {"team": _result("team", 1000.0), "match": _result("match", 50.0)}
+        save_results(results, tmp_path / "bench.json")
+        assert load_results(tmp_path / "bench.json") == results
+
+    def test_compare(self):
+        baseline = {"a": _result("a", 100.0), "b": _result("b", 100.0), "c": _result("c", 100.0)}
+        current = {"a": _result("a", 95.0), "b": _result("b", 80.0), "d": _result("d", 1.0)}
+        changes = {c.name: c for c in compare(current, baseline, threshold=0.1)}
+        assert set(changes) == {"a", "b"}
+        assert changes["a"].ratio == pytest.approx(0.95)
+        assert not changes["a"].regressed
+        assert changes["b"].regressed
+
+    def test_main_exit_status(self, tmp_path, capsys):
+        path = tmp_path / "bench.json"
+        assert main(["abbreviate_name", "--min-time", "0", "--save", str(path)]) == 0
+        fast = {"abbreviate_name": _result("abbreviate_name", 1e12)}
+        save_results(fast, path)
+        assert main(["abbreviate_name", "--min-time", "0", "--baseline", str(path)]) == 1
+        assert "REGRESSED" in capsys.readouterr().out
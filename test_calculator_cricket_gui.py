@@ -0,0 +1,227 @@
+import random
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from calculator_cricket import T10
+import calculator_cricket_gui
+from calculator_cricket_gui import (
+    FAST_FORWARD_KEYS, PLAY_PHASES, REGIONS, CricketGUI, GamePhase,
+)
+
+
+@pytest.fixture(autouse=True)
+def headless(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+
+
+def _key(gui, key):
+    gui.handle_event(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+
+def _step(gui):
+    """Press what a player would: heads, then bat, then SPACE."""
+    if gui.phase == GamePhase.TOSS_CALL:
+        _key(gui, pygame.K_h)
+    elif gui.phase == GamePhase.TOSS_CHOICE:
+        _key(gui, pygame.K_b)
+    else:
+        _key(gui, pygame.K_SPACE)
+
+
+def _frame(gui):
+    return pygame.image.tobytes(gui.screen, "RGB")
+
+
+def _full_frame(gui):
+    gui._invalidate()
+    gui.draw()
+    return _frame(gui)
+
+
+def _started(seed, balls=3):
+    """A GUI a few balls into a match."""
+    gui = CricketGUI("Team A", "Team B", seed=seed)
+    while gui.phase not in PLAY_PHASES:
+        _step(gui)
+    for _ in range(balls):
+        _step(gui)
+    return gui
+
+
+def _view(gui):
+    """What the match view shows: both scorecards and the current over."""
+    teams = [(team.runs, team.outs, team.balls, team.legal_balls, team.striker_idx,
+              team.non_striker_idx, [(p.runs, p.balls_faced, p.out, p.how_out,
+                                      p.bowling_balls, p.runs_conceded, p.wickets_taken)
+                                     for p in team.players])
+             for team in (gui.game.team1, gui.game.team2)]
+    return (gui.phase, gui.innings_number, teams, gui.current_over_results,
+            gui.current_over_angles, gui.top_bat_idx, gui.bot_bat_idx,
+            [p.index for p in gui.bowler_order], _full_frame(gui))
+
+
+def _run_timers(gui, running):
+    while running():
+        gui._run_timers()
+
+
+class TestDirtyRegions:
+    def test_same_as_full_repaint(self):
+        gui = CricketGUI("Team A", "Team B", seed=1)
+        rng = random.Random(1)
+        gui.draw()
+        scrolled = set()
+        while True:
+            if rng.random() < 0.1 or (gui.phase not in scrolled and gui.phase not in PLAY_PHASES):
+                scrolled.add(gui.phase)
+                gui.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0,
+                                                    y=rng.choice([-1, 1]), flipped=False))
+            elif gui.phase == GamePhase.MATCH_RESULT:
+                break
+            else:
+                _step(gui)
+            gui.draw()
+            assert _frame(gui) == _full_frame(gui), gui.phase
+        assert {GamePhase.TOSS_CALL, GamePhase.MATCH_RESULT} <= scrolled
+
+
+class TestBackground:
+    def test_covers_the_window(self):
+        # The background and painters must leave nothing of an earlier frame.
+        gui = CricketGUI("Team A", "Team B", seed=2)
+        for _ in range(40):
+            _step(gui)
+        assert gui.phase in PLAY_PHASES
+        expected = _full_frame(gui)
+        gui.screen.fill((255, 0, 255))
+        assert _full_frame(gui) == expected
+
+    def test_static_regions(self):
+        gui = CricketGUI("Team A", "Team B", seed=2)
+        for _ in range(5):
+            _step(gui)
+        _full_frame(gui)
+        for name in ("header", "status"):
+            rect = REGIONS[name]
+            assert (pygame.image.tobytes(gui.screen.subsurface(rect), "RGB")
+                    == pygame.image.tobytes(gui.background.subsurface(rect), "RGB"))
+
+    def test_rebuilt_each_innings(self):
+        gui = CricketGUI("Team A", "Team B", seed=3)
+        backgrounds = []
+        while gui.phase != GamePhase.MATCH_RESULT:
+            _step(gui)
+            if gui.background not in backgrounds:
+                backgrounds.append(gui.background)
+        assert len(backgrounds) == 3
+
+
+class TestFastForward:
+    @pytest.mark.parametrize("key", [pygame.K_f, pygame.K_i, pygame.K_m])
+    def test_same_as_pressing_space(self, key):
+        pressed = _started(4)
+        while True:
+            _key(pressed, pygame.K_SPACE)
+            if pressed.phase in FAST_FORWARD_KEYS[key]:
+                break
+        skipped = _started(4)
+        _key(skipped, key)
+        _run_timers(skipped, lambda: skipped.fast_forward is not None)
+        assert _view(skipped) == _view(pressed)
+
+    def test_stops_at_each_over(self):
+        gui = _started(5)
+        _key(gui, pygame.K_f)
+        _run_timers(gui, lambda: gui.fast_forward is not None)
+        assert gui.phase == GamePhase.OVER_COMPLETE
+        assert gui.game.progress.over_balls == 6
+        _key(gui, pygame.K_SPACE)
+        _key(gui, pygame.K_f)
+        _run_timers(gui, lambda: gui.fast_forward is not None)
+        assert gui.phase == GamePhase.OVER_COMPLETE and gui.over_number == 2
+
+    def test_any_key_stops_it(self, monkeypatch):
+        # One ball per slice, so the run is still going after the key.
+        monkeypatch.setattr(calculator_cricket_gui, "FAST_FORWARD_FPS", 10 ** 6)
+        gui = _started(6)
+        _key(gui, pygame.K_m)
+        assert gui.fast_forward is not None
+        _key(gui, pygame.K_x)
+        _run_timers(gui, lambda: gui.timers)
+        assert gui.phase in PLAY_PHASES and gui.fast_forward is None
+
+
+class TestAutoPlay:
+    def test_same_as_pressing_space(self, monkeypatch):
+        monkeypatch.setattr(calculator_cricket_gui, "AUTO_PLAY_MS", 0)
+        pressed = _started(7)
+        while pressed.phase != GamePhase.MATCH_RESULT:
+            _key(pressed, pygame.K_SPACE)
+        auto = _started(7)
+        _key(auto, pygame.K_a)
+        _run_timers(auto, lambda: auto.auto_play is not None)
+        assert _view(auto) == _view(pressed)
+
+    def test_toggles_off(self, monkeypatch):
+        # The step already scheduled must do nothing.
+        monkeypatch.setattr(calculator_cricket_gui, "AUTO_PLAY_MS", 0)
+        gui = _started(8)
+        _key(gui, pygame.K_a)
+        _key(gui, pygame.K_a)
+        balls = gui.batting_team.balls
+        _run_timers(gui, lambda: gui.timers)
+        assert gui.auto_play is None and gui.batting_team.balls == balls
+
+
+class TestSnapshot:
+    @pytest.mark.parametrize("balls", [0, 4, 40])
+    def test_restored_window_plays_on_the_same(self, balls):
+        gui = _started(9, balls)
+        assert gui.phase in PLAY_PHASES
+        data = gui.snapshot()
+        other = CricketGUI("Other", "Side", seed=10)
+        other.restore(data)
+        assert other.snapshot() == data
+        views = []
+        for window in (gui, other):
+            views.append([])
+            for _ in range(15):
+                _key(window, pygame.K_SPACE)
+                views[-1].append(_view(window))
+        assert views[0] == views[1]
+
+    def test_mid_over(self):
+        gui = _started(12, 2)
+        assert gui.current_over_angles and gui.phase == GamePhase.WAITING_FOR_BALL
+        other = CricketGUI("Other", "Side", seed=13)
+        other.restore(gui.snapshot())
+        assert other.current_over_angles == gui.current_over_angles
+        assert [p.index for p in other.bowler_order] == [p.index for p in gui.bowler_order]
+        assert _full_frame(other) == _full_frame(gui)
+
+    def test_bad_data_leaves_window(self):
+        gui = _started(14, 5)
+        data = gui.snapshot()
+        before = _view(gui)
+        with pytest.raises(ValueError):
+            gui.restore(data[:-3])
+        assert _view(gui) == before
+
+    def test_other_format(self):
+        pytest.importorskip("numpy")
+        gui = CricketGUI("Team A", "Team B", seed=15, config=T10)
+        while gui.phase not in PLAY_PHASES:
+            _step(gui)
+        for _ in range(30):
+            _step(gui)
+        other = CricketGUI("Other", "Side", seed=16)
+        other.restore(gui.snapshot())
+        assert other.odds.win_table.shape == gui.odds.win_table.shape
+        assert (other.win_chance, other.projected) == (gui.win_chance, gui.projected)
+        while gui.phase != GamePhase.MATCH_RESULT:
+            _key(gui, pygame.K_SPACE)
+            _key(other, pygame.K_SPACE)
+            assert _view(other) == _view(gui)
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("pygame")
+
+import calculator_cricket_gui_bench
+from calculator_cricket_gui_bench import REPAINTS, SCREENS, run
+
+
+@pytest.fixture(autouse=True)
+def headless(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+
+
+def test_every_screen_is_timed():
+    results = run(matches=1)
+    assert list(results) == list(SCREENS)
+    for screen, result in results.items():
+        assert result.name == screen
+        assert result.p50_ns <= result.p90_ns <= result.p99_ns
+    assert results["gui_toss"].batches >= 2 * REPAINTS
+    assert results["gui_result"].batches == REPAINTS + 1
+    assert results["gui_in_play"].batches > 100
+
+
+def test_main(tmp_path, monkeypatch):
+    monkeypatch.setattr(calculator_cricket_gui_bench, "REPAINTS", 2)
+    path = tmp_path / "gui.json"
+    assert calculator_cricket_gui_bench.main(["--matches", "1", "--save", str(path)]) == 0
+    assert path.exists()
@@ -0,0 +1,101 @@
+import itertools
+import random
+from unittest.mock import patch
+
+from calculator_cricket import MAX_OVERS, MAX_WICKETS, Game
+from calculator_cricket_instruments import COUNTERS, PHASES, Instruments
+
+
+def _game(instruments=None):
+    return Game("Team A", "Team B", rng=random.Random(0), instruments=instruments)
+
+
+class TestSimulate:
+    def test_counts_match_results(self):
+        instruments = Instruments()
+        game = _game(instruments)
+        balls = legal = wickets = 0
+        for seed in range(10):
+            result = game.simulate(seed=seed)
+            for innings in (result.first_innings, result.second_innings):
+                balls += innings.balls
+                legal += innings.legal_balls
+                wickets += innings.outs
+        counts = instruments.snapshot().counts
+        assert counts["innings"] == 20
+        assert counts["balls"] == balls
+        assert counts["legal_balls"] == legal
+        assert counts["wickets"] == wickets
+        assert counts["extras"] == balls - legal
+
+    def test_bowler_selections(self):
+        instruments = Instruments()
+        _game(instruments).simulate(seed=1, roll_fn=lambda: 9)
+        # Ten straight wickets take two overs in each innings.
+        assert instruments.counts["bowler_selections"] == 4
+
+        instruments.reset()
+        _game(instruments).simulate(seed=1, roll_fn=lambda: 0)
+        assert instruments.counts["bowler_selections"] == 2 * MAX_OVERS
+
+    def test_phases(self):
+        seen = []
+        instruments = Instruments(callback=lambda phase, seconds: seen.append(phase))
+        game = _game(instruments)
+        game.simulate(seed=2)
+        assert seen == ["teams", "toss", "innings", "innings", "result"]
+        snapshot = instruments.snapshot()
+        assert snapshot.calls["innings"] == 2
+        assert snapshot.calls["scorecard"] == 0
+        assert all(snapshot.timings[phase] >= 0 for phase in PHASES)
+
+    def test_same_results_as_uninstrumented(self):
+        plain, timed = _game(), _game(Instruments())
+        for seed in range(5):
+            assert timed.simulate(seed=seed) == plain.simulate(seed=seed)
+
+
+class TestPlay:
+    def test_phases_and_counts(self, capsys):
+        instruments = Instruments()
+        game = _game(instruments)
+        rolls = itertools.cycle([1, 9, 4, 8, 0, 6])
+        with patch("builtins.input", side_effect=itertools.cycle(["h", "bat", ""])), \
+             patch.object(game, "_default_roll_fn", return_value=lambda: next(rolls)):
+            game.play()
+        snapshot = instruments.snapshot()
+        assert snapshot.calls == {"teams": 1, "toss": 1, "innings": 2,
+                                  "scorecard": 2, "result": 1}
+        first, second = game.batting_first, game.batting_second
+        assert snapshot.counts["innings"] == 2
+        assert snapshot.counts["wickets"] == first.outs + second.outs
+        assert snapshot.counts["extras"] == (first.balls - first.legal_balls
+                                            + second.balls - second.legal_balls)
+
+    def test_innings_events_counts_once_finished(self):
+        instruments = Instruments()
+        game = _game(instruments)
+        events = game.innings_events(game.team1, game.team2, roll_fn=lambda: 9)
+        next(events)
+        assert instruments.counts["innings"] == 0
+        list(events)
+        assert instruments.counts["wickets"] == MAX_WICKETS
+        assert instruments.counts["bowler_selections"] == 2
+
+
+class TestInstruments:
+    def test_clock(self):
+        ticks = iter([1.0, 3.5, 10.0, 10.25])
+        instruments = Instruments(clock=lambda: next(ticks))
+        instruments.stop("toss", instruments.start())
+        instruments.stop("toss", instruments.start())
+        assert instruments.timings["toss"] == 2.75
+        assert instruments.calls["toss"] == 2
+
+    def test_reset_and_snapshot_are_copies(self):
+        instruments = Instruments()
+        _game(instruments).simulate(seed=3)
+        snapshot = instruments.snapshot()
+        instruments.reset()
+        assert snapshot.counts["innings"] == 2
+        assert instruments.snapshot().counts == dict.fromkeys(COUNTERS, 0)
@@ -0,0 +1,155 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from calculator_cricket import DISMISSALS, MAX_WICKETS, Game, MatchConfig
+import calculator_cricket_log
+from calculator_cricket_log import (
+    FLAG_LEGAL, FLAG_WICKET, MAGIC, RECORD, BallLogWriter, dismissals, open_log,
+)
+
+
+def _play(path, seeds):
+    game = Game("Team A", "Team B", rng=random.Random(0))
+    results = []
+    with BallLogWriter(path) as log:
+        for match_id, seed in enumerate(seeds):
+            results.append(game.simulate(seed=seed, log=log, match_id=match_id))
+    return results
+
+
+class TestRoundTrip:
+    def test_innings_totals(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        results = _play(path, [1, 2, 3])
+        log = open_log(path)
+        assert path.stat().st_size == len(MAGIC) + len(log) * RECORD.size
+        for match_id, result in enumerate(results):
+            for number, innings in ((1, result.first_innings), (2, result.second_innings)):
+                rows = log[(log["match"] == match_id) & (log["innings"] == number)]
+                assert len(rows) == innings.balls
+                assert rows["runs"].sum() == innings.runs
+                assert ((rows["flags"] & FLAG_LEGAL) > 0).sum() == innings.legal_balls
+                assert ((rows["flags"] & FLAG_WICKET) > 0).sum() == innings.outs
+
+    def test_delivery_fields(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        _play(path, [4])
+        log = open_log(path)
+        assert (log["roll"] <= 9).all()
+        assert (log["striker"] < 11).all()
+        assert ((log["bowler"] >= 5) & (log["bowler"] < 11)).all()
+        assert log["over"].max() < 20 and log["ball"].min() == 1
+        # Consecutive overs never share a bowler.
+        first = log[log["innings"] == 1]
+        starts = first[first["ball"] == 1]
+        assert (starts["bowler"][1:] != starts["bowler"][:-1]).all()
+
+    def test_dismissals(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        game = Game("Team A", "Team B", rng=random.Random(0))
+        with BallLogWriter(path) as log:
+            game.simulate(seed=1, roll_fn=lambda: 9, log=log)
+        how = dismissals(open_log(path))
+        assert len(how) == 2 * MAX_WICKETS
+        assert set(how) <= {name for name, _ in DISMISSALS}
+
+    def test_config_dismissals(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        kinds = [("Retired", 1), ("Timed Out", 1)]
+        game = Game("Team A", "Team B", rng=random.Random(0),
+                    config=MatchConfig(dismissals=kinds))
+        with BallLogWriter(path) as log:
+            game.simulate(seed=1, roll_fn=lambda: 9, log=log)
+        assert set(dismissals(open_log(path), kinds)) == {"Retired", "Timed Out"}
+
+    def test_fields_are_views_of_the_file(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        _play(path, [5])
+        log = open_log(path)
+        assert isinstance(log, np.memmap)
+        assert np.shares_memory(log["runs"], log)
+
+
+class TestEventStream:
+    def _check(self, log, team, bowling_team):
+        assert len(log) == team.balls
+        assert log["runs"].sum() == team.runs
+        assert ((log["flags"] & FLAG_LEGAL) > 0).sum() == team.legal_balls
+        assert ((log["flags"] & FLAG_WICKET) > 0).sum() == team.outs
+        for p in bowling_team.players:
+            assert log["runs"][log["bowler"] == p.index].sum() == p.runs_conceded
+        for p in team.players:
+            assert log["runs"][log["striker"] == p.index].sum() >= p.runs
+        # Balls count every delivery of an over from 1.
+        over, ball = log["over"].tolist(), log["ball"].tolist()
+        for i in range(1, len(log)):
+            assert ball[i] == (ball[i - 1] + 1 if over[i] == over[i - 1] else 1)
+
+    def test_innings_events(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        game = Game("Team A", "Team B", rng=random.Random(1), dice=[0, 1, 4, "extra", "wicket"])
+        with BallLogWriter(path) as log:
+            record = game.recorders(log, match_id=3)[0]
+            for _ in game.innings_events(game.team1, game.team2, record=record):
+                pass
+        log = open_log(path)
+        assert (log["match"] == 3).all() and (log["innings"] == 1).all()
+        self._check(log, game.team1, game.team2)
+        how = [h for h in dismissals(log) if h is not None]
+        assert len(how) == game.team1.outs
+
+    def test_play(self, tmp_path, monkeypatch, capsys):
+        path = tmp_path / "balls.ccbl"
+        monkeypatch.setattr("builtins.input",
+                            lambda prompt="": "bat" if prompt.startswith("Bat") else "h")
+        game = Game("Team A", "Team B", rng=random.Random(2))
+        with BallLogWriter(path) as log:
+            game.play(log=log)
+        log = open_log(path)
+        first, second = game.batting_first, game.batting_second
+        self._check(log[log["innings"] == 1], first, second)
+        self._check(log[log["innings"] == 2], second, first)
+
+
+class TestWriter:
+    def test_appends_to_existing_log(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        _play(path, [1])
+        first = len(open_log(path))
+        _play(path, [1])
+        log = open_log(path)
+        assert len(log) == 2 * first
+        assert (log["runs"][:first] == log["runs"][first:]).all()
+
+    def test_flushes_when_buffer_fills(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(calculator_cricket_log, "BUFFER_RECORDS", 10)
+        path = tmp_path / "balls.ccbl"
+        log = BallLogWriter(path)
+        record = log.recorder(7, 1)
+        for ball in range(25):
+            record(0, ball, 0, 0, 5, 0, True, None)
+        assert len(open_log(path)) == 20
+        log.close()
+        assert len(open_log(path)) == 25
+
+    def test_empty_log(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        BallLogWriter(path).close()
+        assert len(open_log(path)) == 0
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"hello world!")
+        with pytest.raises(ValueError):
+            open_log(path)
+        with pytest.raises(ValueError):
+            BallLogWriter(path)
+
+    def test_rejects_partial_record(self, tmp_path):
+        path = tmp_path / "balls.ccbl"
+        path.write_bytes(MAGIC + b"\x00" * (RECORD.size + 3))
+        with pytest.raises(ValueError):
+            open_log(path)
@@ -0,0 +1,78 @@
+import pytest
+
+from calculator_cricket import T10, Game
+from calculator_cricket_runner import (
+    imap_matches, match_seed, run_tournament, tournament_stats,
+)
+
+
+class TestReproducible:
+    def test_independent_of_chunking_and_workers(self):
+        serial = list(imap_matches(40, seed=5, workers=1))
+        assert list(imap_matches(40, seed=5, workers=2, chunk_size=7)) == serial
+        assert list(imap_matches(40, seed=5, workers=1, chunk_size=3)) == serial
+
+    def test_summary_independent_of_chunking_and_workers(self):
+        serial = run_tournament(60, seed=9, workers=1)
+        assert run_tournament(60, seed=9, workers=2, chunk_size=11) == serial
+
+    def test_match_depends_only_on_seed_and_index(self):
+        results = list(imap_matches(5, seed=3, workers=1))
+        game = Game("Team 1", "Team 2")
+        assert game.simulate(seed=match_seed(3, 4)) == results[4]
+
+    def test_config(self):
+        results = list(imap_matches(4, seed=3, workers=2, chunk_size=2, config=T10))
+        game = Game("Team 1", "Team 2", config=T10)
+        assert game.simulate(seed=match_seed(3, 3)) == results[3]
+        assert all(r.first_innings.legal_balls <= T10.balls for r in results)
+
+    def test_seeds_differ(self):
+        assert list(imap_matches(20, seed=1, workers=1)) != list(imap_matches(20, seed=2, workers=1))
+
+
+class TestSummary:
+    def test_counts(self):
+        results = list(imap_matches(50, seed=4, workers=1))
+        summary = run_tournament(50, seed=4, workers=1)
+        assert summary.matches == 50
+        assert summary.team1_wins + summary.team2_wins + summary.ties == 50
+        assert summary.ties == sum(r.winner is None for r in results)
+        assert summary.team1_wins == sum(r.winner == "Team 1" for r in results)
+        assert summary.first_innings_runs == sum(r.first_innings.runs for r in results)
+
+    def test_toss_policy(self):
+        results = imap_matches(30, seed=4, workers=1, toss_policy="bat")
+        for r in results:
+            if r.toss_winner == "Team 1":
+                assert r.first_innings.team == "Team 1"
+
+    def test_empty(self):
+        assert run_tournament(0, seed=1).matches == 0
+        assert list(imap_matches(0, seed=1)) == []
+
+
+class TestArguments:
+    def test_seed_must_be_int(self):
+        with pytest.raises(TypeError):
+            run_tournament(10, seed="abc", workers=1)
+
+    def test_team_names_must_differ(self):
+        with pytest.raises(ValueError):
+            run_tournament(10, seed=1, workers=1, team1="A", team2="A")
+
+
+class TestStats:
+    def test_same_for_any_workers(self):
+        one = tournament_stats(60, seed=9, workers=1)
+        two = tournament_stats(60, seed=9, workers=2, chunk_size=7)
+        assert one.matches == two.matches == 60
+        for name in one.HISTOGRAMS:
+            assert list(getattr(one, name).items()) == list(getattr(two, name).items())
+        assert one.bowler_economy.buckets == two.bowler_economy.buckets
+
+    def test_agrees_with_run_tournament(self):
+        stats = tournament_stats(50, seed=4, workers=1)
+        summary = run_tournament(50, seed=4, workers=1)
+        assert stats.ties == summary.ties
+        assert stats.first_innings.total == summary.first_innings_runs
@@ -0,0 +1,129 @@
+import random
+from collections import Counter
+
+import pytest
+
+from calculator_cricket import Game
+from calculator_cricket_sampling import AliasTable, BufferedRolls
+
+
+class TestAliasTable:
+    @pytest.mark.parametrize("weights", [
+        [1, 1, 1, 1],
+        [57, 20, 15, 4, 3, 1],
+        [0, 5, 0, 1],
+        [0.1, 0.7, 0.2],
+    ])
+    def test_frequencies_match_weights(self, weights):
+        table = AliasTable(range(len(weights)), weights)
+        counts = Counter(table.sample_many(60000, random.Random(1)))
+        total = sum(weights)
+        for value, weight in enumerate(weights):
+            assert counts[value] / 60000 == pytest.approx(weight / total, abs=0.01)
+
+    def test_zero_weight_never_drawn(self):
+        table = AliasTable("abc", [1, 0, 3])
+        rng = random.Random(2)
+        assert "b" not in {table.sample(rng) for _ in range(5000)}
+
+    def test_single_value(self):
+        table = AliasTable(["only"], [2.5])
+        assert table.sample_many(10) == ["only"] * 10
+
+    def test_probabilities(self):
+        table = AliasTable("xy", [1, 3])
+        assert table.probabilities == [0.25, 0.75]
+        assert len(table) == 2
+
+    def test_reproducible(self):
+        table = AliasTable(range(6), [1, 2, 3, 4, 5, 6])
+        draw = table.sampler(random.Random(7))
+        again = random.Random(7)
+        assert [draw() for _ in range(100)] == [table.sample(again) for _ in range(100)]
+
+    @pytest.mark.parametrize("values, weights", [
+        ([1, 2], [1]),
+        ([], []),
+        ([1, 2], [1, -1]),
+        ([1, 2], [0, 0]),
+        ([1], [float("nan")]),
+    ])
+    def test_invalid(self, values, weights):
+        with pytest.raises(ValueError):
+            AliasTable(values, weights)
+
+
+class TestSampleArray:
+    def test_shape_and_frequencies(self):
+        np = pytest.importorskip("numpy")
+        table = AliasTable([0, 4, 6], [2, 1, 1])
+        draws = table.sample_array((300, 200), rng=3)
+        assert draws.shape == (300, 200)
+        assert set(np.unique(draws)) <= {0, 4, 6}
+        assert (draws == 0).mean() == pytest.approx(0.5, abs=0.01)
+
+    def test_seeded(self):
+        pytest.importorskip("numpy")
+        table = AliasTable(range(5), [5, 4, 3, 2, 1])
+        assert (table.sample_array(50, rng=9) == table.sample_array(50, rng=9)).all()
+
+
+class TestBufferedRolls:
+    @pytest.mark.parametrize("faces", [2, 6, 10, 256])
+    def test_uniform(self, faces):
+        rolls = BufferedRolls(faces, seed=1, block_size=1000)
+        counts = Counter(rolls() for _ in range(50000 * faces // 10))
+        assert set(counts) == set(range(faces))
+        for face in range(faces):
+            assert counts[face] / (5000 * faces) == pytest.approx(1 / faces, abs=0.01)
+
+    def test_weighted(self):
+        rolls = BufferedRolls(4, seed=2, weights=[0, 1, 1, 2])
+        counts = Counter(rolls.roll() for _ in range(40000))
+        assert counts[0] == 0
+        assert counts[3] / 40000 == pytest.approx(0.5, abs=0.01)
+
+    def test_seeded(self):
+        a, b = BufferedRolls(seed=3, block_size=50), BufferedRolls(seed=3, block_size=50)
+        assert [a() for _ in range(200)] == [b() for _ in range(200)]
+        assert [a() for _ in range(200)] != [BufferedRolls(seed=4)() for _ in range(200)]
+
+    @pytest.mark.parametrize("used", [0, 1, 63, 64, 65, 500])
+    def test_getstate_replays(self, used):
+        rolls = BufferedRolls(seed=5, block_size=64)
+        for _ in range(used):
+            rolls()
+        state = rolls.getstate()
+        expected = [rolls() for _ in range(300)]
+        rolls.setstate(state)
+        assert [rolls() for _ in range(300)] == expected
+        fresh = BufferedRolls(block_size=64)
+        fresh.setstate(state)
+        assert [fresh.roll() for _ in range(300)] == expected
+
+    def test_getstate_after_setstate(self):
+        rolls = BufferedRolls(seed=5, block_size=64)
+        for _ in range(10):
+            rolls()
+        state = rolls.getstate()
+        fresh = BufferedRolls(block_size=64)
+        fresh.setstate(state)
+        assert fresh.getstate() == state
+
+    def test_replays_a_match(self):
+        game = Game("Team A", "Team B", rng=random.Random(0))
+        rolls = BufferedRolls(seed=6)
+        state = rolls.getstate()
+        first = game.simulate(seed=1, roll_fn=rolls)
+        rolls.setstate(state)
+        assert game.simulate(seed=1, roll_fn=rolls.roll) == first
+
+    @pytest.mark.parametrize("kwargs", [
+        {"faces": 0},
+        {"faces": 257},
+        {"seed": 1, "rng": random.Random(1)},
+        {"block_size": 0},
+    ])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            BufferedRolls(**kwargs)
@@ -0,0 +1,220 @@
+import random
+
+import pytest
+
+from calculator_cricket import T10, Game, MatchConfig, Player
+from calculator_cricket_sampling import BufferedRolls
+from calculator_cricket_snapshot import (
+    _PROGRESS, MAGIC, VERSION, SnapshotReader, SnapshotWriter, restore, snapshot,
+)
+
+ODD_DICE = [0, 1, 2, 6, "extra", "extra", "wicket"]
+
+
+def _key(event):
+    """An event as plain values, so events of different Games compare."""
+    return tuple(value.name if isinstance(value, Player) else value for value in event)
+
+
+def _scorecard(team):
+    return (team.name, team.runs, team.outs, team.balls, team.legal_balls,
+            team.striker_idx, team.non_striker_idx, team.next_idx,
+            [(p.name, p.runs, p.balls_faced, p.out, p.how_out, p.bowling_balls,
+              p.runs_conceded, p.wickets_taken) for p in team.players])
+
+
+def _split(game, consumed, target=None, seed=3):
+    """Play *consumed* events of an innings, snapshot, and play the rest.
+
+    Returns the snapshot, the rolls' state and the remaining events.
+    """
+    rolls = BufferedRolls(len(game.outcomes), seed=seed, block_size=16)
+    events = game.innings_events(game.team1, game.team2, target, rolls)
+    for _ in zip(range(consumed), events):
+        pass
+    data, state = snapshot(game), rolls.getstate()
+    return data, state, [_key(event) for event in events]
+
+
+def _resume(game, state):
+    rolls = BufferedRolls(len(game.outcomes))
+    rolls.setstate(state)
+    return [_key(event) for event in game.resume_innings(rolls)]
+
+
+class TestInnings:
+    @pytest.mark.parametrize("consumed", [0, 1, 2, 7, 8, 9, 40, 150])
+    def test_resume_matches_original(self, consumed):
+        game = Game("Team A", "Team B", rng=random.Random(1))
+        data, state, rest = _split(game, consumed)
+        restored = restore(data)
+        assert _resume(restored, state) == rest
+        assert _scorecard(restored.team1) == _scorecard(game.team1)
+        assert _scorecard(restored.team2) == _scorecard(game.team2)
+
+    def test_chase(self):
+        game = Game("Team A", "Team B", rng=random.Random(2))
+        data, state, rest = _split(game, 30, target=60)
+        assert _resume(restore(data), state) == rest
+
+    def test_ball_log_carries_on(self):
+        # Extras make the log's ball numbers run past the legal balls.
+        config = MatchConfig(overs=6, overs_per_bowler=2)
+        game = Game("Team A", "Team B", rng=random.Random(12), dice=ODD_DICE, config=config)
+        rolls = BufferedRolls(len(game.outcomes), seed=4)
+        records = []
+        events = game.innings_events(game.team1, game.team2, roll_fn=rolls.roll,
+                                     record=lambda *fields: records.append(fields))
+        for _ in zip(range(13), events):
+            pass
+        data, state = snapshot(game), rolls.getstate()
+        list(events)
+        restored = restore(data)
+        rolls = BufferedRolls(len(restored.outcomes))
+        rolls.setstate(state)
+        resumed = []
+        list(restored.resume_innings(rolls.roll, lambda *fields: resumed.append(fields)))
+        assert records[-len(resumed):] == resumed
+        assert max(fields[1] for fields in resumed) > 6
+
+    def test_finished_innings(self):
+        game = Game("Team A", "Team B", rng=random.Random(2))
+        data, state, rest = _split(game, 10 ** 6)
+        assert rest == []
+        assert _resume(restore(data), state) == []
+
+    def test_custom_game(self):
+        config = MatchConfig(overs=6, overs_per_bowler=2, team_size=7, first_bowler=3,
+                             dismissals=(("Bowled", 2), ("Run out", 1.5)))
+        game = Game("Ünited", "Cöunty", rng=random.Random(4), dice=ODD_DICE,
+                    roll_weights=[3, 2, 1, 1, 0.5, 0.25, 1], config=config,
+                    squads=(["Zoë %d" % i for i in range(7)], None))
+        data, state, rest = _split(game, 25)
+        restored = restore(data)
+        assert restored.config == config
+        assert restored.outcomes == game.outcomes
+        assert restored.roll_weights == game.roll_weights
+        assert restored.team1.players[3].name == "Zoë 3"
+        assert _resume(restored, state) == rest
+
+
+class TestGame:
+    def test_simulate_continues(self):
+        game = Game("Team A", "Team B", rng=random.Random(5))
+        game.simulate()
+        restored = restore(snapshot(game))
+        assert [restored.simulate() for _ in range(3)] == [game.simulate() for _ in range(3)]
+
+    def test_series(self):
+        game = Game("Team A", "Team B", rng=random.Random(6), series=True, config=T10)
+        for _ in range(4):
+            game.simulate()
+        restored = restore(snapshot(game))
+        for team, copy in ((game.team1, restored.team1), (game.team2, restored.team2)):
+            assert copy.series.matches == 4
+            assert copy.series.batting.top(5) == team.series.batting.top(5)
+            assert ([p.name for p in copy.top_bowlers(3)]
+                    == [p.name for p in team.top_bowlers(3)])
+        assert restored.simulate() == game.simulate()
+        assert restored.team1.series.runs == game.team1.series.runs
+
+    def test_stable(self):
+        game = Game("Team A", "Team B", rng=random.Random(7), series=True)
+        data, _, _ = _split(game, 33)
+        assert snapshot(restore(data)) == data
+
+    def test_in_place(self):
+        game = Game("Team A", "Team B", rng=random.Random(8))
+        data, state, rest = _split(game, 20)
+        target = Game("Other", "Side", rng=random.Random(9))
+        assert restore(data, target) is target
+        assert target.team1.name == "Team A"
+        assert snapshot(target) == data
+        assert _resume(target, state) == rest
+
+    @pytest.mark.parametrize("cut", [1, 5, 200])
+    def test_in_place_bad_data(self, cut):
+        game = Game("Team A", "Team B", rng=random.Random(8))
+        data = _split(game, 20)[0]
+        target = Game("Other", "Side", rng=random.Random(9))
+        _split(target, 30)
+        before = snapshot(target)
+        with pytest.raises(ValueError):
+            restore(data[:-cut], target)
+        with pytest.raises(ValueError):
+            restore(data + b"\0", target)
+        assert snapshot(target) == before
+        assert target.team1.name == "Other"
+
+    def test_in_place_needs_same_format(self):
+        game = Game("Team A", "Team B", rng=random.Random(8))
+        other = Game("Other", "Side", config=T10)
+        restored = restore(snapshot(game), other)
+        assert restored is not other
+        assert restored.config == game.config
+
+
+class TestSquads:
+    def test_names(self):
+        names = [f"Player {i}" for i in range(11)]
+        game = Game("Team A", "Team B", squads=(names, None))
+        assert [p.name for p in game.team1.players] == names
+
+    def test_wrong_size(self):
+        with pytest.raises(ValueError):
+            Game("Team A", "Team B", squads=(["Solo"], None))
+
+
+class TestInvalid:
+    @pytest.fixture
+    def data(self):
+        return snapshot(Game("Team A", "Team B", rng=random.Random(10)))
+
+    def test_magic(self, data):
+        with pytest.raises(ValueError, match="not a"):
+            restore(b"XXXX" + data[4:])
+
+    def test_version(self, data):
+        writer = SnapshotWriter()
+        writer._parts[0] = MAGIC + (VERSION + 1).to_bytes(2, "little")
+        with pytest.raises(ValueError, match="version"):
+            SnapshotReader(writer.getvalue() + data[6:])
+
+    @pytest.mark.parametrize("cut", [0, 5, 40, 200, -1])
+    def test_truncated(self, data, cut):
+        with pytest.raises(ValueError):
+            restore(data[:cut])
+
+    def test_trailing_bytes(self, data):
+        with pytest.raises(ValueError, match="unexpected"):
+            restore(data + b"\0")
+
+    @pytest.mark.parametrize("damage", [
+        lambda game: setattr(game.team1, "striker_idx", 11),
+        lambda game: setattr(game.team1, "non_striker_idx", 500),
+        lambda game: setattr(game.team1, "next_idx", 12),
+        lambda game: setattr(game.progress, "over_number", 21),
+        lambda game: setattr(game.progress, "over_balls", 7),
+        lambda game: game.team2.state.bowling_balls.__setitem__(0, 6),
+        lambda game: game.team2.state.bowling_balls.__setitem__(6, 25),
+        lambda game: game.team2.state.bowling_balls.__setitem__(7, 1),
+    ])
+    def test_out_of_range(self, damage):
+        game = Game("Team A", "Team B", rng=random.Random(11))
+        _split(game, 40)
+        damage(game)
+        with pytest.raises(ValueError):
+            restore(snapshot(game))
+
+    def test_batting_side(self):
+        game = Game("Team A", "Team B", rng=random.Random(11))
+        data, _, _ = _split(game, 40)
+        # The side batting is the first field written for the innings.
+        at = len(data) - _PROGRESS.size
+        assert data[at] == 1
+        with pytest.raises(ValueError):
+            restore(data[:at] + b"\3" + data[at + 1:])
+
+    def test_long_string(self):
+        with pytest.raises(ValueError):
+            SnapshotWriter().strings(["x" * 70000])
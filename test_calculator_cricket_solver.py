@@ -0,0 +1,220 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from calculator_cricket import MAX_OVERS, MAX_WICKETS, ODI, T10, MatchConfig
+from calculator_cricket_batch import simulate_innings, simulate_matches
+from calculator_cricket_solver import (
+    ChaseTable, first_innings_distribution, innings_pmf, match_probabilities, solve_chase,
+)
+
+
+@pytest.fixture(scope="module")
+def chase():
+    return solve_chase(300)
+
+
+# ---------------------------------------------------------------------------
+# Small states worked out by hand
+# ---------------------------------------------------------------------------
+
+class TestChaseTable:
+    def test_last_ball_one_needed(self, chase):
+        # Any of 1, 2, 3, 4, 6 wins; so does an 8, with a ball still left.
+        assert chase.win(1, 1, 1) == pytest.approx(0.6)
+        # 0, 5, 7 and the wicket leave the scores level.
+        assert chase.tie(1, 1, 1) == pytest.approx(0.4)
+        assert chase.loss(1, 1, 1) == pytest.approx(0.0)
+
+    def test_last_ball_two_needed(self, chase):
+        assert chase.win(2, 1, 1) == pytest.approx(0.4 + 0.1 * 0.6)
+        assert chase.tie(2, 1, 1) == pytest.approx(0.1 + 0.1 * 0.4)
+
+    def test_out_of_resources(self, chase):
+        assert chase.win(5, 0, MAX_WICKETS) == 0.0
+        assert chase.tie(1, 0, MAX_WICKETS) == 1.0
+        assert chase.loss(3, MAX_OVERS * 6, 0) == 1.0
+
+    def test_target_reached(self, chase):
+        assert chase.win(0, 0, 0) == 1.0
+        assert chase.win(-4, 10, 3) == 1.0
+
+    def test_more_balls_never_hurts(self, chase):
+        wins = chase.win_table[MAX_WICKETS, :, 150]
+        assert (np.diff(wins) >= -1e-12).all()
+
+    def test_probabilities_in_range(self, chase):
+        total = chase.win_table + chase.tie_table
+        assert (total >= 0).all() and (total <= 1 + 1e-9).all()
+
+    def test_beyond_table(self, chase):
+        with pytest.raises(ValueError):
+            chase.win(301, 10, 10)
+
+    def test_expected_runs_last_ball(self, chase):
+        # 1 + 2 + 3 + 4 + 6 off the bat, and an 8's run ends the chase.
+        assert chase.expected_runs(1, 1, 1) == pytest.approx(1.7)
+        # After an 8, one is still needed from the same ball.
+        assert chase.expected_runs(2, 1, 1) == pytest.approx(1.6 + 0.1 * (1 + 1.7))
+        assert chase.expected_runs(0, 10, 3) == 0.0
+        assert chase.expected_runs(10, 0, 3) == 0.0
+
+
+class TestSavedTable:
+    def test_round_trip(self, chase, tmp_path):
+        path = tmp_path / "chase.npy"
+        chase.save(path)
+        loaded = ChaseTable.load(path)
+        assert isinstance(loaded.win_table, np.memmap)
+        assert loaded.max_needed == chase.max_needed
+        assert loaded.win(150, 60, 4) == chase.win(150, 60, 4)
+        assert loaded.tie(3, 2, 1) == chase.tie(3, 2, 1)
+        assert loaded.expected_runs(None, 120, 10) == chase.expected_runs(None, 120, 10)
+
+    def test_not_a_table(self, tmp_path):
+        path = tmp_path / "other.npy"
+        np.save(path, np.zeros((2, 3)))
+        with pytest.raises(ValueError):
+            ChaseTable.load(path)
+
+
+# ---------------------------------------------------------------------------
+# Agreement with simulation
+# ---------------------------------------------------------------------------
+
+class TestAgainstSimulation:
+    def test_first_innings_distribution(self):
+        dist = first_innings_distribution()
+        assert dist.sum() == pytest.approx(1.0)
+        runs = simulate_innings(20000, rng=11).runs
+        assert (dist * np.arange(len(dist))).sum() == pytest.approx(runs.mean(), abs=2)
+        assert dist[: 150 + 1].sum() == pytest.approx((runs <= 150).mean(), abs=0.02)
+
+    def test_chase_from_the_start(self, chase):
+        second = simulate_innings(20000, target=150, rng=12)
+        won = (second.runs >= 150).mean()
+        assert chase.win(150, MAX_OVERS * 6, MAX_WICKETS) == pytest.approx(won, abs=0.02)
+        expected = chase.expected_runs(150, MAX_OVERS * 6, MAX_WICKETS)
+        assert expected == pytest.approx(second.runs.mean(), abs=1)
+
+    def test_expected_first_innings(self):
+        dist = first_innings_distribution()
+        assert solve_chase().expected_runs(None, MAX_OVERS * 6, MAX_WICKETS) == pytest.approx(
+            (dist * np.arange(len(dist))).sum())
+
+    def test_match_probabilities(self):
+        odds = match_probabilities()
+        assert sum(odds) == pytest.approx(1.0)
+        first, second = simulate_matches(20000, rng=13)
+        assert odds.bat_second == pytest.approx((second.runs > first.runs).mean(), abs=0.02)
+        assert odds.tie == pytest.approx((second.runs == first.runs).mean(), abs=0.005)
+
+
+# ---------------------------------------------------------------------------
+# Custom roll probabilities
+# ---------------------------------------------------------------------------
+
+class TestRollProbabilities:
+    def test_only_sixes(self):
+        weights = [0] * 6 + [1] + [0] * 3
+        dist = first_innings_distribution(MAX_OVERS * 36, roll_weights=weights)
+        assert dist[MAX_OVERS * 36] == pytest.approx(1.0)
+
+    def test_only_wickets(self):
+        weights = [0] * 9 + [1]
+        assert match_probabilities(weights).tie == pytest.approx(1.0)
+
+    def test_pitch_agrees_with_simulation(self):
+        # A green pitch: wickets and dots twice as likely.
+        weights = [2, 1, 1, 1, 1, 2, 1, 2, 1, 2]
+        dist = first_innings_distribution(roll_weights=weights)
+        runs = simulate_innings(20000, rng=15, roll_weights=weights).runs
+        assert (dist * np.arange(len(dist))).sum() == pytest.approx(runs.mean(), abs=2)
+
+    def test_weights_are_relative(self):
+        chase = solve_chase(20, roll_weights=[2] * 10)
+        assert chase.win(1, 1, 1) == pytest.approx(0.6)
+
+    def test_wrong_length(self):
+        with pytest.raises(ValueError):
+            solve_chase(10, roll_weights=[0.5, 0.5])
+
+    def test_custom_dice(self):
+        # Two faces: six or out. Each ball scores 6 with probability 1/2 until
+        # the tenth wicket, so from the last ball the side wins iff it hits.
+        chase = solve_chase(12, dice=[6, "wicket"])
+        assert chase.win(6, 1, 1) == pytest.approx(0.5)
+        assert chase.win(12, 2, 2) == pytest.approx(0.25)
+        assert chase.tie(6, 1, 1) == 0.0
+
+    @pytest.mark.parametrize("config", [T10, ODI])
+    def test_other_formats_agree_with_simulation(self, config):
+        dist = first_innings_distribution(config=config)
+        runs = simulate_innings(20000, rng=16, config=config).runs
+        assert (dist * np.arange(len(dist))).sum() == pytest.approx(runs.mean(), abs=2)
+        chase = solve_chase(50, config=config)
+        assert chase.win_table.shape[:2] == (config.wickets + 1, config.balls + 1)
+
+    def test_custom_dice_agrees_with_simulation(self):
+        dice = [0, 1, 2, 3, 4, 5, 6, "extra", "wicket", "wicket"]
+        dist = first_innings_distribution(dice=dice)
+        runs = simulate_innings(20000, rng=14, dice=dice).runs
+        assert (dist * np.arange(len(dist))).sum() == pytest.approx(runs.mean(), abs=2)
+
+
+# ---------------------------------------------------------------------------
+# Innings runs and wickets
+# ---------------------------------------------------------------------------
+
+def _one_over(team_size):
+    return MatchConfig(overs=1, overs_per_bowler=1, team_size=team_size, first_bowler=1)
+
+
+class TestInningsPMF:
+    def test_one_over_by_hand(self):
+        # Each ball is a single or a wicket, and the second wicket ends it.
+        pmf = innings_pmf(10, dice=[1, "wicket"], config=_one_over(3))
+        assert pmf.joint[0, 6] == pytest.approx(1 / 64)
+        assert pmf.joint[1, 5] == pytest.approx(6 / 64)
+        assert pmf.wickets[2] == pytest.approx(57 / 64)
+        assert pmf.joint.sum() == pytest.approx(1.0)
+
+    def test_extras_do_not_use_a_ball(self):
+        # A run from an extra or the only wicket: runs are the extras bowled
+        # before it, however many.
+        pmf = innings_pmf(30, dice=["extra", "wicket"], config=_one_over(2))
+        assert pmf.runs[:5] == pytest.approx([0.5, 0.25, 0.125, 0.0625, 0.03125])
+        assert pmf.wickets[1] == pytest.approx(1.0)
+
+    def test_matches_first_innings_distribution(self):
+        pmf = innings_pmf()
+        assert pmf.runs == pytest.approx(first_innings_distribution(), abs=1e-15)
+        assert pmf.runs.sum() == pytest.approx(1.0)
+        assert pmf.wickets.sum() == pytest.approx(pmf.runs.sum())
+
+    def test_agrees_with_simulation(self):
+        pmf = innings_pmf()
+        innings = simulate_innings(20000, rng=17)
+        outs = np.bincount(innings.outs, minlength=MAX_WICKETS + 1) / 20000
+        assert outs == pytest.approx(pmf.wickets, abs=0.01)
+        assert (pmf.runs * np.arange(len(pmf.runs))).sum() == pytest.approx(
+            innings.runs.mean(), abs=2)
+        all_out = innings.outs == MAX_WICKETS
+        assert pmf.joint[MAX_WICKETS, :151].sum() == pytest.approx(
+            (all_out & (innings.runs <= 150)).mean(), abs=0.01)
+
+    @pytest.mark.parametrize("config", [T10, ODI])
+    def test_other_formats(self, config):
+        pmf = innings_pmf(config=config)
+        assert pmf.joint.shape == (config.wickets + 1, 501)
+        innings = simulate_innings(20000, rng=18, config=config)
+        assert (pmf.wickets * np.arange(config.wickets + 1)).sum() == pytest.approx(
+            innings.outs.mean(), abs=0.1)
+
+    def test_memoized(self):
+        pmf = innings_pmf()
+        assert innings_pmf(roll_weights=[3] * 10) is pmf
+        assert innings_pmf(config=MatchConfig(dismissals=(("Bowled", 1),))) is pmf
+        assert innings_pmf(config=T10) is not pmf
+        with pytest.raises(ValueError):
+            pmf.runs[0] = 1.0
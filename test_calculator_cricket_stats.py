@@ -0,0 +1,174 @@
+import math
+import pickle
+import random
+
+import pytest
+
+from calculator_cricket import T10, Game
+from calculator_cricket_stats import Histogram, MatchStats, QuantileSketch
+
+
+def _rank(values, q):
+    """The exact *q* quantile of *values*, by nearest rank."""
+    values = sorted(values)
+    return values[max(1, math.ceil(q * len(values))) - 1]
+
+
+class TestHistogram:
+    def test_exact(self):
+        rng = random.Random(1)
+        values = [rng.randrange(300) for _ in range(5000)]
+        hist = Histogram()
+        for value in values:
+            hist.add(value)
+        assert hist.count == len(values)
+        assert hist.mean == pytest.approx(sum(values) / len(values))
+        for q in (0, 0.01, 0.25, 0.5, 0.9, 1):
+            assert hist.quantile(q) == _rank(values, q)
+
+    def test_overflow(self):
+        hist = Histogram(size=10)
+        for value in (3, 12, 500, 12, 9):
+            hist.add(value)
+        assert len(hist.counts) == 10
+        assert list(hist.items()) == [(3, 1), (9, 1), (12, 2), (500, 1)]
+        assert hist.quantile(1) == 500
+        assert hist.summary().median == 12
+
+    def test_merge(self):
+        rng = random.Random(2)
+        values = [rng.randrange(40) for _ in range(1000)]
+        whole, left, right = Histogram(32), Histogram(32), Histogram(32)
+        for i, value in enumerate(values):
+            whole.add(value)
+            (left if i % 3 else right).add(value)
+        merged = left.merge(right)
+        assert list(merged.items()) == list(whole.items())
+        assert (merged.count, merged.total) == (whole.count, whole.total)
+
+    def test_empty(self):
+        summary = Histogram().summary()
+        assert summary.count == 0 and summary.median is None
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Histogram().add(-1)
+        with pytest.raises(ValueError):
+            Histogram(8).merge(Histogram(16))
+        with pytest.raises(ValueError):
+            Histogram().quantile(1.5)
+
+
+class TestQuantileSketch:
+    def test_relative_error(self):
+        rng = random.Random(3)
+        values = [rng.lognormvariate(2, 1) for _ in range(20000)] + [0.0] * 100
+        sketch = QuantileSketch(accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+        for q in (0.001, 0.05, 0.25, 0.5, 0.75, 0.95, 0.999):
+            exact = _rank(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.01, abs=1e-12)
+        assert sketch.quantile(0) == 0.0
+        assert sketch.quantile(1) == max(values)
+        assert sketch.mean == pytest.approx(sum(values) / len(values))
+
+    def test_merge(self):
+        rng = random.Random(4)
+        whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for i in range(3000):
+            value = rng.expovariate(0.1)
+            whole.add(value)
+            (left if i % 2 else right).add(value)
+        merged = left.merge(right)
+        assert merged.buckets == whole.buckets
+        assert (merged.count, merged.min, merged.max) == (whole.count, whole.min, whole.max)
+        assert merged.summary() == pytest.approx(whole.summary())
+
+    def test_bounded(self):
+        sketch = QuantileSketch(accuracy=0.01, max_buckets=50)
+        values = [10 ** (i / 100) for i in range(1000)]
+        for value in values:
+            sketch.add(value)
+        assert len(sketch.buckets) == 50
+        # Only the low end is coarsened.
+        assert sketch.quantile(0.99) == pytest.approx(_rank(values, 0.99), rel=0.01)
+        assert sketch.quantile(0) == 1.0
+
+    def test_pickle(self):
+        sketch = QuantileSketch()
+        for value in (1.5, 3.0, 0.0):
+            sketch.add(value)
+        copy = pickle.loads(pickle.dumps(sketch))
+        assert copy.summary() == sketch.summary()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(accuracy=0)
+        with pytest.raises(ValueError):
+            QuantileSketch().add(-0.5)
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def _hist(values):
+    hist = Histogram()
+    for value in values:
+        hist.add(value)
+    return hist
+
+
+def _play(n, seed, config=None):
+    """Play *n* matches; return their stats and the figures as plain lists."""
+    game = Game("Team A", "Team B", rng=random.Random(seed), config=config)
+    stats = MatchStats(config)
+    totals, batters, bowlers, margins = [], [], [], []
+    for _ in range(n):
+        result = game.simulate()
+        stats.add_match(game, result)
+        totals.append((result.first_innings.runs, result.second_innings.runs))
+        margins.append((result.margin_type, result.margin))
+        for team in (game.team1, game.team2):
+            batters += [p.runs for p in team.players[:team.next_idx]]
+            bowlers += [(p.runs_conceded, p.wickets_taken) for p in team.players
+                        if p.bowling_balls or p.runs_conceded]
+    return stats, totals, batters, bowlers, margins
+
+
+class TestMatchStats:
+    def test_against_games(self):
+        stats, totals, batters, bowlers, margins = _play(40, seed=5)
+        assert stats.matches == 40
+        assert list(stats.first_innings.items()) == list(_hist(t[0] for t in totals).items())
+        assert stats.second_innings.total == sum(t[1] for t in totals)
+        assert stats.batter_runs.count == len(batters)
+        assert stats.batter_runs.quantile(0.5) == _rank(batters, 0.5)
+        assert stats.bowler_runs.total == sum(runs for runs, _ in bowlers)
+        assert stats.bowler_wickets.total == sum(wickets for _, wickets in bowlers)
+        assert stats.margin_runs.count == sum(kind == "runs" for kind, _ in margins)
+        assert stats.ties == sum(kind is None for kind, _ in margins)
+        assert stats.team_wickets.count == 80
+
+    def test_merge(self):
+        left = _play(20, seed=6)[0]
+        right = _play(20, seed=7)[0]
+        both = MatchStats().merge(left).merge(right)
+        assert both.matches == 40
+        assert both.first_innings.total == left.first_innings.total + right.first_innings.total
+        assert both.bowler_economy.count == (left.bowler_economy.count
+                                             + right.bowler_economy.count)
+        with pytest.raises(ValueError):
+            MatchStats(T10).merge(left)
+
+    def test_constant_memory(self):
+        stats, *_ = _play(200, seed=8, config=T10)
+        sizes = {name: len(getattr(stats, name).counts) for name in MatchStats.HISTOGRAMS}
+        assert set(sizes.values()) == {len(Histogram().counts)}
+        assert all(not getattr(stats, name).overflow for name in MatchStats.HISTOGRAMS)
+        assert len(stats.bowler_economy.buckets) <= stats.bowler_economy.max_buckets
+
+    def test_summary(self):
+        summary = _play(10, seed=9)[0].summary()
+        assert set(summary) == set(MatchStats.HISTOGRAMS + MatchStats.SKETCHES)
+        first = summary["first_innings"]
+        assert first.count == 10 and first.min <= first.median <= first.max